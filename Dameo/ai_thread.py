@@ -0,0 +1,83 @@
+# ai_thread.py
+# Execução de AIPlayer.choose_move numa thread, para a interface continuar a desenhar
+# e a responder a eventos enquanto a IA pensa. A procura trabalha sobre uma cópia do
+# tabuleiro e pode ser cancelada (AIPlayer.stop). BackgroundPonder faz a IA pensar
+# durante a vez do humano (AIPlayer.ponder). on_done é chamado na thread da procura quando
+# ela termina (a interface usa-o para publicar um evento e acordar do pygame.event.wait).
+
+import threading
+import time
+
+
+class BackgroundMove:
+    """
+    Procura de uma jogada em segundo plano. A thread começa no construtor;
+    done() indica se o resultado já está pronto e result() devolve-o.
+    on_done(), se dado, é chamado (na thread da procura) quando ela termina.
+    """
+
+    def __init__(self, ai, board, player, on_done=None):
+        self.ai = ai
+        self.player = player
+        self.on_done = on_done
+        self.start_time = time.perf_counter()
+        self.elapsed = None
+        self.cancelled = False
+        self._path = None
+        self._error = None
+        ai.stop_requested = False
+        self._thread = threading.Thread(target=self._run, args=([row[:] for row in board], player),
+                                        name=f"dameo-ia-{player}", daemon=True)
+        self._thread.start()
+
+    def _run(self, board, player):
+        try:
+            self._path = self.ai.choose_move(board, player)
+        except BaseException as error: # Passa para a thread principal em result()
+            self._error = error
+        finally:
+            self.elapsed = time.perf_counter() - self.start_time
+            if self.on_done is not None:
+                self.on_done()
+
+    def done(self):
+        # 'elapsed' é definido antes de on_done: o evento publicado já encontra done() verdadeiro
+        return self.elapsed is not None or not self._thread.is_alive()
+
+    def thinking_time(self):
+        """Segundos desde o início da procura (ou a sua duração, se já terminou)."""
+        return self.elapsed if self.elapsed is not None else time.perf_counter() - self.start_time
+
+    def result(self, timeout=None):
+        """Caminho escolhido (None se cancelado). Espera pela thread; relança erros da IA."""
+        self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return None if self.cancelled else self._path
+
+    def cancel(self, wait=True):
+        """Interrompe a procura; com wait=True espera que a thread termine."""
+        self.cancelled = True
+        self.ai.stop()
+        if wait:
+            self._thread.join()
+
+
+class BackgroundPonder:
+    """
+    AIPlayer.ponder numa thread durante a vez do adversário. Deve ser parado com stop()
+    antes de a IA escolher a sua jogada (a IA não pode procurar em duas threads ao mesmo tempo).
+    """
+
+    def __init__(self, ai, board, ai_player):
+        self.ai = ai
+        ai.stop_requested = False
+        self._thread = threading.Thread(target=ai.ponder, args=([row[:] for row in board], ai_player),
+                                        name=f"dameo-ponder-{ai_player}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Termina o ponder e espera pela thread; as jogadas preparadas ficam na IA."""
+        self.ai.stop()
+        self._thread.join()
+        self.ai.stop_requested = False
@@ -0,0 +1,161 @@
+# analysis.py
+# Análise de posições em lote, sem interface gráfica. Lê as posições uma por linha, na
+# notação de Dameo.position (ex.: INITIAL_FEN), de um ficheiro ou do stdin. Para cada uma
+# escreve uma linha JSON assim que o resultado fica pronto, com a melhor jogada, o score
+# (do ponto de vista das brancas, como evaluate_board), a profundidade concluída, os nós e o
+# tempo. As linhas vazias e as começadas por '#' são ignoradas. Uma posição inválida dá uma
+# linha com 'error' e a análise continua.
+#
+# Cada processo mantém uma só IA durante todo o lote: o processo atual, ou cada processo do
+# pool com --workers. A tabela de transposição dessa IA persiste entre posições, por isso
+# posições da mesma partida reaproveitam o trabalho das anteriores. O input é lido à medida
+# que é preciso, o que permite analisar ficheiros muito grandes ou um pipe.
+#
+# Uso:
+#   python -m Dameo.analysis positions.txt --ai "dificil:time_limit=0.5" --output analysis.jsonl
+#   cat dump.txt | python -m Dameo.analysis --workers 8 --ordered > analysis.jsonl
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from Dameo import utils
+from Dameo.position import Position
+from Dameo.ia_dameo import get_ai_player_from_spec
+
+DEFAULT_AI = "dificil"
+PENDING_PER_WORKER = 4 # Posições em curso por processo do pool (o resto do input fica por ler)
+
+_ai = None # IA do processo atual (init_analyser), com a tabela de transposição do lote
+_seed = 0
+
+
+def init_analyser(spec=DEFAULT_AI, seed=0):
+    """Cria a IA do processo atual a partir da configuração em texto (inicializador do pool)."""
+    global _ai, _seed
+    close_analyser()
+    _ai = get_ai_player_from_spec(spec)
+    _seed = seed
+
+def close_analyser():
+    global _ai
+    if _ai is not None:
+        _ai.close()
+        _ai = None
+
+def analyse_position(index, text):
+    """
+    Analisa a posição 'text' com a IA do processo (init_analyser). A escolha entre jogadas
+    equivalentes usa a semente seed + index. Retorna um dicionário serializável em JSON.
+    """
+    result = {'index': index, 'position': text}
+    try:
+        position = Position.from_fen(text)
+    except ValueError as error:
+        result['error'] = str(error)
+        return result
+
+    winner = utils.get_winner(position)
+    if winner: # Jogo terminado: não há nada a procurar
+        result.update({'move': None, 'score': _ai.evaluate_board(position), 'depth': 0,
+                       'nodes': 0, 'time': 0.0, 'winner': winner})
+        return result
+
+    random.seed(_seed + index)
+    if _ai.tt is not None:
+        _ai.tt.new_search() # As entradas das posições anteriores ficam, mas passam a ser substituíveis
+    score, path, depth = _ai.search(position)
+    result.update({
+        'move': [list(step) for step in path] if path else None,
+        'score': round(score, 6) if score is not None else None,
+        'depth': depth,
+        'nodes': _ai.stats.nodes,
+        'time': round(_ai.stats.elapsed, 6),
+    })
+    return result
+
+
+def iter_positions(lines):
+    """(índice, texto) de cada posição de 'lines', sem linhas vazias nem comentários."""
+    index = 0
+    for line in lines:
+        text = line.strip()
+        if not text or text.startswith('#'): continue
+        yield index, text
+        index += 1
+
+def analyse_stream(lines, spec=DEFAULT_AI, workers=None, seed=0, ordered=False):
+    """
+    Gera os resultados de analyse_position para as posições de 'lines', à medida que ficam
+    prontos. Sem workers (ou com workers <= 1) analisa no processo atual, pela ordem do input.
+    Com workers usa um pool de processos, cada um com a sua IA. Os resultados saem pela ordem
+    em que terminam, ou pela ordem do input com ordered=True.
+    """
+    positions = iter_positions(lines)
+    if not workers or workers <= 1:
+        init_analyser(spec, seed)
+        try:
+            for index, text in positions:
+                yield analyse_position(index, text)
+        finally:
+            close_analyser()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_analyser, initargs=(spec, seed)) as pool:
+        pending = set()
+        finished = {} # Com ordered: resultados à espera dos anteriores
+        next_index = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers * PENDING_PER_WORKER:
+                item = next(positions, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(analyse_position, *item))
+            if not pending: break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for result in sorted((future.result() for future in done), key=lambda result: result['index']):
+                if not ordered:
+                    yield result
+                    continue
+                finished[result['index']] = result
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise de posições de Dameo em lote (uma linha JSON por posição).")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="Ficheiro com uma posição por linha, na notação de Dameo.position ('-' ou omisso: stdin)")
+    parser.add_argument("--ai", default=DEFAULT_AI, help='Configuração da IA, ex.: "dificil" ou "dificil:time_limit=0.5"')
+    parser.add_argument("--workers", type=int, default=None, help="Processos em paralelo (omissão: só o processo atual)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente base; a posição i usa seed + i")
+    parser.add_argument("--ordered", action="store_true", help="Com --workers, escreve os resultados pela ordem do input")
+    parser.add_argument("--output", default=None, help="Ficheiro JSONL (omissão: stdout)")
+    args = parser.parse_args(argv)
+
+    in_file = sys.stdin if args.input == "-" else open(args.input, encoding='utf-8')
+    out_file = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    analysed = errors = 0
+    start_time = time.perf_counter()
+    try:
+        for result in analyse_stream(in_file, args.ai, workers=args.workers, seed=args.seed, ordered=args.ordered):
+            out_file.write(json.dumps(result) + '\n')
+            out_file.flush()
+            analysed += 1
+            if 'error' in result: errors += 1
+    finally:
+        if in_file is not sys.stdin: in_file.close()
+        if out_file is not sys.stdout: out_file.close()
+    elapsed = time.perf_counter() - start_time
+    print(f"{analysed} posições analisadas ({errors} inválidas) em {elapsed:.1f}s", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# batch_eval.py
+# Avaliação vetorizada (NumPy) de muitas posições de uma vez: recebe um array N x 8 x 8 de
+# inteiros (PIECE_CODES) e calcula todos os termos da heurística de AIPlayer.evaluate_board
+# (material, avanço, centro, segurança, estrutura, mobilidade e fim de jogo) para as N
+# posições em simultâneo. As somas são feitas pela mesma ordem que evaluate_board, por isso
+# os resultados são iguais (e não só próximos) aos da avaliação em Python.
+#
+# O NumPy é opcional: sem ele HAVE_NUMPY é False e as funções lançam ImportError.
+#
+# Uso:
+#   from Dameo.batch_eval import encode_boards, evaluate_batch
+#   scores = evaluate_batch(encode_boards(boards))   # boards: tabuleiros em listas
+#   terms = batch_terms(encode_boards(boards))       # termos separados (ajuste de pesos)
+
+try:
+    import numpy as np
+except ImportError: # O resto do jogo não precisa do NumPy
+    np = None
+
+from Dameo.utils import BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING
+from Dameo.position import Position
+from Dameo.board_tables import KING_DIRECTIONS, WHITE_MAN_DIRECTIONS, BLACK_MAN_DIRECTIONS, DIAGONALS
+from Dameo.evaluation import (
+    MOBILITY_WEIGHT, CENTER_CONTROL_WEIGHT, KING_ADVANCEMENT_WEIGHT, PAWN_ADVANCEMENT_WEIGHT,
+    CENTER_START, CENTER_END, SAFETY_WEIGHT, STRUCTURE_WEIGHT, WIN_SCORE
+)
+
+HAVE_NUMPY = np is not None
+
+PIECE_CODES = {EMPTY: 0, WHITE_MAN: 1, WHITE_KING: 2, BLACK_MAN: -1, BLACK_KING: -2}
+OFF_BOARD = 9 # Valor da moldura à volta do tabuleiro: nem vazia nem de nenhum jogador
+_PAD = BOARD_SIZE # Moldura larga o suficiente para o raio mais longo e a casa seguinte
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Dameo.batch_eval precisa do NumPy (pip install numpy)")
+
+_CODE_LOOKUP = None
+
+def encode_boards(boards):
+    """
+    Converte uma lista de tabuleiros (listas de listas ou Dameo.position.Position) num
+    array N x 8 x 8 de int8. As casas de uma Position já estão em ASCII e não são convertidas.
+    """
+    global _CODE_LOOKUP
+    _require_numpy()
+    if _CODE_LOOKUP is None:
+        _CODE_LOOKUP = np.zeros(256, dtype=np.int8)
+        for piece, code in PIECE_CODES.items():
+            _CODE_LOOKUP[ord(piece)] = code
+    data = b''.join(board.cells if isinstance(board, Position) else ''.join(''.join(row) for row in board).encode('ascii')
+                    for board in boards)
+    codes = _CODE_LOOKUP[np.frombuffer(data, dtype=np.uint8)]
+    return codes.reshape(len(boards), BOARD_SIZE, BOARD_SIZE)
+
+def _is_white(codes):
+    return (codes > 0) & (codes != OFF_BOARD)
+
+def _is_black(codes):
+    return codes < 0
+
+def _as_array(positions):
+    _require_numpy()
+    if isinstance(positions, np.ndarray):
+        return positions.reshape(-1, BOARD_SIZE, BOARD_SIZE)
+    return encode_boards(positions)
+
+def batch_terms(positions):
+    """
+    Termos da heurística para cada posição (arrays de inteiros de tamanho N), com as mesmas
+    regras de evaluation.square_terms e evaluation.count_normal_moves, mais quem pode jogar
+    (movimentos normais ou pelo menos um primeiro salto) para decidir o fim do jogo.
+    """
+    board = _as_array(positions)
+    padded = np.pad(board, ((0, 0), (_PAD, _PAD), (_PAD, _PAD)), constant_values=OFF_BOARD)
+
+    def shifted(dr, dc, k=1):
+        """Casa a distância k na direção (dr, dc) de cada casa (OFF_BOARD fora do tabuleiro)."""
+        r0, c0 = _PAD + k * dr, _PAD + k * dc
+        return padded[:, r0:r0 + BOARD_SIZE, c0:c0 + BOARD_SIZE]
+
+    white_men = board == PIECE_CODES[WHITE_MAN]
+    white_kings = board == PIECE_CODES[WHITE_KING]
+    black_men = board == PIECE_CODES[BLACK_MAN]
+    black_kings = board == PIECE_CODES[BLACK_KING]
+    white = white_men | white_kings
+    black = black_men | black_kings
+    rows = np.arange(BOARD_SIZE).reshape(1, BOARD_SIZE, 1)
+    center = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=bool)
+    center[CENTER_START:CENTER_END + 1, CENTER_START:CENTER_END + 1] = True
+
+    def total(mask):
+        return mask.sum(axis=(1, 2), dtype=np.int64)
+
+    terms = {
+        'material': total(white_men) + 3 * total(white_kings) - total(black_men) - 3 * total(black_kings),
+        'white_pawn_advancement': total(white_men * (BOARD_SIZE - 1 - rows)),
+        'black_pawn_advancement': total(black_men * rows),
+        'white_king_advancement': total(white_kings * (BOARD_SIZE - 1 - rows)),
+        'black_king_advancement': total(black_kings * rows),
+        'white_center': total(white & center),
+        'black_center': total(black & center),
+        'white_pieces': total(white),
+        'black_pieces': total(black),
+    }
+
+    # Segurança e estrutura (evaluation.is_square_safe / count_diagonal_friends)
+    white_unsafe = np.zeros(board.shape, dtype=bool)
+    black_unsafe = np.zeros(board.shape, dtype=bool)
+    white_friends = np.zeros(board.shape, dtype=np.int64)
+    black_friends = np.zeros(board.shape, dtype=np.int64)
+    for dr, dc in DIAGONALS:
+        neighbour = shifted(dr, dc)
+        beyond_empty = shifted(dr, dc, 2) == 0
+        white_attacker = (neighbour == PIECE_CODES[BLACK_KING]) | \
+                         ((neighbour == PIECE_CODES[BLACK_MAN]) if dr == -1 else False)
+        black_attacker = (neighbour == PIECE_CODES[WHITE_KING]) | \
+                         ((neighbour == PIECE_CODES[WHITE_MAN]) if dr == 1 else False)
+        white_unsafe |= beyond_empty & white_attacker
+        black_unsafe |= beyond_empty & black_attacker
+        white_friends += _is_white(neighbour)
+        black_friends += _is_black(neighbour)
+    terms['white_safety'] = total(white & ~white_unsafe)
+    terms['black_safety'] = total(black & ~black_unsafe)
+    terms['white_structure'] = total(white_friends * white)
+    terms['black_structure'] = total(black_friends * black)
+
+    # Mobilidade (movimentos sem captura) e primeiros saltos de cada jogador
+    white_moves = np.zeros(board.shape, dtype=np.int64)
+    black_moves = np.zeros(board.shape, dtype=np.int64)
+    white_jump = np.zeros(board.shape, dtype=bool)
+    black_jump = np.zeros(board.shape, dtype=bool)
+    for directions, men, moves, jump, is_opponent in (
+            (WHITE_MAN_DIRECTIONS, white_men, white_moves, white_jump, _is_black),
+            (BLACK_MAN_DIRECTIONS, black_men, black_moves, black_jump, _is_white)):
+        for dr, dc in directions:
+            neighbour = shifted(dr, dc)
+            moves += men & (neighbour == 0)
+            jump |= men & is_opponent(neighbour) & (shifted(dr, dc, 2) == 0)
+    kings = white_kings | black_kings
+    for dr, dc in KING_DIRECTIONS if kings.any() else ():
+        clear = kings.copy() # Reis com todas as casas até k - 1 vazias nesta direção
+        for k in range(1, BOARD_SIZE):
+            if not clear.any(): break
+            square = shifted(dr, dc, k)
+            empty = square == 0
+            first_piece = clear & ~empty
+            landing_empty = shifted(dr, dc, k + 1) == 0
+            white_moves += white_kings & clear & empty
+            black_moves += black_kings & clear & empty
+            white_jump |= white_kings & first_piece & _is_black(square) & landing_empty
+            black_jump |= black_kings & first_piece & _is_white(square) & landing_empty
+            clear &= empty
+    terms['white_mobility'] = total(white_moves)
+    terms['black_mobility'] = total(black_moves)
+    terms['white_can_move'] = (terms['white_mobility'] > 0) | white_jump.any(axis=(1, 2))
+    terms['black_can_move'] = (terms['black_mobility'] > 0) | black_jump.any(axis=(1, 2))
+    return terms
+
+def combine_batch_terms(terms):
+    """Pontuação de cada posição a partir de batch_terms (mesma ordem de somas que evaluate_board)."""
+    score = terms['material'].astype(np.float64)
+    score += terms['white_pawn_advancement'] * PAWN_ADVANCEMENT_WEIGHT
+    score -= terms['black_pawn_advancement'] * PAWN_ADVANCEMENT_WEIGHT
+    score += terms['white_king_advancement'] * KING_ADVANCEMENT_WEIGHT
+    score -= terms['black_king_advancement'] * KING_ADVANCEMENT_WEIGHT
+    score += terms['white_center'] * CENTER_CONTROL_WEIGHT
+    score -= terms['black_center'] * CENTER_CONTROL_WEIGHT
+    score += terms['white_safety'] * SAFETY_WEIGHT
+    score -= terms['black_safety'] * SAFETY_WEIGHT
+    score += terms['white_structure'] * STRUCTURE_WEIGHT / 2
+    score -= terms['black_structure'] * STRUCTURE_WEIGHT / 2
+    score += (terms['white_mobility'] - terms['black_mobility']) * MOBILITY_WEIGHT
+
+    # Fim de jogo, pela ordem de utils.get_winner
+    white_count, black_count = terms['white_pieces'], terms['black_pieces']
+    white_can_move, black_can_move = terms['white_can_move'], terms['black_can_move']
+    white_wins = WIN_SCORE + white_count
+    black_wins = -WIN_SCORE - black_count
+    return np.select(
+        [white_count == 0, black_count == 0, ~white_can_move & ~black_can_move, ~white_can_move, ~black_can_move],
+        [black_wins, white_wins, 0, black_wins, white_wins],
+        default=score).astype(np.float64)
+
+def evaluate_batch(positions):
+    """
+    Avaliação de N posições (array N x 8 x 8 de PIECE_CODES ou lista de tabuleiros).
+    Retorna um array de N floats, iguais aos de AIPlayer.evaluate_board.
+    """
+    return combine_batch_terms(batch_terms(positions))
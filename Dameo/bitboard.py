@@ -0,0 +1,371 @@
+# bitboard.py
+# Representação alternativa do tabuleiro: uma máscara de 64 bits por tipo de peça.
+# A casa (r, c) corresponde ao bit r * BOARD_SIZE + c. As regras são exatamente
+# as de utils.py (incluindo a captura mais longa obrigatória e a promoção no fim
+# do caminho), mas sem percorrer listas de listas nem copiar o tabuleiro:
+# os bitboards são inteiros imutáveis, por isso "copiar" uma posição é gratuito.
+
+from Dameo.utils import BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING, MoveList
+
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << NUM_SQUARES) - 1
+
+# Índices dos tipos de peça no tuplo de bitboards
+WM, WK, BM, BK = 0, 1, 2, 3
+PIECE_INDEX = {WHITE_MAN: WM, WHITE_KING: WK, BLACK_MAN: BM, BLACK_KING: BK}
+INDEX_PIECE = (WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING)
+
+EMPTY_BITBOARDS = (0, 0, 0, 0)
+
+# Mesma ordem de direções que utils.get_piece_directions para os reis
+KING_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+MAN_DIRECTIONS = {
+    WHITE_MAN: [(-1, 0), (-1, -1), (-1, 1)],
+    BLACK_MAN: [(1, 0), (1, -1), (1, 1)],
+}
+
+# --- Tabelas pré-calculadas ---
+BIT = [1 << sq for sq in range(NUM_SQUARES)]
+SQUARE_COORDS = [(sq // BOARD_SIZE, sq % BOARD_SIZE) for sq in range(NUM_SQUARES)]
+
+def square_index(r, c):
+    """Converte (r, c) no índice do bit correspondente."""
+    return r * BOARD_SIZE + c
+
+def _build_rays():
+    rays = []
+    for sq in range(NUM_SQUARES):
+        r, c = SQUARE_COORDS[sq]
+        sq_rays = []
+        for dr, dc in KING_DIRECTIONS:
+            ray = []
+            nr, nc = r + dr, c + dc
+            while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
+                ray.append(square_index(nr, nc))
+                nr += dr; nc += dc
+            sq_rays.append(ray)
+        rays.append(sq_rays)
+    return rays
+
+def _build_man_tables(directions):
+    steps, jumps = [], []
+    for sq in range(NUM_SQUARES):
+        r, c = SQUARE_COORDS[sq]
+        sq_steps, sq_jumps = [], []
+        for dr, dc in directions:
+            if 0 <= r + dr < BOARD_SIZE and 0 <= c + dc < BOARD_SIZE:
+                sq_steps.append(square_index(r + dr, c + dc))
+                if 0 <= r + 2 * dr < BOARD_SIZE and 0 <= c + 2 * dc < BOARD_SIZE:
+                    sq_jumps.append((square_index(r + dr, c + dc), square_index(r + 2 * dr, c + 2 * dc)))
+        steps.append(sq_steps)
+        jumps.append(sq_jumps)
+    return steps, jumps
+
+RAYS = _build_rays()
+MAN_STEPS = {}
+MAN_JUMPS = {}
+for _player, _directions in MAN_DIRECTIONS.items():
+    MAN_STEPS[_player], MAN_JUMPS[_player] = _build_man_tables(_directions)
+
+# Linha de promoção de cada cor
+PROMOTION_ROW_MASK = {
+    WHITE_MAN: sum(BIT[square_index(0, c)] for c in range(BOARD_SIZE)),
+    BLACK_MAN: sum(BIT[square_index(BOARD_SIZE - 1, c)] for c in range(BOARD_SIZE)),
+}
+
+# Deslocamentos de um passo para a frente dos peões (set-wise): (máscara de origem, shift)
+_NOT_FIRST_COL = FULL_MASK & ~sum(BIT[square_index(r, 0)] for r in range(BOARD_SIZE))
+_NOT_LAST_COL = FULL_MASK & ~sum(BIT[square_index(r, BOARD_SIZE - 1)] for r in range(BOARD_SIZE))
+
+def _step_shifts(directions):
+    shifts = []
+    for dr, dc in directions:
+        mask = FULL_MASK
+        if dc < 0: mask = _NOT_FIRST_COL
+        elif dc > 0: mask = _NOT_LAST_COL
+        shifts.append((mask, dr * BOARD_SIZE + dc))
+    return shifts
+
+MAN_STEP_SHIFTS = {player: _step_shifts(directions) for player, directions in MAN_DIRECTIONS.items()}
+
+def _shift(bb, shift):
+    return (bb << shift) & FULL_MASK if shift > 0 else bb >> -shift
+
+if hasattr(int, "bit_count"): # Python 3.10+
+    popcount = int.bit_count
+else:
+    def popcount(bb):
+        """Número de bits a 1 na máscara."""
+        return bin(bb).count("1")
+
+def iter_squares(bb):
+    """Itera os índices dos bits a 1, do menor para o maior."""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+# --- Conversão de/para o tabuleiro em listas ---
+
+def from_board(board):
+    """Converte o tabuleiro (lista de listas) num tuplo (brancos, reis brancos, pretos, reis pretos)."""
+    masks = [0, 0, 0, 0]
+    sq = 0
+    for row in board:
+        for piece in row:
+            if piece != EMPTY:
+                masks[PIECE_INDEX[piece]] |= BIT[sq]
+            sq += 1
+    return tuple(masks)
+
+def to_board(bitboards):
+    """Converte um tuplo de bitboards de volta para o tabuleiro em listas."""
+    board = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for index, mask in enumerate(bitboards):
+        piece = INDEX_PIECE[index]
+        for sq in iter_squares(mask):
+            r, c = SQUARE_COORDS[sq]
+            board[r][c] = piece
+    return board
+
+def player_masks(bitboards, player):
+    """Retorna (peões, reis, peças do oponente) do jogador."""
+    wm, wk, bm, bk = bitboards
+    if player.lower() == WHITE_MAN:
+        return wm, wk, bm | bk
+    return bm, bk, wm | wk
+
+def occupied(bitboards):
+    wm, wk, bm, bk = bitboards
+    return wm | wk | bm | bk
+
+def piece_at(bitboards, r, c):
+    """Retorna o caractere da peça em (r, c) (EMPTY se vazia)."""
+    bit = BIT[square_index(r, c)]
+    for index, mask in enumerate(bitboards):
+        if mask & bit: return INDEX_PIECE[index]
+    return EMPTY
+
+def count_pieces(bitboards):
+    """Conta o total de peças por jogador."""
+    wm, wk, bm, bk = bitboards
+    return {WHITE_MAN: popcount(wm | wk), BLACK_MAN: popcount(bm | bk)}
+
+# --- Geração de capturas ---
+# O tabuleiro é estático durante a procura de uma sequência (como em
+# utils._get_capture_paths_recursive): as peças capturadas continuam a bloquear
+# e a casa de origem continua ocupada pela própria peça.
+
+def _man_capture_paths(sq, jumps, opp, empty, captured, path, out):
+    extended = False
+    for over, land in jumps[sq]:
+        over_bit = BIT[over]
+        if opp & over_bit and not captured & over_bit and empty & BIT[land]:
+            extended = True
+            path.append(land)
+            _man_capture_paths(land, jumps, opp, empty, captured | over_bit, path, out)
+            path.pop()
+    if not extended and len(path) > 1:
+        out.append([SQUARE_COORDS[s] for s in path])
+
+def _king_capture_paths(sq, opp, occ, captured, path, out):
+    extended = False
+    for ray in RAYS[sq]:
+        target_bit = 0
+        landing_squares = []
+        for s in ray:
+            bit = BIT[s]
+            if not target_bit:
+                if not occ & bit: continue # Caminho livre
+                if opp & bit and not captured & bit:
+                    target_bit = bit
+                    continue
+                break # Peça amiga ou peça já capturada
+            if occ & bit: break
+            landing_squares.append(s)
+        if target_bit and landing_squares:
+            extended = True
+            for land in landing_squares:
+                path.append(land)
+                _king_capture_paths(land, opp, occ, captured | target_bit, path, out)
+                path.pop()
+    if not extended and len(path) > 1:
+        out.append([SQUARE_COORDS[s] for s in path])
+
+def get_capture_sequences(bitboards, sq, player):
+    """Todas as sequências de captura maximais da peça do jogador na casa sq (sem filtro de tamanho)."""
+    men, kings, opp = player_masks(bitboards, player)
+    occ = occupied(bitboards)
+    out = []
+    if kings & BIT[sq]:
+        _king_capture_paths(sq, opp, occ, 0, [sq], out)
+    elif men & BIT[sq]:
+        _man_capture_paths(sq, MAN_JUMPS[player.lower()], opp, FULL_MASK & ~occ, 0, [sq], out)
+    return out
+
+def _men_have_jump(men, opp, empty, player):
+    """Verificação set-wise: algum peão tem um primeiro salto disponível?"""
+    for mask, shift in MAN_STEP_SHIFTS[player]:
+        over = _shift(men & mask, shift) & opp
+        if over and _shift(over & mask, shift) & empty:
+            return True
+    return False
+
+def get_all_captures(bitboards, player):
+    """Sequências de captura obrigatórias (as mais longas) do jogador."""
+    player = player.lower()
+    men, kings, opp = player_masks(bitboards, player)
+    occ = occupied(bitboards)
+    empty = FULL_MASK & ~occ
+    out = []
+    if men and _men_have_jump(men, opp, empty, player):
+        jumps = MAN_JUMPS[player]
+        for sq in iter_squares(men):
+            _man_capture_paths(sq, jumps, opp, empty, 0, [sq], out)
+    for sq in iter_squares(kings):
+        _king_capture_paths(sq, opp, occ, 0, [sq], out)
+    if not out: return []
+    max_len = max(len(path) for path in out)
+    return [path for path in out if len(path) == max_len]
+
+# --- Movimentos normais ---
+
+def get_normal_moves(bitboards, player):
+    """Movimentos sem captura: passos dos peões e deslizes dos reis."""
+    player = player.lower()
+    men, kings, _ = player_masks(bitboards, player)
+    occ = occupied(bitboards)
+    empty = FULL_MASK & ~occ
+    paths = []
+    for mask, shift in MAN_STEP_SHIFTS[player]:
+        targets = _shift(men & mask, shift) & empty
+        for to_sq in iter_squares(targets):
+            paths.append([SQUARE_COORDS[to_sq - shift], SQUARE_COORDS[to_sq]])
+    for sq in iter_squares(kings):
+        start = SQUARE_COORDS[sq]
+        for ray in RAYS[sq]:
+            for s in ray:
+                if occ & BIT[s]: break
+                paths.append([start, SQUARE_COORDS[s]])
+    return paths
+
+def count_normal_moves(bitboards, player):
+    """Número de movimentos sem captura (mobilidade), sem construir os caminhos."""
+    player = player.lower()
+    men, kings, _ = player_masks(bitboards, player)
+    occ = occupied(bitboards)
+    empty = FULL_MASK & ~occ
+    total = 0
+    for mask, shift in MAN_STEP_SHIFTS[player]:
+        total += popcount(_shift(men & mask, shift) & empty)
+    for sq in iter_squares(kings):
+        for ray in RAYS[sq]:
+            for s in ray:
+                if occ & BIT[s]: break
+                total += 1
+    return total
+
+def generate_moves(bitboards, player):
+    """
+    Gerador de movimentos legais: se houver capturas, só as mais longas;
+    caso contrário, todos os movimentos normais. Retorna um utils.MoveList.
+    """
+    captures = get_all_captures(bitboards, player)
+    if captures:
+        return MoveList(captures, is_capture=True, mobility=count_normal_moves(bitboards, player))
+    normal_paths = get_normal_moves(bitboards, player)
+    return MoveList(normal_paths, is_capture=False, mobility=len(normal_paths))
+
+def has_moves(bitboards, player):
+    """Verifica se o jogador tem algum movimento válido."""
+    player = player.lower()
+    if count_normal_moves(bitboards, player): return True
+    return bool(get_all_captures(bitboards, player))
+
+# --- Aplicar movimento ---
+
+def _captured_square(from_sq, to_sq, opp, occ, is_king_piece):
+    """Casa capturada num passo do caminho (ou None), como utils.find_captured_piece_pos."""
+    fr, fc = SQUARE_COORDS[from_sq]
+    tr, tc = SQUARE_COORDS[to_sq]
+    dr, dc = tr - fr, tc - fc
+    distance = max(abs(dr), abs(dc))
+    if dr and dc and abs(dr) != abs(dc): return None # Não é uma linha reta
+    if distance == 2:
+        over = square_index(fr + dr // 2, fc + dc // 2)
+        return over if opp & BIT[over] else None
+    if distance > 2 and is_king_piece:
+        step_r = (dr > 0) - (dr < 0)
+        step_c = (dc > 0) - (dc < 0)
+        captured = None
+        r, c = fr + step_r, fc + step_c
+        while (r, c) != (tr, tc):
+            sq = square_index(r, c)
+            if occ & BIT[sq]:
+                if not opp & BIT[sq] or captured is not None: return None
+                captured = sq
+            r += step_r; c += step_c
+        return captured
+    return None
+
+def apply_move(bitboards, path):
+    """
+    Aplica um caminho e retorna o NOVO tuplo de bitboards (o original não muda).
+    Remove as peças capturadas e promove o peão que termine na última linha.
+    """
+    if not path or len(path) < 2: return bitboards
+    masks = list(bitboards)
+    start_sq = square_index(*path[0])
+    end_sq = square_index(*path[-1])
+    start_bit = BIT[start_sq]
+    index = next((i for i in range(4) if masks[i] & start_bit), None)
+    if index is None: return bitboards
+
+    piece = INDEX_PIECE[index]
+    is_king_piece = index in (WK, BK)
+    opp_indices = (BM, BK) if index in (WM, WK) else (WM, WK)
+    masks[index] &= ~start_bit
+
+    current = start_sq
+    for step in path[1:]:
+        next_sq = square_index(*step)
+        opp = masks[opp_indices[0]] | masks[opp_indices[1]]
+        occ = masks[0] | masks[1] | masks[2] | masks[3] | start_bit
+        captured = _captured_square(current, next_sq, opp, occ, is_king_piece)
+        if captured is not None:
+            clear = ~BIT[captured]
+            masks[opp_indices[0]] &= clear
+            masks[opp_indices[1]] &= clear
+        current = next_sq
+
+    if not is_king_piece and PROMOTION_ROW_MASK[piece] & BIT[end_sq]:
+        index = WK if index == WM else BK
+    masks[index] |= BIT[end_sq]
+    return tuple(masks)
+
+def apply_undo(bitboards, undo):
+    """
+    Novo tuplo de bitboards com o movimento descrito por um utils.MoveUndo (de utils.make_move
+    sobre o mesmo tabuleiro em listas): as peças capturadas já são conhecidas, por isso não
+    é preciso voltar a percorrer o caminho como em apply_move.
+    """
+    masks = list(bitboards)
+    masks[PIECE_INDEX[undo.piece]] &= ~BIT[square_index(*undo.start)]
+    for (r, c), piece in undo.captured:
+        masks[PIECE_INDEX[piece]] &= ~BIT[square_index(r, c)]
+    masks[PIECE_INDEX[undo.final_piece]] |= BIT[square_index(*undo.end)]
+    return tuple(masks)
+
+# --- Estado do jogo ---
+
+def get_winner(bitboards):
+    """Determina o vencedor ('w', 'b'), 'draw' ou None, como utils.get_winner."""
+    wm, wk, bm, bk = bitboards
+    if not (wm | wk): return BLACK_MAN
+    if not (bm | bk): return WHITE_MAN
+    white_can_move = has_moves(bitboards, WHITE_MAN)
+    black_can_move = has_moves(bitboards, BLACK_MAN)
+    if not white_can_move and not black_can_move: return 'draw'
+    if not white_can_move: return BLACK_MAN
+    if not black_can_move: return WHITE_MAN
+    return None
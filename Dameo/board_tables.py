@@ -0,0 +1,58 @@
+# board_tables.py
+# Tabelas de vizinhança do tabuleiro em listas, construídas uma única vez na importação.
+# Para cada casa (r, c): os raios em cada direção (casas por ordem de distância), os passos
+# e saltos dos peões de cada cor e as vizinhas diagonais usadas pela avaliação. O gerador
+# de movimentos (utils) e as funções da avaliação percorrem estas tabelas em vez de
+# calcularem r + i * dr / c + i * dc e verificarem os limites em cada passo.
+#
+# As coordenadas são tuplos partilhados (SQUARES[r][c]), por isso os caminhos gerados não
+# criam tuplos novos. Este módulo não importa nada do jogo para poder ser usado por utils.
+
+BOARD_SIZE = 8 # Igual a utils.BOARD_SIZE
+
+# Mesma ordem que utils.get_piece_directions: a ordem dos movimentos gerados não muda
+KING_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+WHITE_MAN_DIRECTIONS = ((-1, 0), (-1, -1), (-1, 1)) # Os brancos sobem (a linha diminui)
+BLACK_MAN_DIRECTIONS = ((1, 0), (1, -1), (1, 1))
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+def _in_bounds(r, c):
+    return 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE
+
+SQUARES = tuple(tuple((r, c) for c in range(BOARD_SIZE)) for r in range(BOARD_SIZE))
+ALL_SQUARES = tuple(square for row in SQUARES for square in row)
+
+def _per_square(build):
+    """Tabela [r][c] com build(r, c) para cada casa."""
+    return tuple(tuple(build(r, c) for c in range(BOARD_SIZE)) for r in range(BOARD_SIZE))
+
+def _ray(r, c, dr, dc):
+    squares = []
+    r, c = r + dr, c + dc
+    while _in_bounds(r, c):
+        squares.append(SQUARES[r][c])
+        r += dr; c += dc
+    return tuple(squares)
+
+# RAYS[r][c][i]: casas a partir de (r, c) na direção KING_DIRECTIONS[i], da mais próxima à borda
+RAYS = _per_square(lambda r, c: tuple(_ray(r, c, dr, dc) for dr, dc in KING_DIRECTIONS))
+
+def _steps(directions):
+    return _per_square(lambda r, c: tuple(SQUARES[r + dr][c + dc] for dr, dc in directions
+                                          if _in_bounds(r + dr, c + dc)))
+
+def _jumps(directions):
+    return _per_square(lambda r, c: tuple((SQUARES[r + dr][c + dc], SQUARES[r + 2 * dr][c + 2 * dc])
+                                          for dr, dc in directions if _in_bounds(r + 2 * dr, c + 2 * dc)))
+
+# Passos de um peão (casa de destino) e saltos (casa saltada, casa de chegada) por cor
+WHITE_MAN_STEPS = _steps(WHITE_MAN_DIRECTIONS)
+BLACK_MAN_STEPS = _steps(BLACK_MAN_DIRECTIONS)
+WHITE_MAN_JUMPS = _jumps(WHITE_MAN_DIRECTIONS)
+BLACK_MAN_JUMPS = _jumps(BLACK_MAN_DIRECTIONS)
+
+# Vizinhas diagonais (estrutura) e, para a segurança, (dr, vizinha, casa seguinte na mesma
+# diagonal) quando ambas existem
+DIAGONAL_NEIGHBOURS = _steps(DIAGONALS)
+SAFETY_NEIGHBOURS = _per_square(lambda r, c: tuple((dr, SQUARES[r + dr][c + dc], SQUARES[r + 2 * dr][c + 2 * dc])
+                                                   for dr, dc in DIAGONALS if _in_bounds(r + 2 * dr, c + 2 * dc)))
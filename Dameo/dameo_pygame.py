@@ -1,4 +1,9 @@
 # dameo_pygame.py
+# Desenho do tabuleiro. O fundo (as 64 casas) e os sprites das peças, da seleção e dos
+# marcadores de destino são desenhados uma única vez para cada square_size (get_sprites).
+# BoardRenderer lembra-se do que desenhou em cada casa e só redesenha as que mudaram,
+# retornando os retângulos para pygame.display.update(rects): com o tabuleiro parado,
+# um frame não desenha nada.
 import pygame
 # Importa constantes do módulo utils
 from .utils import WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING, BOARD_SIZE, EMPTY
@@ -11,58 +16,120 @@ COLOR_BLACK = (80, 80, 80)    # Cinza escuro
 COLOR_SELECTED_BORDER = (255, 255, 0, 200) # Amarelo semi-transparente para borda de seleção
 COLOR_POSSIBLE_MOVE = (0, 50, 200, 100) # Azul semi-transparente para movimentos possíveis
 
-def draw_board(screen, board, selected_piece_pos, possible_paths, square_size):
-    """Desenha o tabuleiro, as peças, a seleção e os movimentos possíveis."""
-
-    # 1. Desenhar o tabuleiro (quadrados)
+def _render_background(square_size):
+    """Superfície com as 64 casas do tabuleiro."""
+    background = pygame.Surface((BOARD_SIZE * square_size, BOARD_SIZE * square_size))
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
             color = COLOR_LIGHT if (row + col) % 2 == 0 else COLOR_DARK
-            pygame.draw.rect(screen, color, (col * square_size, row * square_size, square_size, square_size))
+            pygame.draw.rect(background, color, (col * square_size, row * square_size, square_size, square_size))
+    return background
+
+def _render_piece(piece, square_size):
+    """Sprite (transparente, do tamanho de uma casa) de uma peça, com sombra e marca de Rei."""
+    sprite = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+    center = square_size // 2
+    radius = int(square_size * 0.4) # Raio como percentagem do quadrado
+
+    # Cor base da peça
+    piece_color = COLOR_WHITE if piece.lower() == WHITE_MAN else COLOR_BLACK
+    # Cor do contorno/sombra (opcional, para efeito 3D)
+    shadow_color = tuple(max(0, c-40) for c in piece_color) # Cor ligeiramente mais escura
+
+    # Desenhar sombra/borda (opcional)
+    pygame.draw.circle(sprite, shadow_color, (center + 2, center + 2), radius)
+    # Desenhar peça principal
+    pygame.draw.circle(sprite, piece_color, (center, center), radius)
+
+    # Desenhar indicação de Rei
+    if piece == WHITE_KING or piece == BLACK_KING:
+        # Coroa/Estrela simples no centro
+        king_color = COLOR_BLACK if piece == WHITE_KING else COLOR_WHITE # Cor contrastante
+        pygame.draw.circle(sprite, king_color, (center, center), radius // 3)
+    return sprite
+
+_SPRITE_CACHE = {} # square_size -> sprites
+
+def get_sprites(square_size):
+    """
+    Fundo e sprites para um tamanho de casa, criados na primeira chamada:
+    {'background': ..., 'selected': ..., 'marker': ..., peça: ...}.
+    """
+    sprites = _SPRITE_CACHE.get(square_size)
+    if sprites is None:
+        sprites = {piece: _render_piece(piece, square_size)
+                   for piece in (WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING)}
+        sprites['background'] = _render_background(square_size)
+        # Seleção (borda amarela) e movimento possível (círculo no destino)
+        selected = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+        pygame.draw.rect(selected, COLOR_SELECTED_BORDER, (0, 0, square_size, square_size), 4) # Borda
+        sprites['selected'] = selected
+        marker = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+        move_radius = square_size // 5 # Raio menor para indicar destino
+        pygame.draw.circle(marker, COLOR_POSSIBLE_MOVE, (square_size // 2, square_size // 2), move_radius)
+        sprites['marker'] = marker
+        _SPRITE_CACHE[square_size] = sprites
+    return sprites
 
-    # 2. Desenhar as peças
+def _move_targets(possible_paths):
+    """Casas de destino dos caminhos possíveis (ignora caminhos inválidos)."""
+    return {tuple(path[-1]) for path in possible_paths or () if path and len(path) >= 2}
+
+def _draw_square(screen, sprites, square_size, row, col, piece, selected, marked):
+    """Desenha uma casa: fundo, peça, seleção e marcador, por esta ordem."""
+    rect = pygame.Rect(col * square_size, row * square_size, square_size, square_size)
+    screen.blit(sprites['background'], rect, rect)
+    if piece != EMPTY: screen.blit(sprites[piece], rect)
+    if selected: screen.blit(sprites['selected'], rect)
+    if marked: screen.blit(sprites['marker'], rect)
+    return rect
+
+def draw_board(screen, board, selected_piece_pos, possible_paths, square_size):
+    """Desenha o tabuleiro, as peças, a seleção e os movimentos possíveis (tudo, com os sprites da cache)."""
+    sprites = get_sprites(square_size)
+    screen.blit(sprites['background'], (0, 0))
+    targets = _move_targets(possible_paths)
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
             piece = board[row][col]
-            if piece == EMPTY:
-                continue
-
-            center_x = col * square_size + square_size // 2
-            center_y = row * square_size + square_size // 2
-            radius = int(square_size * 0.4) # Raio como percentagem do quadrado
-
-            # Cor base da peça
-            piece_color = COLOR_WHITE if piece.lower() == WHITE_MAN else COLOR_BLACK
-            # Cor do contorno/sombra (opcional, para efeito 3D)
-            shadow_color = tuple(max(0, c-40) for c in piece_color) # Cor ligeiramente mais escura
-
-            # Desenhar sombra/borda (opcional)
-            pygame.draw.circle(screen, shadow_color, (center_x + 2, center_y + 2), radius)
-            # Desenhar peça principal
-            pygame.draw.circle(screen, piece_color, (center_x, center_y), radius)
-
-            # Desenhar indicação de Rei
-            if piece == WHITE_KING or piece == BLACK_KING:
-                # Coroa/Estrela simples no centro
-                king_color = COLOR_BLACK if piece == WHITE_KING else COLOR_WHITE # Cor contrastante
-                # Desenha um ponto central ou uma pequena estrela/coroa
-                pygame.draw.circle(screen, king_color, (center_x, center_y), radius // 3)
-
-    # 3. Desenhar a seleção (borda amarela na casa selecionada)
-    if selected_piece_pos:
-        row, col = selected_piece_pos
-        sel_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-        pygame.draw.rect(sel_surface, COLOR_SELECTED_BORDER, (0, 0, square_size, square_size), 4) # Borda
-        screen.blit(sel_surface, (col * square_size, row * square_size))
-
-    # 4. Desenhar os movimentos possíveis (círculos nos destinos)
-    if possible_paths:
-        move_radius = square_size // 5 # Raio menor para indicar destino
-        for path in possible_paths:
-            if not path or len(path) < 2: continue # Ignora caminhos inválidos
-            end_row, end_col = path[-1] # Pega a coordenada final do caminho
-
-            move_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-            pygame.draw.circle(move_surface, COLOR_POSSIBLE_MOVE,
-                               (square_size // 2, square_size // 2), move_radius)
-            screen.blit(move_surface, (end_col * square_size, end_row * square_size))
\ No newline at end of file
+            selected = selected_piece_pos is not None and tuple(selected_piece_pos) == (row, col)
+            marked = (row, col) in targets
+            if piece != EMPTY or selected or marked:
+                _draw_square(screen, sprites, square_size, row, col, piece, selected, marked)
+
+
+class BoardRenderer:
+    """
+    Desenho incremental do tabuleiro: draw() só redesenha as casas cuja peça, seleção ou
+    marcador mudou desde o frame anterior e retorna os retângulos alterados (lista vazia
+    se nada mudou). invalidate() obriga a redesenhar tudo no próximo frame.
+    """
+
+    def __init__(self, square_size):
+        self.square_size = square_size
+        self.sprites = get_sprites(square_size)
+        self._drawn = None # (peça, selecionada, marcada) desenhada em cada casa
+
+    def invalidate(self):
+        self._drawn = None
+
+    def draw(self, screen, board, selected_piece_pos, possible_paths):
+        square_size = self.square_size
+        selected = tuple(selected_piece_pos) if selected_piece_pos else None
+        targets = _move_targets(possible_paths)
+        state = [(board[row][col], (row, col) == selected, (row, col) in targets)
+                 for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+        drawn = self._drawn
+        if drawn is None: # Primeiro frame: o tabuleiro todo
+            screen.blit(self.sprites['background'], (0, 0))
+            for index, square in enumerate(state):
+                if square != (EMPTY, False, False):
+                    _draw_square(screen, self.sprites, square_size, *divmod(index, BOARD_SIZE), *square)
+            self._drawn = state
+            return [pygame.Rect(0, 0, BOARD_SIZE * square_size, BOARD_SIZE * square_size)]
+        dirty_rects = []
+        for index, square in enumerate(state):
+            if square != drawn[index]:
+                dirty_rects.append(_draw_square(screen, self.sprites, square_size, *divmod(index, BOARD_SIZE), *square))
+        self._drawn = state
+        return dirty_rects
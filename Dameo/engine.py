@@ -0,0 +1,28 @@
+# engine.py
+# Núcleo headless do jogo num só módulo: regras (utils, game_logic), posição compacta
+# (position), IA (ia_dameo) e jogos sem interface (run_headless_game). Nenhum destes módulos
+# importa o pygame e, ao importá-los, só são construídas as tabelas pré-calculadas (raios,
+# chaves de Zobrist); o livro de aberturas, as tabelas de finais, a procura paralela e o
+# NumPy só são carregados quando são usados. A interface (main.py, Dameo.main_pygame,
+# Dameo.menu) é a única parte que depende do pygame.
+#
+# Uso (ex.: processos de análise em lote, que arrancam muitas vezes):
+#   from Dameo.engine import Position, get_ai_player
+#   path = get_ai_player('medio').choose_move(Position.from_fen(text))
+
+from Dameo.utils import (
+    BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING,
+    MoveList, MoveUndo, make_move, unmake_move, apply_move,
+    generate_legal_moves, get_winner, count_pieces, run_headless_game
+)
+from Dameo.game_logic import create_board
+from Dameo.position import Position, INITIAL_FEN
+from Dameo.ia_dameo import AIPlayer, SearchAborted, get_ai_player, get_ai_player_from_spec, parse_ai_spec
+
+__all__ = [
+    'BOARD_SIZE', 'EMPTY', 'WHITE_MAN', 'BLACK_MAN', 'WHITE_KING', 'BLACK_KING',
+    'MoveList', 'MoveUndo', 'make_move', 'unmake_move', 'apply_move',
+    'generate_legal_moves', 'get_winner', 'count_pieces', 'run_headless_game',
+    'create_board', 'Position', 'INITIAL_FEN',
+    'AIPlayer', 'SearchAborted', 'get_ai_player', 'get_ai_player_from_spec', 'parse_ai_spec',
+]
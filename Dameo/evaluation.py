@@ -0,0 +1,185 @@
+# evaluation.py
+# Pesos das heurísticas e avaliação incremental do tabuleiro.
+# O IncrementalEvaluator mantém os termos de material, avanço, controlo do centro,
+# segurança e estrutura atualizados a cada make/unmake, recalculando apenas as casas
+# tocadas pelo movimento (e as vizinhas diagonais de que esses termos dependem).
+# O resultado é idêntico ao de AIPlayer.evaluate_board.
+
+from Dameo.utils import (
+    BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING,
+    get_all_captures_for_player
+)
+from Dameo.board_tables import ( # Vizinhas, raios e passos pré-calculados por casa
+    DIAGONALS, RAYS, WHITE_MAN_STEPS, BLACK_MAN_STEPS, SAFETY_NEIGHBOURS, DIAGONAL_NEIGHBOURS
+)
+
+# --- Constantes para Heurísticas (usadas por evaluate_board e pelo IncrementalEvaluator) ---
+MOBILITY_WEIGHT = 0.1
+CENTER_CONTROL_WEIGHT = 0.05
+KING_ADVANCEMENT_WEIGHT = 0.08
+PAWN_ADVANCEMENT_WEIGHT = 0.05
+CENTER_START = 2
+CENTER_END = BOARD_SIZE - 1 - CENTER_START
+SAFETY_WEIGHT = 0.04
+STRUCTURE_WEIGHT = 0.03
+WIN_SCORE = 10000 # Posições ganhas valem +/-(WIN_SCORE + peças do vencedor)
+
+PIECE_VALUES = {WHITE_MAN: 1, BLACK_MAN: -1, WHITE_KING: 3, BLACK_KING: -3}
+
+# Índices dos termos (todos inteiros, combinados com os pesos só na avaliação final)
+(T_MATERIAL, T_WHITE_PAWN_ADV, T_BLACK_PAWN_ADV, T_WHITE_KING_ADV, T_BLACK_KING_ADV,
+ T_WHITE_CENTER, T_BLACK_CENTER, T_WHITE_SAFETY, T_BLACK_SAFETY,
+ T_WHITE_STRUCTURE, T_BLACK_STRUCTURE) = range(11)
+NUM_TERMS = 11
+
+MAN_STEPS = {WHITE_MAN: WHITE_MAN_STEPS, BLACK_MAN: BLACK_MAN_STEPS}
+
+def _in_bounds(r, c):
+    return 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE
+
+# Casas cujos termos podem mudar quando (r, c) muda: a própria e as diagonais a distância 1 e 2
+_AFFECTED_SQUARES = [[[(r, c)] + [(r + k * dr, c + k * dc) for k in (1, 2) for dr, dc in DIAGONALS
+                                  if _in_bounds(r + k * dr, c + k * dc)]
+                      for c in range(BOARD_SIZE)] for r in range(BOARD_SIZE)]
+
+def is_square_safe(board, r, c, player):
+    """Mesma regra que AIPlayer.is_safe."""
+    for dr, (r1, c1), (r2, c2) in SAFETY_NEIGHBOURS[r][c]:
+        if board[r2][c2] != EMPTY: continue
+        attacker = board[r1][c1]
+        if attacker == EMPTY or attacker.lower() == player: continue
+        # O atacante tem de conseguir capturar na direção (-dr, -dc)
+        if attacker == WHITE_KING or attacker == BLACK_KING: return False
+        if attacker == WHITE_MAN and dr == 1: return False
+        if attacker == BLACK_MAN and dr == -1: return False
+    return True
+
+def count_diagonal_friends(board, r, c, player):
+    """Mesma regra que AIPlayer.count_adjacent_pieces."""
+    count = 0
+    for nr, nc in DIAGONAL_NEIGHBOURS[r][c]:
+        piece = board[nr][nc]
+        if piece != EMPTY and piece.lower() == player:
+            count += 1
+    return count
+
+def square_terms(board, r, c):
+    """Contribuição da casa (r, c) para cada termo (None se estiver vazia)."""
+    piece = board[r][c]
+    if piece == EMPTY: return None
+    terms = [0] * NUM_TERMS
+    terms[T_MATERIAL] = PIECE_VALUES[piece]
+    player = piece.lower()
+    is_center = CENTER_START <= r <= CENTER_END and CENTER_START <= c <= CENTER_END
+    if player == WHITE_MAN:
+        terms[T_WHITE_KING_ADV if piece == WHITE_KING else T_WHITE_PAWN_ADV] = BOARD_SIZE - 1 - r
+        terms[T_WHITE_SAFETY] = 1 if is_square_safe(board, r, c, WHITE_MAN) else 0
+        terms[T_WHITE_STRUCTURE] = count_diagonal_friends(board, r, c, WHITE_MAN)
+        if is_center: terms[T_WHITE_CENTER] = 1
+    else:
+        terms[T_BLACK_KING_ADV if piece == BLACK_KING else T_BLACK_PAWN_ADV] = r
+        terms[T_BLACK_SAFETY] = 1 if is_square_safe(board, r, c, BLACK_MAN) else 0
+        terms[T_BLACK_STRUCTURE] = count_diagonal_friends(board, r, c, BLACK_MAN)
+        if is_center: terms[T_BLACK_CENTER] = 1
+    return terms
+
+def count_normal_moves(board, squares):
+    """Número de movimentos sem captura das peças nas casas dadas (a 'mobilidade')."""
+    total = 0
+    for r, c in squares:
+        piece = board[r][c]
+        if piece == WHITE_KING or piece == BLACK_KING:
+            for ray in RAYS[r][c]:
+                for nr, nc in ray:
+                    if board[nr][nc] != EMPTY: break
+                    total += 1
+        else:
+            for nr, nc in MAN_STEPS[piece][r][c]:
+                if board[nr][nc] == EMPTY:
+                    total += 1
+    return total
+
+def combine_terms(totals, white_mobility, black_mobility):
+    """Combina os termos com os pesos, pela mesma ordem de AIPlayer.evaluate_board."""
+    score = totals[T_MATERIAL]
+    score += totals[T_WHITE_PAWN_ADV] * PAWN_ADVANCEMENT_WEIGHT
+    score -= totals[T_BLACK_PAWN_ADV] * PAWN_ADVANCEMENT_WEIGHT
+    score += totals[T_WHITE_KING_ADV] * KING_ADVANCEMENT_WEIGHT
+    score -= totals[T_BLACK_KING_ADV] * KING_ADVANCEMENT_WEIGHT
+    score += totals[T_WHITE_CENTER] * CENTER_CONTROL_WEIGHT
+    score -= totals[T_BLACK_CENTER] * CENTER_CONTROL_WEIGHT
+    score += totals[T_WHITE_SAFETY] * SAFETY_WEIGHT
+    score -= totals[T_BLACK_SAFETY] * SAFETY_WEIGHT
+    score += totals[T_WHITE_STRUCTURE] * STRUCTURE_WEIGHT / 2 # Cada adjacência conta para duas peças
+    score -= totals[T_BLACK_STRUCTURE] * STRUCTURE_WEIGHT / 2
+    score += (white_mobility - black_mobility) * MOBILITY_WEIGHT
+    return score
+
+
+class IncrementalEvaluator:
+    """
+    Avaliação incremental ligada a um tabuleiro. Depois de cada make_move/unmake_move
+    sobre esse tabuleiro chama-se update(board, undo) com o MoveUndo do movimento.
+    """
+
+    def __init__(self, board):
+        self.reset(board)
+
+    def reset(self, board):
+        """Recalcula tudo a partir do tabuleiro."""
+        self.totals = [0] * NUM_TERMS
+        self.terms = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        self.white_pieces = set()
+        self.black_pieces = set()
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                self._refresh_square(board, r, c)
+                piece = board[r][c]
+                if piece != EMPTY:
+                    (self.white_pieces if piece.lower() == WHITE_MAN else self.black_pieces).add((r, c))
+
+    def _refresh_square(self, board, r, c):
+        totals = self.totals
+        old = self.terms[r][c]
+        if old is not None:
+            for i in range(NUM_TERMS):
+                totals[i] -= old[i]
+        new = square_terms(board, r, c)
+        if new is not None:
+            for i in range(NUM_TERMS):
+                totals[i] += new[i]
+        self.terms[r][c] = new
+
+    def update(self, board, undo):
+        """Atualiza os termos depois de make_move ou unmake_move (o mesmo MoveUndo serve para ambos)."""
+        changed = [undo.start, undo.end]
+        changed.extend(pos for pos, _ in undo.captured)
+        affected = set()
+        for r, c in changed:
+            affected.update(_AFFECTED_SQUARES[r][c])
+            piece = board[r][c]
+            self.white_pieces.discard((r, c))
+            self.black_pieces.discard((r, c))
+            if piece != EMPTY:
+                (self.white_pieces if piece.lower() == WHITE_MAN else self.black_pieces).add((r, c))
+        for r, c in affected:
+            self._refresh_square(board, r, c)
+
+    def evaluate(self, board):
+        """Avaliação completa (igual a AIPlayer.evaluate_board) a partir dos termos mantidos."""
+        white_count = len(self.white_pieces)
+        black_count = len(self.black_pieces)
+        if not white_count: return -WIN_SCORE - black_count
+        if not black_count: return WIN_SCORE + white_count
+
+        # A mobilidade também decide o fim do jogo: quem tem movimentos normais pode jogar,
+        # e só sem eles é preciso procurar capturas.
+        white_mobility = count_normal_moves(board, self.white_pieces)
+        black_mobility = count_normal_moves(board, self.black_pieces)
+        white_can_move = white_mobility > 0 or bool(get_all_captures_for_player(board, WHITE_MAN))
+        black_can_move = black_mobility > 0 or bool(get_all_captures_for_player(board, BLACK_MAN))
+        if not white_can_move and not black_can_move: return 0
+        if not white_can_move: return -WIN_SCORE - black_count
+        if not black_can_move: return WIN_SCORE + white_count
+
+        return combine_terms(self.totals, white_mobility, black_mobility)
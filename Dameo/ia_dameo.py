@@ -1,8 +1,19 @@
 # ia_dameo.py
 import random
 import math # Para +/- infinito
+import time # Orçamento de tempo por jogada (aprofundamento iterativo)
 # Importa funções necessárias de utils
 from Dameo import utils # type: ignore
+from Dameo import bitboard # Representação alternativa (máscaras de 64 bits)
+from Dameo import transposition # Hashing de Zobrist e tabela de transposição
+from Dameo.search_stats import SearchStats # Estatísticas de cada procura
+from Dameo.evaluation import ( # Pesos das heurísticas e avaliação incremental
+    MOBILITY_WEIGHT, CENTER_CONTROL_WEIGHT, KING_ADVANCEMENT_WEIGHT, PAWN_ADVANCEMENT_WEIGHT,
+    CENTER_START, CENTER_END, SAFETY_WEIGHT, STRUCTURE_WEIGHT, WIN_SCORE,
+    IncrementalEvaluator, is_square_safe, count_diagonal_friends
+)
+from Dameo.board_tables import RAYS, DIAGONAL_NEIGHBOURS # Tabelas pré-calculadas por casa
+from Dameo.position import Position, board_and_player # Posição compacta (entradas da IA)
 from Dameo.utils import ( # type: ignore
     BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING, # Constantes
     get_all_captures_for_player, get_possible_moves, is_game_over, get_winner, # Lógica Jogo
@@ -10,51 +21,131 @@ from Dameo.utils import ( # type: ignore
     promote_pawn # Necessário para verificar promoção
 )
 
-# --- Constantes para Heurísticas (usadas por evaluate_board) ---
-MOBILITY_WEIGHT = 0.1
-CENTER_CONTROL_WEIGHT = 0.05
-KING_ADVANCEMENT_WEIGHT = 0.08
-CENTER_START = 2
-CENTER_END = BOARD_SIZE - 1 - CENTER_START
-SAFETY_WEIGHT = 0.04
-STRUCTURE_WEIGHT = 0.03
+# --- Procura ---
+DIFFICULTY_DEPTHS = {'medio': 3, 'dificil': 4} # Profundidade quando não há orçamento
+MAX_SEARCH_DEPTH = 64 # Limite do aprofundamento iterativo com orçamento de tempo/nós
+ABORT_CHECK_INTERVAL = 32 # Nós entre verificações do relógio
+PONDER_WIDTH = 4 # Respostas mais prováveis do adversário aprofundadas durante o ponder
+BATCH_EVAL_MIN_BOARDS = 8 # A partir daqui evaluate_boards usa o NumPy (custo fixo de alguns ms)
+KILLER_SLOTS = 2 # Movimentos killer guardados por ply
+ASPIRATION_WINDOW = 0.5 # Meia largura da janela à volta do score da iteração anterior
+NULL_WINDOW = 1e-6 # Janela nula do PVS: menor que qualquer diferença entre duas avaliações
+
+class SearchAborted(Exception):
+    """Lançada dentro do minimax quando o orçamento da jogada se esgota ou a procura é parada."""
 
 class AIPlayer:
-    def __init__(self, difficulty):
+    def __init__(self, difficulty, use_bitboards=False, tt_size=transposition.DEFAULT_TT_SIZE,
+                 tt_replacement='depth', max_depth=None, time_limit=None, node_limit=None,
+                 incremental_eval=True, parallel_workers=None, stats_callback=None,
+                 ponder=False, ponder_width=PONDER_WIDTH, opening_book=None, tablebases=None,
+                 killer_history=True, pvs=True, aspiration_window=ASPIRATION_WINDOW):
         self.difficulty = difficulty
+        # Com use_bitboards=True a geração de movimentos e a deteção de fim de jogo
+        # usam Dameo.bitboard (gerador legal com captura mais longa obrigatória). A procura
+        # mantém o estado em bitboards do nó atual em self._bitboards (bitboard.apply_undo a
+        # cada movimento, com as capturas do make/unmake do tabuleiro em listas); o tabuleiro
+        # só é convertido na raiz.
+        self.use_bitboards = use_bitboards
+        self._bitboards = None
+        # A tabela persiste entre jogadas do mesmo jogo (tt_size=0 desativa)
+        self.tt = transposition.TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        # Orçamento por jogada: time_limit em segundos, node_limit em nós do minimax.
+        # Com orçamento e sem max_depth, aprofunda até o orçamento acabar.
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        if max_depth is None:
+            if time_limit is not None or node_limit is not None:
+                max_depth = MAX_SEARCH_DEPTH
+            else:
+                max_depth = DIFFICULTY_DEPTHS.get(difficulty, DIFFICULTY_DEPTHS['dificil'])
+        self.max_depth = max_depth
+        # Avaliação incremental (Dameo.evaluation) durante a procura; o resultado é igual
+        # ao de evaluate_board, mas só as casas tocadas por cada movimento são recalculadas.
+        self.incremental_eval = incremental_eval
+        self._evaluator = None
+        # parallel_workers > 1: os movimentos da raiz são procurados num pool de processos
+        # (Dameo.parallel_search), reutilizado entre jogadas. Fechar com close().
+        self.parallel_workers = parallel_workers
+        self._parallel_searcher = None
+        # Nos processos do pool: chamado a cada ABORT_CHECK_INTERVAL nós para ler o estado
+        # partilhado (limite da raiz, cancelamento); pode interromper a procura com uma exceção.
+        self._search_hook = None
+        self._worker_options = {'use_bitboards': use_bitboards, 'tt_size': tt_size,
+                                'tt_replacement': tt_replacement, 'incremental_eval': incremental_eval,
+                                'killer_history': killer_history, 'pvs': pvs}
+        # Estatísticas da última procura (Dameo.search_stats); stats_callback(stats) é chamado
+        # no fim de cada procura (ex.: search_stats.print_search_stats).
+        self.stats = SearchStats()
+        self.stats_callback = stats_callback
+        # Estado da procura em curso
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self._deadline = None
+        self._abort_enabled = False
+        self._pv_moves = {}
+        # Ordenação dos movimentos normais: killers (movimentos que provocaram um corte beta no
+        # mesmo ply) e histórico [casa de origem][casa de destino] de cada jogador, somado em
+        # cada corte. Os killers recomeçam em cada procura e o histórico é dividido por 2.
+        self.killer_history = killer_history
+        self._killers = []
+        self._history = {player: [[0] * (BOARD_SIZE * BOARD_SIZE) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+                         for player in (WHITE_MAN, BLACK_MAN)}
+        # Procura de variante principal (janela nula para os movimentos depois do primeiro) e
+        # janela de aspiração à volta do score da iteração anterior (None ou 0 desativa).
+        self.pvs = pvs
+        self.aspiration_window = aspiration_window
+        # Pedido de paragem vindo de outra thread (stop()); quem lança a procura repõe-no a False
+        self.stop_requested = False
+        # Ponder: durante a vez do adversário prepara respostas às suas jogadas prováveis
+        # (ver ponder()); ponder_width é o nº de jogadas aprofundadas depois da 1.ª passagem.
+        self.pondering_enabled = ponder
+        self.ponder_width = ponder_width
+        self._ponder_answers = {} # hash da posição -> (caminho, profundidade, score)
+        self._last_move_depth = 0 # Profundidade da última procura de choose_move
+        self.last_move_from_ponder = False
+        self.ponder_hits = 0
+        # Livro de aberturas (Dameo.opening_book): caminho do ficheiro ou OpeningBook já aberto.
+        # Enquanto a posição estiver no livro, medio/dificil jogam sem procurar.
+        self._owns_book = isinstance(opening_book, str)
+        if self._owns_book:
+            from Dameo.opening_book import OpeningBook # Só carrega mmap/struct se for usado
+            opening_book = OpeningBook(opening_book)
+        self.opening_book = opening_book
+        self.last_move_from_book = False
+        # Tabelas de finais (Dameo.tablebase): pasta das tabelas ou Tablebases já aberto.
+        # Nas posições cobertas, medio/dificil jogam a jogada perfeita sem procurar.
+        self._owns_tablebases = isinstance(tablebases, str)
+        if self._owns_tablebases:
+            from Dameo.tablebase import Tablebases
+            tablebases = Tablebases(tablebases)
+        self.tablebases = tablebases
+        self.last_move_from_tablebase = False
+
+    def _board_bitboards(self, board):
+        """Bitboards de 'board': o estado mantido pela procura ou, fora dela, uma conversão."""
+        if self._bitboards is not None: return self._bitboards
+        return bitboard.from_board(board)
+
+    def _get_winner(self, board):
+        if self.use_bitboards:
+            return bitboard.get_winner(self._board_bitboards(board))
+        return get_winner(board)
+
+    def _generate_moves(self, board, player):
+        """Movimentos legais (utils.MoveList), gerados uma única vez por nó."""
+        if self.use_bitboards:
+            return bitboard.generate_moves(self._board_bitboards(board), player)
+        return utils.generate_legal_moves(board, player)
 
     def is_safe(self, board, r, c, player):
         """Verifica se uma peça na posição (r, c) está segura de captura imediata."""
-        opponent = BLACK_MAN if player == WHITE_MAN else WHITE_MAN
-        opponent_king = BLACK_KING if player == WHITE_MAN else WHITE_KING
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]  # Todas as direções diagonais
-
-        for dr, dc in directions:
-            # Verificar captura simples do oponente
-            nr1, nc1 = r + dr, c + dc
-            nr2, nc2 = r + 2 * dr, c + 2 * dc
-
-            if utils.is_within_bounds(nr1, nc1) and utils.is_within_bounds(nr2, nc2):
-                opponent_piece = board[nr1][nc1]
-                landing_square = board[nr2][nc2]
-
-                if landing_square == EMPTY and opponent_piece != EMPTY and opponent_piece.lower() == opponent.lower():
-                    # Verificar se o oponente pode capturar esta peça
-                    opponent_directions = utils.get_piece_directions(opponent_piece, capture_only=True)
-                    for odr, odc in opponent_directions:
-                        if odr == -dr and odc == -dc: # Direção oposta à da nossa peça
-                            return False
-        return True
+        # Percorre as vizinhas diagonais pré-calculadas (Dameo.board_tables)
+        return is_square_safe(board, r, c, player.lower())
 
     def count_adjacent_pieces(self, board, r, c, player):
         """Conta o número de peças adjacentes diagonalmente do mesmo jogador."""
-        count = 0
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if utils.is_within_bounds(nr, nc) and board[nr][nc] != EMPTY and board[nr][nc].lower() == player.lower():
-                count += 1
-        return count
+        return count_diagonal_friends(board, r, c, player.lower())
 
     def quick_evaluate_move(self, board, path, piece_type):
         """Avalia rapidamente um movimento para fins de ordenação."""
@@ -82,11 +173,9 @@ class AIPlayer:
         # Pequena pontuação para mover para uma casa segura (simplificado)
         # Podemos verificar se a casa de destino não está adjacente a um oponente
         opponent = BLACK_MAN if piece_type.lower() == WHITE_MAN.lower() else WHITE_MAN
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
         is_destination_attacked = False
-        for dr, dc in directions:
-            nr, nc = end_pos[0] + dr, end_pos[1] + dc
-            if utils.is_within_bounds(nr, nc) and board[nr][nc] != EMPTY and board[nr][nc].lower() == opponent.lower():
+        for nr, nc in DIAGONAL_NEIGHBOURS[end_pos[0]][end_pos[1]]:
+            if board[nr][nc] != EMPTY and board[nr][nc].lower() == opponent:
                 is_destination_attacked = True
                 break
         if not is_destination_attacked:
@@ -94,105 +183,485 @@ class AIPlayer:
 
         return score
 
-    def minimax(self, board, current_player, depth, alpha=-math.inf, beta=math.inf, possible_paths=None):
+    def _new_search_ordering(self):
+        """Início de uma procura: killers vazios e histórico envelhecido (metade)."""
+        self._killers = []
+        for table in self._history.values():
+            for row in table:
+                for to_sq, value in enumerate(row):
+                    if value: row[to_sq] = value >> 1
+
+    def _order_moves(self, board, paths, current_player, depth, ply):
+        """
+        Ordena 'paths' no lugar. Movimentos normais: killers deste ply primeiro, depois por
+        histórico (ordenação barata, sem olhar para o tabuleiro). Capturas (ou sem killers e
+        histórico): quick_evaluate_move, só para profundidades maiores. Retorna os killers.
+        """
+        if self.killer_history and not getattr(paths, 'is_capture', True):
+            history = self._history[current_player]
+            paths.sort(key=lambda path: history[path[0][0] * BOARD_SIZE + path[0][1]][path[-1][0] * BOARD_SIZE + path[-1][1]],
+                       reverse=True)
+            killers = self._killers[ply] if ply < len(self._killers) else ()
+            for killer in reversed(killers):
+                if killer in paths:
+                    paths.remove(killer)
+                    paths.insert(0, killer)
+            return killers
+        if depth > 1: # Evitar ordenar na camada folha
+            paths.sort(key=lambda path: self.quick_evaluate_move(board, path, board[path[0][0]][path[0][1]]),
+                       reverse=(current_player == WHITE_MAN))
+        return ()
+
+    def _record_quiet_cutoff(self, current_player, path, depth, ply):
+        """Um movimento normal provocou um corte beta: passa a killer do ply e soma depth² ao histórico."""
+        killers = self._killers
+        while len(killers) <= ply:
+            killers.append([])
+        slots = killers[ply]
+        if path not in slots:
+            slots.insert(0, path)
+            del slots[KILLER_SLOTS:]
+        (from_r, from_c), (to_r, to_c) = path[0], path[-1]
+        self._history[current_player][from_r * BOARD_SIZE + from_c][to_r * BOARD_SIZE + to_c] += depth * depth
+
+    def minimax(self, board, current_player, depth, alpha=-math.inf, beta=math.inf, possible_paths=None,
+                position_hash=None, ply=0):
         """
         Algoritmo Minimax com poda Alpha-Beta e ordenação de movimentos.
         MODIFICADO: Escolhe aleatoriamente entre os melhores movimentos com a mesma avaliação.
+        Consulta e preenche a tabela de transposição (self.tt); position_hash é o hash de
+        Zobrist da posição, atualizado incrementalmente a cada movimento.
+        Fora da raiz, com self.pvs, os movimentos depois do primeiro são procurados com janela
+        nula e só voltam a ser procurados com a janela toda se a melhorarem.
         """
         opponent = BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
-
-        if depth == 0 or not utils.has_moves(board, current_player):
-             return self.evaluate_board(board), None
-
+        if position_hash is None:
+            position_hash = transposition.compute_hash(board, current_player)
+
+        self.nodes_searched += 1
+        if self.stop_requested: raise SearchAborted()
+        stats = self.stats
+        if ply > stats.max_ply: stats.max_ply = ply
+        if self._abort_enabled:
+            if self.node_limit is not None and self.nodes_searched >= self.node_limit:
+                raise SearchAborted()
+            if self._deadline is not None and self.nodes_searched % ABORT_CHECK_INTERVAL == 0 and \
+               time.perf_counter() >= self._deadline:
+                raise SearchAborted()
+            if self._search_hook is not None and self.nodes_searched % ABORT_CHECK_INTERVAL == 0:
+                self._search_hook()
+
+        # --- Tabela de transposição ---
+        tt = self.tt
+        tt_move = None
+        alpha_orig, beta_orig = alpha, beta
+        if tt is not None:
+            entry = tt.probe(position_hash)
+            stats.tt_probes += 1
+            if entry is not None:
+                stats.tt_hits += 1
+                tt_move = entry.best_move
+                # Na raiz não cortamos: é preciso escolher (aleatoriamente) entre os melhores caminhos
+                if ply > 0 and entry.depth >= depth:
+                    if entry.flag == transposition.EXACT:
+                        stats.tt_cutoffs += 1
+                        return entry.score, tt_move
+                    elif entry.flag == transposition.LOWER_BOUND:
+                        alpha = max(alpha, entry.score)
+                    else:
+                        beta = min(beta, entry.score)
+                    if alpha >= beta:
+                        stats.tt_cutoffs += 1
+                        return entry.score, tt_move
+
+        if depth == 0:
+            return self._evaluate_leaf(board, position_hash), None
+        # Uma só geração por nó: serve para detetar o fim do jogo e para iterar os movimentos
+        # (com a regra da captura mais longa obrigatória).
         if possible_paths is None:
-             paths_to_evaluate = self.get_all_normal_paths(board, current_player)
-             if not paths_to_evaluate:
-                 paths_to_evaluate = get_all_captures_for_player(board, current_player)
+            paths_to_evaluate = self._generate_moves(board, current_player)
         else:
-             paths_to_evaluate = possible_paths
+            paths_to_evaluate = possible_paths
 
         if not paths_to_evaluate:
-             return self.evaluate_board(board), None
-
-        # Ordenar os movimentos (apenas para profundidades maiores)
-        if depth > 1:  # Evitar ordenar na camada folha
-            paths_to_evaluate.sort(key=lambda path: self.quick_evaluate_move(board, path, board[path[0][0]][path[0][1]]), reverse=(current_player == WHITE_MAN))
+             return self._evaluate_leaf(board, position_hash), None
+        stats.interior_nodes += 1
+        stats.moves_generated += len(paths_to_evaluate)
+
+        # Ordenar os movimentos: killers e histórico ou quick_evaluate_move
+        killers = self._order_moves(board, paths_to_evaluate, current_player, depth, ply)
+        # A linha principal da iteração anterior e o movimento da tabela são tentados primeiro
+        for first_move in (tt_move, self._pv_moves.get(position_hash)):
+            if first_move is not None and first_move in paths_to_evaluate:
+                paths_to_evaluate.remove(first_move)
+                paths_to_evaluate.insert(0, first_move)
 
         best_paths_list = []
+        evaluator = self._evaluator
+        bitboards = self._bitboards # Estado em bitboards deste nó (use_bitboards), reposto após cada filho
+        null_window = self.pvs and ply > 0 # Na raiz todos os empates têm de ser conhecidos
 
         if current_player == WHITE_MAN: # Maximizando
-            max_eval = -math.inf
+            best_eval = -math.inf
 
-            for path in paths_to_evaluate:
-                temp_board = [row[:] for row in board]
+            for move_index, path in enumerate(paths_to_evaluate):
                 start_r, start_c = path[0]
                 piece_type = board[start_r][start_c]
                 if piece_type == EMPTY or piece_type.lower() != current_player.lower(): continue
 
-                utils.apply_move(temp_board, path, piece_type)
-                evaluation, _ = self.minimax(temp_board, opponent, depth - 1, alpha, beta)
-
-                if evaluation > max_eval:
-                    max_eval = evaluation
+                stats.moves_searched += 1
+                undo = utils.make_move(board, path)
+                if evaluator is not None: evaluator.update(board, undo)
+                if bitboards is not None: self._bitboards = bitboard.apply_undo(bitboards, undo)
+                child_hash = transposition.update_hash(position_hash, undo.piece, path, undo.final_piece, undo.captured)
+                is_quiet = not undo.captured
+                try:
+                    if null_window and best_paths_list:
+                        evaluation, _ = self.minimax(board, opponent, depth - 1, alpha, alpha + NULL_WINDOW, position_hash=child_hash, ply=ply + 1)
+                        if alpha < evaluation < beta: # Melhorou: é preciso o valor exato
+                            stats.pvs_researches += 1
+                            evaluation, _ = self.minimax(board, opponent, depth - 1, alpha, beta, position_hash=child_hash, ply=ply + 1)
+                    else:
+                        evaluation, _ = self.minimax(board, opponent, depth - 1, alpha, beta, position_hash=child_hash, ply=ply + 1)
+                finally:
+                    utils.unmake_move(board, undo)
+                    if evaluator is not None: evaluator.update(board, undo)
+                    self._bitboards = bitboards
+
+                if evaluation > best_eval:
+                    best_eval = evaluation
                     best_paths_list = [path]
-                elif evaluation == max_eval:
+                elif evaluation == best_eval:
                     best_paths_list.append(path)
 
                 alpha = max(alpha, evaluation)
-                if beta <= alpha: break
-
-            chosen_path = random.choice(best_paths_list) if best_paths_list else None
-            return max_eval, chosen_path
+                if beta <= alpha:
+                    stats.record_cutoff(move_index)
+                    if is_quiet and self.killer_history:
+                        if path in killers: stats.killer_cutoffs += 1
+                        self._record_quiet_cutoff(current_player, path, depth, ply)
+                    break
 
         else: # Minimizando (Preto)
-            min_eval = math.inf
+            best_eval = math.inf
 
-            for path in paths_to_evaluate:
-                temp_board = [row[:] for row in board]
+            for move_index, path in enumerate(paths_to_evaluate):
                 start_r, start_c = path[0]
                 piece_type = board[start_r][start_c]
                 if piece_type == EMPTY or piece_type.lower() != current_player.lower(): continue
 
-                utils.apply_move(temp_board, path, piece_type)
-                evaluation, _ = self.minimax(temp_board, opponent, depth - 1, alpha, beta)
-
-                if evaluation < min_eval:
-                    min_eval = evaluation
+                stats.moves_searched += 1
+                undo = utils.make_move(board, path)
+                if evaluator is not None: evaluator.update(board, undo)
+                if bitboards is not None: self._bitboards = bitboard.apply_undo(bitboards, undo)
+                child_hash = transposition.update_hash(position_hash, undo.piece, path, undo.final_piece, undo.captured)
+                is_quiet = not undo.captured
+                try:
+                    if null_window and best_paths_list:
+                        evaluation, _ = self.minimax(board, opponent, depth - 1, beta - NULL_WINDOW, beta, position_hash=child_hash, ply=ply + 1)
+                        if alpha < evaluation < beta: # Melhorou: é preciso o valor exato
+                            stats.pvs_researches += 1
+                            evaluation, _ = self.minimax(board, opponent, depth - 1, alpha, beta, position_hash=child_hash, ply=ply + 1)
+                    else:
+                        evaluation, _ = self.minimax(board, opponent, depth - 1, alpha, beta, position_hash=child_hash, ply=ply + 1)
+                finally:
+                    utils.unmake_move(board, undo)
+                    if evaluator is not None: evaluator.update(board, undo)
+                    self._bitboards = bitboards
+
+                if evaluation < best_eval:
+                    best_eval = evaluation
                     best_paths_list = [path]
-                elif evaluation == min_eval:
+                elif evaluation == best_eval:
                     best_paths_list.append(path)
 
                 beta = min(beta, evaluation)
-                if beta <= alpha: break
-
-            chosen_path = random.choice(best_paths_list) if best_paths_list else None
-            return min_eval, chosen_path
+                if beta <= alpha:
+                    stats.record_cutoff(move_index)
+                    if is_quiet and self.killer_history:
+                        if path in killers: stats.killer_cutoffs += 1
+                        self._record_quiet_cutoff(current_player, path, depth, ply)
+                    break
+
+        chosen_path = random.choice(best_paths_list) if best_paths_list else None
+        if tt is not None and chosen_path is not None:
+            if best_eval <= alpha_orig: flag = transposition.UPPER_BOUND
+            elif best_eval >= beta_orig: flag = transposition.LOWER_BOUND
+            else: flag = transposition.EXACT
+            tt.store(position_hash, depth, flag, best_eval, chosen_path)
+        return best_eval, chosen_path
+
+    def search(self, board, current_player=None, possible_paths=None, max_depth=None):
+        """
+        'board' pode ser uma Position (o jogador por omissão é o que está a mover).
+        Aprofundamento iterativo até max_depth (por omissão self.max_depth), respeitando
+        self.time_limit / self.node_limit. A linha principal de cada iteração concluída
+        ordena os movimentos da seguinte. A partir da 2.ª iteração a raiz é procurada com
+        uma janela de aspiração (self.aspiration_window) à volta do score anterior; se o
+        resultado cair fora, o lado que falhou é aberto e a iteração repetida.
+        Retorna (score, caminho, profundidade concluída) da iteração mais profunda concluída.
+        A primeira iteração nunca é interrompida. As estatísticas ficam em self.stats.
+        """
+        if max_depth is None: max_depth = self.max_depth
+        board, current_player = board_and_player(board, current_player)
+        start_time = time.perf_counter()
+        self.stats = stats = SearchStats()
+        self._new_search_ordering()
+        if self.parallel_workers is not None and self.parallel_workers > 1:
+            result = self._parallel_search(board, current_player, possible_paths, max_depth)
+            self._finish_stats(start_time)
+            return result
+        self._deadline = start_time + self.time_limit if self.time_limit is not None else None
+        self.nodes_searched = 0
+        self._pv_moves = {}
+        root_hash = transposition.compute_hash(board, current_player)
+        best_score, best_path, completed_depth = None, None, 0
+        self._evaluator = IncrementalEvaluator(board) if self.incremental_eval else None
+        self._bitboards = bitboard.from_board(board) if self.use_bitboards else None
+
+        for depth in range(1, max_depth + 1):
+            window = self.aspiration_window
+            if window and completed_depth > 0 and abs(best_score) < WIN_SCORE:
+                alpha, beta = best_score - window, best_score + window
+            else:
+                alpha, beta = -math.inf, math.inf
+            self._abort_enabled = completed_depth > 0
+            try:
+                while True:
+                    root_paths = list(possible_paths) if possible_paths is not None else None
+                    score, path = self.minimax(board, current_player, depth, alpha, beta,
+                                               possible_paths=root_paths, position_hash=root_hash)
+                    if path is None or alpha < score < beta: break
+                    # Fora da janela: o score é só um limite, repete com esse lado aberto
+                    stats.aspiration_researches += 1
+                    if score <= alpha: alpha = -math.inf
+                    else: beta = math.inf
+            except SearchAborted:
+                break
+            finally:
+                self._abort_enabled = False
+            if path is None: break # Sem movimentos
+            best_score, best_path, completed_depth = score, path, depth
+            stats.nodes = self.nodes_searched
+            stats.record_iteration(depth, time.perf_counter() - start_time, score, path)
+            self._pv_moves = self._collect_pv(board, current_player, root_hash, path, depth)
+
+            if abs(score) >= WIN_SCORE: break # Resultado forçado: procurar mais fundo não muda nada
+            if self._deadline is not None and time.perf_counter() >= self._deadline: break
+            if self.node_limit is not None and self.nodes_searched >= self.node_limit: break
+
+        self._deadline = None
+        self._evaluator = None
+        self._bitboards = None
+        self.completed_depth = completed_depth
+        self._finish_stats(start_time)
+        return best_score, best_path, completed_depth
+
+    def _finish_stats(self, start_time):
+        stats = self.stats
+        stats.nodes = self.nodes_searched
+        stats.elapsed = time.perf_counter() - start_time
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def _parallel_search(self, board, current_player, possible_paths, max_depth):
+        """search() distribuído pelos processos do ParallelSearcher."""
+        if possible_paths is None:
+            possible_paths = self._generate_moves(board, current_player)
+        if not possible_paths:
+            return None, None, 0
+        if self._parallel_searcher is None:
+            from Dameo.parallel_search import ParallelSearcher # Só carrega multiprocessing se for usado
+            self._parallel_searcher = ParallelSearcher(self.difficulty, self.parallel_workers, self._worker_options)
+        searcher = self._parallel_searcher
+        score, path, completed_depth = searcher.search(board, current_player, possible_paths, max_depth,
+                                                       self.time_limit, self.node_limit, stats=self.stats,
+                                                       should_stop=lambda: self.stop_requested)
+        self.nodes_searched = searcher.nodes_searched
+        self.completed_depth = completed_depth
+        return score, path, completed_depth
+
+    def ponder(self, board, ai_player=None, max_depth=None):
+        """
+        Pensa na vez do adversário ('board' com o adversário a jogar); corre normalmente numa
+        thread e termina com stop(). Para cada resposta do adversário procura a nossa jogada
+        com profundidade crescente: primeiro todas a profundidade 1, depois só as ponder_width
+        mais fortes para o adversário (as mais prováveis). As jogadas preparadas ficam em
+        self._ponder_answers e a tabela de transposição fica preenchida para choose_move.
+        'board' pode ser uma Position (com o adversário a mover; ai_player é então opcional).
+        """
+        if self.difficulty == 'facil': return # Não procura, não há nada a preparar
+        board, to_move = board_and_player(board, copy=True)
+        if ai_player is None: ai_player = BLACK_MAN if to_move == WHITE_MAN else WHITE_MAN
+        opponent = BLACK_MAN if ai_player == WHITE_MAN else WHITE_MAN
+        replies = list(self._generate_moves(board, opponent))
+        self._ponder_answers = {}
+        if not replies: return
+        if max_depth is None: max_depth = MAX_SEARCH_DEPTH
+        reply_keys = []
+        for reply in replies:
+            undo = utils.make_move(board, reply)
+            reply_keys.append(transposition.compute_hash(board, ai_player))
+            utils.unmake_move(board, undo)
+        reply_scores = [0] * len(replies)
+        order = list(range(len(replies)))
+        # Sem orçamento: o ponder só termina com stop() ou em max_depth
+        saved_budget = (self.time_limit, self.node_limit)
+        self.time_limit = self.node_limit = None
+        if self.tt is not None: self.tt.new_search()
+        try:
+            for depth in range(1, max_depth + 1):
+                for index in (order if depth == 1 else order[:self.ponder_width]):
+                    if self.stop_requested: return
+                    undo = utils.make_move(board, replies[index])
+                    try:
+                        score, path, completed_depth = self.search(board, ai_player, max_depth=depth)
+                    finally:
+                        utils.unmake_move(board, undo)
+                    if path is None: continue
+                    previous = self._ponder_answers.get(reply_keys[index])
+                    if previous is None or completed_depth >= previous[1]:
+                        self._ponder_answers[reply_keys[index]] = (path, completed_depth, score)
+                        reply_scores[index] = score
+                # O adversário prefere as respostas que nos deixam pior
+                order.sort(key=lambda i: reply_scores[i], reverse=(opponent == WHITE_MAN))
+        finally:
+            self.time_limit, self.node_limit = saved_budget
+
+    def _take_ponder_answer(self, board, current_player, legal_paths):
+        """Jogada preparada pelo ponder para esta posição (caminho, profundidade, score) ou None."""
+        answers, self._ponder_answers = self._ponder_answers, {}
+        if not answers: return None
+        prepared = answers.get(transposition.compute_hash(board, current_player))
+        if prepared is None or prepared[0] not in legal_paths: return None
+        return prepared
+
+    def stop(self):
+        """
+        Pede a uma procura em curso noutra thread que termine o mais cedo possível
+        (também a primeira iteração). choose_move retorna então None.
+        """
+        self.stop_requested = True
+
+    def close(self):
+        """Liberta os processos da procura paralela e o livro e as tabelas de finais abertos pela IA."""
+        if self._parallel_searcher is not None:
+            self._parallel_searcher.shutdown()
+            self._parallel_searcher = None
+        if self._owns_book and self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
+        if self._owns_tablebases and self.tablebases is not None:
+            self.tablebases.close()
+            self.tablebases = None
+
+    def _search_move(self, board, current_player, legal_paths, prepared=None):
+        """search() para choose_move; fica com a jogada do ponder se esta tiver ido mais fundo."""
+        score, path, completed_depth = self.search(board, current_player, possible_paths=legal_paths)
+        self._last_move_depth = completed_depth
+        if prepared is not None and not self.stop_requested and prepared[1] > completed_depth:
+            self.last_move_from_ponder = True
+            self.ponder_hits += 1
+            return prepared[2], prepared[0], prepared[1]
+        return score, path, completed_depth
+
+    def _collect_pv(self, board, current_player, root_hash, root_move, depth):
+        """Segue a tabela de transposição a partir da raiz e retorna {hash: movimento} da linha principal."""
+        pv_moves = {root_hash: root_move}
+        if self.tt is None: return pv_moves
+        undo_stack = []
+        player, position_hash, move = current_player, root_hash, root_move
+        for _ in range(depth - 1):
+            start_r, start_c = move[0]
+            piece = board[start_r][start_c]
+            if piece == EMPTY or piece.lower() != player: break
+            undo = utils.make_move(board, move)
+            undo_stack.append(undo)
+            position_hash = transposition.update_hash(position_hash, undo.piece, move, undo.final_piece, undo.captured)
+            player = BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+            entry = self.tt.probe(position_hash)
+            if entry is None or entry.best_move is None: break
+            move = entry.best_move
+            pv_moves[position_hash] = move
+        for undo in reversed(undo_stack):
+            utils.unmake_move(board, undo)
+        return pv_moves
+
+    def _evaluate_leaf(self, board, position_hash):
+        """Avaliação estática com cache na tabela de transposição (profundidade 0, exata)."""
+        self.stats.leaf_evals += 1
+        if self._evaluator is not None:
+            score = self._evaluator.evaluate(board)
+        else:
+            score = self.evaluate_board(board)
+        if self.tt is not None:
+            self.tt.store(position_hash, 0, transposition.EXACT, score, None)
+        return score
 
-    def choose_move(self, board, current_player):
+    def choose_move(self, board, current_player=None):
         """
         Escolhe o melhor movimento (caminho) para o jogador atual.
+        'board' pode ser uma Position (o jogador por omissão é o que está a mover).
         Retorna um caminho (lista de coordenadas) ou None.
         """
-        possible_capture_paths = get_all_captures_for_player(board, current_player)
+        # Uma única cópia por jogada: a procura faz make/unmake sobre ela e
+        # o tabuleiro do chamador nunca é alterado.
+        board, current_player = board_and_player(board, current_player, copy=True)
+        legal_paths = self._generate_moves(board, current_player)
+        if not legal_paths: return None
         best_path = None
+        if self.tt is not None:
+            self.tt.new_search()
+
+        # --- Livro de aberturas (fora do livro, procura normalmente) ---
+        self.last_move_from_book = False
+        if self.opening_book is not None and self.difficulty != 'facil':
+            book_path = self.opening_book.choose(board, current_player, legal_paths)
+            if book_path is not None:
+                self._ponder_answers = {}
+                self.last_move_from_book = True
+                self.stats = SearchStats()
+                return book_path
+
+        # --- Tabelas de finais (posições com poucas peças) ---
+        self.last_move_from_tablebase = False
+        if self.tablebases is not None and self.difficulty != 'facil':
+            perfect = self.tablebases.best_move(board, current_player, legal_paths)
+            if perfect is not None:
+                self._ponder_answers = {}
+                self.last_move_from_tablebase = True
+                self.stats = SearchStats()
+                return perfect[0]
+
+        # --- Resposta preparada durante o ponder ---
+        # Se for pelo menos tão profunda como a procura normal, responde de imediato;
+        # senão procura (com a tabela já preenchida) e fica com o resultado mais profundo.
+        self.last_move_from_ponder = False
+        prepared = self._take_ponder_answer(board, current_player, legal_paths)
+        if prepared is not None:
+            if self.time_limit is None and self.node_limit is None:
+                target_depth = self.max_depth
+            else:
+                target_depth = max(self._last_move_depth, 1)
+            if prepared[1] >= target_depth:
+                self.last_move_from_ponder = True
+                self.ponder_hits += 1
+                self.stats = SearchStats()
+                self.stats.record_iteration(prepared[1], 0.0, prepared[2], prepared[0])
+                return prepared[0]
 
         # --- Lógica de Captura ---
-        if possible_capture_paths:
+        if legal_paths.is_capture:
             if self.difficulty == 'facil':
-                best_path = random.choice(possible_capture_paths)
-            elif self.difficulty == 'medio':
-                 # Profundidade MÉDIO = 3
-                 _, best_path = self.minimax(board, current_player, depth=3, possible_paths=possible_capture_paths)
-            else:  # difícil
-                # Profundidade DIFÍCIL = 4
-                _, best_path = self.minimax(board, current_player, depth=4, possible_paths=possible_capture_paths)
+                best_path = random.choice(legal_paths)
+            else:  # médio / difícil (profundidade em self.max_depth ou orçamento de tempo/nós)
+                _, best_path, _ = self._search_move(board, current_player, legal_paths, prepared)
 
         # --- Lógica de Movimento Normal ---
         else:
             if self.difficulty == 'facil':
                 # Lógica 'facil' com avaliação simples e prioridade a promoções
-                all_normal_paths = self.get_all_normal_paths(board, current_player)
-                if not all_normal_paths: return None
+                all_normal_paths = legal_paths
 
                 promoting_moves = []
                 for path in all_normal_paths:
@@ -207,14 +676,7 @@ class AIPlayer:
                 else:
                     best_score = -math.inf if current_player == WHITE_MAN else math.inf
                     best_moves_list = []
-                    for path in all_normal_paths:
-                        temp_board = [row[:] for row in board]
-                        start_r, start_c = path[0]
-                        piece_type = board[start_r][start_c]
-                        if piece_type == EMPTY: continue
-                        utils.apply_move(temp_board, path, piece_type)
-                        score = self.evaluate_board(temp_board)
-
+                    for path, score in self._score_moves(board, all_normal_paths):
                         is_better = (current_player == WHITE_MAN and score > best_score) or \
                                     (current_player == BLACK_MAN and score < best_score)
                         is_equal = (score == best_score)
@@ -230,43 +692,65 @@ class AIPlayer:
                     else:
                         best_path = random.choice(all_normal_paths) # Fallback
 
-            elif self.difficulty == 'medio':
-                 # Profundidade MÉDIO = 3
-                 _, best_path = self.minimax(board, current_player, depth=3)
-            else:  # difícil
-                 # Profundidade DIFÍCIL = 4
-                 _, best_path = self.minimax(board, current_player, depth=4)
+            else:  # médio / difícil
+                 _, best_path, _ = self._search_move(board, current_player, legal_paths, prepared)
 
         # --- Fallbacks e Retorno ---
-        if best_path is None and utils.has_moves(board, current_player):
+        if self.stop_requested: return None # Procura cancelada: nenhum movimento
+        if best_path is None:
              # print(f"Warning: IA {self.difficulty} ({current_player}) retornou None, fallback final para aleatório.")
-             all_moves = get_all_captures_for_player(board, current_player)
-             if not all_moves:
-                 all_moves = self.get_all_normal_paths(board, current_player)
-             if all_moves:
-                 best_path = random.choice(all_moves)
+             best_path = random.choice(legal_paths)
 
         return best_path
 
+    def evaluate_boards(self, boards):
+        """
+        Avaliação de vários tabuleiros de uma vez (análise, ajuste de pesos): vetorizada com
+        Dameo.batch_eval se o NumPy estiver instalado e o lote compensar, senão um a um.
+        Os resultados são iguais aos de evaluate_board. 'boards' pode ter Positions.
+        """
+        if len(boards) >= BATCH_EVAL_MIN_BOARDS:
+            from Dameo import batch_eval # Import local: só carrega o NumPy quando é preciso
+            if batch_eval.HAVE_NUMPY:
+                return batch_eval.evaluate_batch(boards).tolist()
+        return [self.evaluate_board(board) for board in boards]
+
+    def _score_moves(self, board, paths):
+        """
+        Lista de (caminho, avaliação da posição resultante), usada pelo nível 'facil'.
+        Usa a avaliação incremental: para as poucas dezenas de movimentos de uma posição
+        é mais rápida do que a avaliação vetorizada.
+        """
+        paths = [path for path in paths if board[path[0][0]][path[0][1]] != EMPTY]
+        scored = []
+        evaluator = IncrementalEvaluator(board) if self.incremental_eval else None
+        for path in paths:
+            undo = utils.make_move(board, path)
+            if evaluator is not None:
+                evaluator.update(board, undo)
+                score = evaluator.evaluate(board)
+            else:
+                score = self.evaluate_board(board)
+            utils.unmake_move(board, undo)
+            if evaluator is not None: evaluator.update(board, undo)
+            scored.append((path, score))
+        return scored
+
     # --- Funções Auxiliares (calculate_mobility, etc.) ---
     # (mantêm-se iguais à versão anterior)
     def _get_normal_moves_for_piece(self, board, r, c):
         piece = board[r][c]
         moves = []
         if piece == EMPTY: return moves
-        move_directions = utils.get_piece_directions(piece, capture_only=False)
         if utils.is_king(piece):
-            for dx, dy in move_directions:
-                for i in range(1, utils.BOARD_SIZE):
-                    nr, nc = r + i * dx, c + i * dy
-                    if not utils.is_within_bounds(nr, nc): break
-                    if board[nr][nc] == EMPTY: moves.append((nr, nc))
-                    else: break
+            for ray in RAYS[r][c]:
+                for square in ray:
+                    if board[square[0]][square[1]] != EMPTY: break
+                    moves.append(square)
         else:
-            for dx, dy in move_directions:
-                 nr, nc = r + dx, c + dy
-                 if utils.is_within_bounds(nr, nc) and board[nr][nc] == EMPTY:
-                     moves.append((nr, nc))
+            for square in utils.MAN_STEPS[piece][r][c]:
+                if board[square[0]][square[1]] == EMPTY:
+                    moves.append(square)
         return moves
 
     def calculate_mobility(self, board, player):
@@ -300,9 +784,10 @@ class AIPlayer:
 
     def evaluate_board(self, board):
         """ Função de avaliação heurística com heurísticas adicionadas. """
-        winner = get_winner(board)
-        if winner == WHITE_MAN: return 10000 + count_pieces(board)[WHITE_MAN]
-        if winner == BLACK_MAN: return -10000 - count_pieces(board)[BLACK_MAN]
+        if isinstance(board, Position): board = board.to_board()
+        winner = self._get_winner(board)
+        if winner == WHITE_MAN: return WIN_SCORE + count_pieces(board)[WHITE_MAN]
+        if winner == BLACK_MAN: return -WIN_SCORE - count_pieces(board)[BLACK_MAN]
         if winner == 'draw': return 0
 
         score = 0
@@ -347,8 +832,8 @@ class AIPlayer:
                     if piece.lower() == WHITE_MAN.lower(): white_center_control += 1
                     elif piece.lower() == BLACK_MAN.lower(): black_center_control += 1
 
-        score += white_pawn_advancement * 0.05
-        score -= black_pawn_advancement * 0.05
+        score += white_pawn_advancement * PAWN_ADVANCEMENT_WEIGHT
+        score -= black_pawn_advancement * PAWN_ADVANCEMENT_WEIGHT
         score += white_king_advancement * KING_ADVANCEMENT_WEIGHT
         score -= black_king_advancement * KING_ADVANCEMENT_WEIGHT
         score += white_center_control * CENTER_CONTROL_WEIGHT
@@ -365,9 +850,35 @@ class AIPlayer:
         return score
 
 # --- Função Fábrica ---
-def get_ai_player(difficulty):
-    """Função fábrica para criar instâncias da IA com diferentes dificuldades."""
-    return AIPlayer(difficulty)
+def get_ai_player(difficulty, **options):
+    """
+    Função fábrica para criar instâncias da IA com diferentes dificuldades.
+    options são passadas ao AIPlayer (use_bitboards, tt_size, tt_replacement, ...).
+    """
+    return AIPlayer(difficulty, **options)
+
+def parse_ai_spec(spec):
+    """
+    Lê uma configuração de IA em texto, "dificuldade[:opção=valor,...]",
+    por exemplo "dificil:time_limit=0.5,tt_size=65536". Retorna (dificuldade, opções).
+    """
+    from ast import literal_eval # Import local: o ast só é preciso para configurações em texto
+    difficulty, _, option_text = spec.partition(':')
+    options = {}
+    for item in filter(None, (part.strip() for part in option_text.split(','))):
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Opção inválida na configuração da IA: {item!r}")
+        try:
+            options[name.strip()] = literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            options[name.strip()] = value.strip() # Texto simples (ex.: tt_replacement=always)
+    return difficulty.strip(), options
+
+def get_ai_player_from_spec(spec):
+    """Cria um AIPlayer a partir de uma configuração em texto (ver parse_ai_spec)."""
+    difficulty, options = parse_ai_spec(spec)
+    return AIPlayer(difficulty, **options)
 
 # Adiciona as funções minimax e quick_evaluate_move à classe AIPlayer
 AIPlayer.minimax = AIPlayer.minimax
@@ -9,29 +9,32 @@ from Dameo.game_logic import create_board, WHITE_MAN, BLACK_MAN
 from Dameo import utils
 from Dameo.utils import (
     apply_move,
-    get_possible_moves,
-    get_all_captures_for_player,  # Para verificar capturas obrigatórias do jogador
-    has_moves,
+    generate_legal_moves,  # Movimentos legais (com as capturas obrigatórias) do jogador
     get_winner,
     BOARD_SIZE,
     EMPTY
 )
 # Importa funções de desenho
-from Dameo.dameo_pygame import draw_board, COLOR_POSSIBLE_MOVE
+from Dameo.dameo_pygame import BoardRenderer, COLOR_POSSIBLE_MOVE
 # Importa IA
 from Dameo.ia_dameo import get_ai_player
+from Dameo.ai_thread import BackgroundMove, BackgroundPonder # A IA pensa numa thread
+from Dameo.ui_events import MAX_FPS, wait_for_events, wait_for_click, is_expose
 
 BOARD_SIZE_PIXELS = 600
 INFO_AREA_HEIGHT = 80
 SCREEN_HEIGHT = BOARD_SIZE_PIXELS + INFO_AREA_HEIGHT
 SCREEN_WIDTH = BOARD_SIZE_PIXELS
-FPS = 60
+FPS = MAX_FPS # Limite de redesenho; sem input o ciclo espera em pygame.event.wait
+THINKING_REFRESH = 0.1 # Segundos entre atualizações do indicador da IA a pensar
+AI_DONE_EVENT = pygame.USEREVENT + 1 # Publicado pela thread da IA quando a procura termina
 MESSAGE_DURATION = 2  # Segundos que a mensagem será exibida
 MESSAGE_COLOR = (255, 0, 0)  # Vermelho para avisos
 MESSAGE_BG_COLOR = (0, 0, 0, 180)  # Preto com alguma transparência
 BUTTON_COLOR = (80, 80, 80)
 BUTTON_HOVER_COLOR = (120, 120, 120)
 BUTTON_TEXT_COLOR = (255, 255, 255)
+THINKING_TEXT_COLOR = (220, 220, 120)
 BUTTON_WIDTH = 150
 BUTTON_HEIGHT = 40
 BUTTON_PADDING = 20
@@ -39,18 +42,59 @@ END_BUTTON_X = BUTTON_PADDING
 END_BUTTON_Y = BOARD_SIZE_PIXELS + (INFO_AREA_HEIGHT - BUTTON_HEIGHT) // 2
 
 END_BUTTON_RECT = pygame.Rect(END_BUTTON_X, END_BUTTON_Y, BUTTON_WIDTH, BUTTON_HEIGHT)
+INFO_AREA_RECT = pygame.Rect(0, BOARD_SIZE_PIXELS, SCREEN_WIDTH, INFO_AREA_HEIGHT)
 
 class GameState:
+    """
+    Estado do jogo na interface. O tabuleiro só muda com apply_move(), que incrementa
+    'version'; o estado derivado (vencedor, movimentos legais por peça e capturas
+    obrigatórias) é calculado uma vez por versão em refresh_status() e o desenho e os
+    cliques leem-no daqui em vez de o recalcularem em cada frame.
+    """
     def __init__(self):
         self.board = create_board()
         self.current_player = WHITE_MAN
         self.selected_piece_pos = None
         self.possible_paths_for_selected = []
-        self.mandatory_capture_paths = get_all_captures_for_player(self.board, self.current_player)
         self.message = None
         self.message_start_time = 0
+        # Cache do estado derivado, válida enquanto _status_version == version
+        self.version = 0
+        self._status_version = None
+        self.winner = None
+        self.current_player_has_moves = True
+        self.moves_by_piece = {} # (r, c) -> caminhos legais da peça
+        self.mandatory_capture_paths = []
+        self.refresh_status()
+
+    def refresh_status(self):
+        """Recalcula o estado derivado se o tabuleiro mudou desde o último cálculo."""
+        if self._status_version == self.version: return
+        legal_paths = generate_legal_moves(self.board, self.current_player)
+        moves_by_piece = {}
+        for path in legal_paths:
+            moves_by_piece.setdefault(path[0], []).append(path)
+        self.moves_by_piece = moves_by_piece
+        self.mandatory_capture_paths = list(legal_paths) if legal_paths.is_capture else []
+        self.current_player_has_moves = bool(legal_paths)
+        self.winner = get_winner(self.board)
+        self._status_version = self.version
+
+    def legal_moves_for(self, pos):
+        """Caminhos legais da peça em pos (só capturas se forem obrigatórias)."""
+        return self.moves_by_piece.get(pos, [])
+
+    def apply_move(self, path):
+        """Aplica o movimento, passa a vez, limpa a seleção e atualiza a cache."""
+        start_row, start_col = path[0]
+        apply_move(self.board, path, self.board[start_row][start_col])
+        self.current_player = BLACK_MAN if self.current_player == WHITE_MAN else WHITE_MAN
+        self.selected_piece_pos = None
+        self.possible_paths_for_selected = []
+        self.version += 1
+        self.refresh_status()
 
-game_state = GameState()
+game_state = None # Criado por game_loop (nada é calculado ao importar o módulo)
 
 def center_window(width, height):
     """Centraliza a janela na tela."""
@@ -64,10 +108,17 @@ def show_message(message):
     game_state.message = message
     game_state.message_start_time = time.time()
 
+def current_message():
+    """Mensagem temporária ainda visível, ou None."""
+    if game_state.message and time.time() < game_state.message_start_time + MESSAGE_DURATION:
+        return game_state.message
+    return None
+
 def display_game_message(screen, font):
     """Desenha a mensagem atual na área de informações."""
-    if game_state.message and time.time() < game_state.message_start_time + MESSAGE_DURATION:
-        message_surface = font.render(game_state.message, True, MESSAGE_COLOR)
+    message = current_message()
+    if message:
+        message_surface = font.render(message, True, MESSAGE_COLOR)
         message_rect = message_surface.get_rect(center=(SCREEN_WIDTH // 2, BOARD_SIZE_PIXELS + INFO_AREA_HEIGHT // 2))
 
         # Desenha o fundo preto para a legibilidade
@@ -79,7 +130,7 @@ def display_game_message(screen, font):
 
 def draw_info_area(screen, font, mouse_pos):
     """Desenha a área de informações abaixo do tabuleiro."""
-    pygame.draw.rect(screen, (50, 50, 50), (0, BOARD_SIZE_PIXELS, SCREEN_WIDTH, INFO_AREA_HEIGHT))
+    pygame.draw.rect(screen, (50, 50, 50), INFO_AREA_RECT)
     draw_end_game_button(screen, font, mouse_pos)
 
 def draw_end_game_button(screen, font, mouse_pos):
@@ -95,6 +146,30 @@ def draw_end_game_button(screen, font, mouse_pos):
     text_rect = text_surface.get_rect(center=END_BUTTON_RECT.center)
     screen.blit(text_surface, text_rect)
 
+def thinking_text(ai_move):
+    """Texto do indicador da IA a pensar (com pontos animados e o tempo decorrido)."""
+    seconds = ai_move.thinking_time()
+    player_name = "Branco" if ai_move.player == WHITE_MAN else "Preto"
+    dots = "." * (int(seconds * 3) % 3 + 1)
+    return f"IA ({player_name}) a pensar{dots:<3} {seconds:.1f}s"
+
+def draw_thinking_indicator(screen, font, text):
+    """Mostra que a IA está a pensar (texto de thinking_text)."""
+    text_surface = font.render(text, True, THINKING_TEXT_COLOR)
+    text_rect = text_surface.get_rect(midright=(SCREEN_WIDTH - BUTTON_PADDING, END_BUTTON_RECT.centery))
+    screen.blit(text_surface, text_rect)
+
+def idle_timeout(ai_move):
+    """
+    Segundos que o ciclo pode esperar por eventos antes de ter de redesenhar sozinho:
+    o próximo passo do indicador da IA ou o fim da mensagem visível (None: sem limite).
+    """
+    timeout = THINKING_REFRESH if ai_move is not None else None
+    if current_message():
+        remaining = game_state.message_start_time + MESSAGE_DURATION - time.time()
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    return timeout
+
 def show_end_screen(screen, message, font):
     """Mostra uma mensagem de fim de jogo e espera por input."""
     screen.fill((0, 0, 0))
@@ -107,14 +182,7 @@ def show_end_screen(screen, message, font):
     screen.blit(info, info_rect)
     pygame.display.flip()
 
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                waiting = False  # Sai da função e retorna ao menu
+    wait_for_click()  # Bloqueia até um clique; depois retorna ao menu
 
 def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
     screen = center_window(SCREEN_WIDTH, SCREEN_HEIGHT)  # Use a função para criar a tela
@@ -126,13 +194,21 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
     game_state = GameState()  # Reinicializa o estado do jogo
 
     square_size = BOARD_SIZE_PIXELS // BOARD_SIZE
+    # Só as casas que mudaram e a área de informações (quando muda) são redesenhadas
+    renderer = BoardRenderer(square_size)
+    screen.fill((0, 0, 0))
+    drawn_info = None # (botão realçado, mensagem, texto da IA) desenhados na área de informações
+    ai_move = None # Procura da IA em curso (BackgroundMove)
+    ai_ponder = None # IA a pensar na vez do humano (BackgroundPonder)
 
+    # Cada volta: verifica o fim do jogo, lança a IA se for a vez dela, desenha o que mudou e
+    # espera (sem ocupar o processador) por input, pelo fim da procura ou pela próxima
+    # atualização do indicador/mensagem (idle_timeout); só depois trata os eventos recebidos
     running = True
     while running:
-        mouse_pos = pygame.mouse.get_pos()
-
-        # Verificar condição de fim de jogo ANTES do turno
-        winner = get_winner(game_state.board)
+        # Verificar condição de fim de jogo ANTES do turno (da cache, calculada uma vez por jogada)
+        game_state.refresh_status()
+        winner = game_state.winner
         if winner:
             if winner == 'draw':
                 message = "Empate!"
@@ -144,7 +220,7 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
             continue
 
         # Verificar se jogador atual tem movimentos
-        if not has_moves(game_state.board, game_state.current_player):
+        if not game_state.current_player_has_moves:
             opponent = BLACK_MAN if game_state.current_player == WHITE_MAN else WHITE_MAN
             winner_name = "Preto" if opponent == BLACK_MAN else "Branco"
             message = f"Jogador {winner_name} venceu (sem movimentos)!"
@@ -157,54 +233,108 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
                      (game_state.current_player == BLACK_MAN and mode_black == "ai")
         current_ai = ai_white if game_state.current_player == WHITE_MAN else ai_black
 
-        # ---- Turno da IA ----
+        # ---- Trabalho em segundo plano ----
+        # A procura da IA corre numa thread e publica AI_DONE_EVENT quando termina
         if is_ai_turn and current_ai:
-            pygame.display.set_caption(f"Dameo - Pensando... ({game_state.current_player.upper()})")
-            pygame.event.pump()  # Processa eventos GUI
-
-            start_time = time.time()
-            chosen_path = current_ai.choose_move(game_state.board, game_state.current_player)
-            end_time = time.time()
-
-            if chosen_path:
-                print(f"IA ({game_state.current_player}) escolheu: {chosen_path} em {end_time - start_time:.2f}s")
-                start_row, start_col = chosen_path[0]
-                # Obter tipo ANTES de mover, diretamente do tabuleiro
-                piece_type = game_state.board[start_row][start_col]
-                if piece_type == EMPTY:
-                    print(f"ERRO GRAVE: IA tentou mover de uma casa vazia em ({start_row}, {start_col})")
-                    # O que fazer aqui? Parar o jogo? Tentar outro movimento?
-                    # Por agora, vamos apenas logar e talvez passar a vez
-                    game_state.current_player = BLACK_MAN if game_state.current_player == WHITE_MAN else WHITE_MAN  # Passa a vez mesmo com erro?
-                else:
-                    apply_move(game_state.board, chosen_path, piece_type)  # Aplicar o movimento
+            if ai_move is None:
+                if ai_ponder is not None: # O humano já jogou: as respostas preparadas ficam na IA
+                    ai_ponder.stop()
+                    ai_ponder = None
+                pygame.display.set_caption(f"Dameo - Pensando... ({game_state.current_player.upper()})")
+                ai_move = BackgroundMove(current_ai, game_state.board, game_state.current_player,
+                                         on_done=lambda: pygame.event.post(pygame.event.Event(AI_DONE_EVENT)))
+        else:
+            # Contra uma IA com ponder, ela pensa nas respostas enquanto o humano joga
+            opponent_ai = ai_black if game_state.current_player == WHITE_MAN else ai_white
+            opponent_is_ai = (mode_black if game_state.current_player == WHITE_MAN else mode_white) == "ai"
+            if ai_ponder is None and opponent_is_ai and opponent_ai is not None and opponent_ai.pondering_enabled:
+                ai_player = BLACK_MAN if game_state.current_player == WHITE_MAN else WHITE_MAN
+                ai_ponder = BackgroundPonder(opponent_ai, game_state.board, ai_player)
+
+        # ---- Desenho (só o que mudou desde a última espera) ----
+        mouse_pos = pygame.mouse.get_pos()
+        dirty_rects = renderer.draw(screen, game_state.board, game_state.selected_piece_pos,
+                                    game_state.possible_paths_for_selected)
+        info = (END_BUTTON_RECT.collidepoint(mouse_pos), current_message(),
+                thinking_text(ai_move) if ai_move is not None else None)
+        if info != drawn_info:
+            draw_info_area(screen, font, mouse_pos)
+            display_game_message(screen, font)  # Desenha a mensagem na área de informações
+            if info[2] is not None:
+                draw_thinking_indicator(screen, font, info[2])
+            dirty_rects.append(INFO_AREA_RECT)
+            drawn_info = info
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        clock.tick(FPS)
 
-                # Mudar jogador e limpar estado de seleção
-                game_state.current_player = BLACK_MAN if game_state.current_player == WHITE_MAN else WHITE_MAN
-                game_state.selected_piece_pos = None
-                game_state.possible_paths_for_selected = []
-                # Recalcular capturas obrigatórias para o próximo jogador humano/IA
-                game_state.mandatory_capture_paths = get_all_captures_for_player(game_state.board, game_state.current_player)
+        # ---- Espera por eventos ----
+        events = wait_for_events(idle_timeout(ai_move))
+        if any(is_expose(event) for event in events): # Janela descoberta: redesenha tudo
+            renderer.invalidate()
+            drawn_info = None
 
-            else:
-                # Se a IA não encontrou movimento (pode acontecer em estados finais já tratados, ou erro na IA)
-                print(f"AVISO: IA ({game_state.current_player}) não retornou movimento.")
-                # A verificação no início do loop deve ter capturado estados sem movimento.
-                # Se chegar aqui, pode ser um bug na IA ou estado inesperado.
+        # ---- Turno da IA ----
+        # O ciclo continua a desenhar e a tratar eventos até o resultado chegar.
+        # "Terminar Jogo" cancela a procura.
+        if is_ai_turn and current_ai:
+            for event in events:
+                if event.type == pygame.QUIT:
+                    ai_move.cancel()
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and \
+                     END_BUTTON_RECT.collidepoint(event.pos):
+                    ai_move.cancel()
+                    running = False
+                    break
+
+            if running and ai_move.done():
+                chosen_path = ai_move.result()
+                thinking_time = ai_move.thinking_time()
+                ai_move = None
+
+                if chosen_path:
+                    print(f"IA ({game_state.current_player}) escolheu: {chosen_path} em {thinking_time:.2f}s")
+                    if current_ai.last_move_from_ponder:
+                        print("    (jogada preparada durante a vez do adversário)")
+                    if current_ai.last_move_from_tablebase:
+                        print("    (jogada das tabelas de finais)")
+                    if current_ai.stats.completed_depth: # Só os níveis que procuram têm estatísticas
+                        print(f"    {current_ai.stats.summary()}")
+                    start_row, start_col = chosen_path[0]
+                    # Obter tipo ANTES de mover, diretamente do tabuleiro
+                    piece_type = game_state.board[start_row][start_col]
+                    if piece_type == EMPTY:
+                        print(f"ERRO GRAVE: IA tentou mover de uma casa vazia em ({start_row}, {start_col})")
+                        # O que fazer aqui? Parar o jogo? Tentar outro movimento?
+                        # Por agora, vamos apenas logar; o tabuleiro e a vez ficam iguais
+                        game_state.selected_piece_pos = None
+                        game_state.possible_paths_for_selected = []
+                    else:
+                        # Aplicar o movimento, mudar jogador, limpar a seleção e recalcular
+                        # a cache (capturas obrigatórias do próximo jogador humano/IA)
+                        game_state.apply_move(chosen_path)
+
+                else:
+                    # Se a IA não encontrou movimento (pode acontecer em estados finais já tratados, ou erro na IA)
+                    print(f"AVISO: IA ({game_state.current_player}) não retornou movimento.")
+                    # A verificação no início do loop deve ter capturado estados sem movimento.
+                    # Se chegar aqui, pode ser um bug na IA ou estado inesperado.
 
-            pygame.display.set_caption("Dameo")
-            # Não precisa de 'continue', o loop vai naturalmente para desenho e próxima iteração
+                pygame.display.set_caption("Dameo")
+                # Não precisa de 'continue', o loop vai naturalmente para desenho e próxima iteração
 
         # ---- Turno do Jogador Humano ----
         else:  # Só processa eventos se não for a vez da IA
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                     pygame.quit()
                     sys.exit()
 
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Botão esquerdo
-                    x, y = pygame.mouse.get_pos()
+                    x, y = event.pos
                     clicked_pos_mouse = (x, y)
 
                     # Verificar se o botão de "Terminar Jogo" foi clicado (AGORA ANTES da verificação do tabuleiro)
@@ -234,16 +364,9 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
                                     is_valid_move = any(p == chosen_path for p in game_state.mandatory_capture_paths)
 
                                 if is_valid_move:
-                                    # Aplicar o movimento escolhido
-                                    piece_type = game_state.board[game_state.selected_piece_pos[0]][game_state.selected_piece_pos[1]]
-                                    apply_move(game_state.board, chosen_path, piece_type)
-
-                                    # Mudar jogador e limpar seleção/movimentos
-                                    game_state.current_player = BLACK_MAN if game_state.current_player == WHITE_MAN else WHITE_MAN
-                                    game_state.selected_piece_pos = None
-                                    game_state.possible_paths_for_selected = []
-                                    # Recalcular capturas obrigatórias para o próximo jogador
-                                    game_state.mandatory_capture_paths = get_all_captures_for_player(game_state.board, game_state.current_player)
+                                    # Aplicar o movimento escolhido, mudar jogador, limpar
+                                    # seleção/movimentos e recalcular a cache para o próximo jogador
+                                    game_state.apply_move(chosen_path)
                                     # break # Sai do loop de eventos após fazer um movimento (importante)
 
                                 else:
@@ -261,18 +384,14 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
                             # Se há capturas obrigatórias, só pode selecionar peças que TÊM capturas
                             piece_has_mandatory_capture = False
                             if game_state.mandatory_capture_paths:
-                                piece_has_mandatory_capture = any(path[0] == clicked_board_pos for path in game_state.mandatory_capture_paths)
+                                piece_has_mandatory_capture = clicked_board_pos in game_state.moves_by_piece
                                 if not piece_has_mandatory_capture:
                                     can_select = False  # Não pode selecionar esta se outras têm captura
 
                             if can_select:
                                 game_state.selected_piece_pos = clicked_board_pos
-                                # Obtém movimentos possíveis (serão capturas se houver para esta peça)
-                                game_state.possible_paths_for_selected = get_possible_moves(game_state.board, clicked_row, clicked_col)
-                                # Filtra para mostrar apenas capturas se houver capturas obrigatórias no geral
-                                if game_state.mandatory_capture_paths:
-                                    game_state.possible_paths_for_selected = [p for p in game_state.possible_paths_for_selected if len(p) > 2 or
-                                                                           (len(p) == 2 and abs(p[0][0] - p[1][0]) >= 2 or abs(p[0][1] - p[1][1]) >= 2)]
+                                # Movimentos legais da peça, da cache (só as capturas obrigatórias se as houver)
+                                game_state.possible_paths_for_selected = game_state.legal_moves_for(clicked_board_pos)
                             else:
                                 show_message("Seleção inválida! Captura obrigatória com outra peça.")
                                 game_state.selected_piece_pos = None
@@ -289,13 +408,7 @@ def game_loop(mode_white="user", mode_black="ai", ai_white=None, ai_black=None):
                     # else:
                     #     print(f"Clique fora do tabuleiro em ({clicked_row}, {clicked_col})")
 
-        # ---- Desenho ----
-        screen.fill((0, 0, 0))
-        draw_board(screen, game_state.board, game_state.selected_piece_pos, game_state.possible_paths_for_selected, square_size)
-        draw_info_area(screen, font, mouse_pos)
-        display_game_message(screen, font)  # Desenha a mensagem na área de informações
-        pygame.display.flip()
-        clock.tick(FPS)
-
+    if ai_move is not None: ai_move.cancel() # Não deixa a procura a correr depois do jogo
+    if ai_ponder is not None: ai_ponder.stop()
     pygame.quit()
     sys.exit()
\ No newline at end of file
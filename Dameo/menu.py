@@ -1,6 +1,7 @@
 # menu.py
 import pygame
 import sys
+from Dameo.ui_events import MAX_FPS, wait_for_events, wait_for_click, is_expose
 
 # --- Função para Exibir as Regras (com texto simplificado) ---
 def show_rules(screen):
@@ -65,18 +66,8 @@ def show_rules(screen):
 
     pygame.display.flip()
 
-    # Loop de espera para voltar
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                waiting = False
-            elif event.type == pygame.KEYDOWN:
-                 waiting = False
-        pygame.time.Clock().tick(30)
+    # Espera (bloqueada, sem redesenhar) por um clique ou uma tecla para voltar
+    wait_for_click(keys=True)
 
 # --- Função show_menu (sem alterações nesta versão) ---
 def show_menu(screen):
@@ -100,28 +91,36 @@ def show_menu(screen):
         option_index = i + 1
         buttons.append({'rect': rect, 'text_surface': text_surface, 'text_rect': text_rect, 'option_index': option_index})
     selected_button_index = None
+    drawn_index = -1 # Botão realçado no último desenho (-1 força o primeiro)
+    clock = pygame.time.Clock()
     while True:
-        screen.fill((30, 30, 30))
+        # Só redesenha quando o botão realçado muda; fora disso espera por eventos
         mouse_pos = pygame.mouse.get_pos()
         selected_button_index = None
-        screen.blit(title_surface, title_rect)
         for i, button in enumerate(buttons):
-             if button['rect'].collidepoint(mouse_pos):
-                 selected_button_index = i
-        for i, button in enumerate(buttons):
-            button_color = (80, 80, 80) if selected_button_index == i else (50, 50, 50)
-            pygame.draw.rect(screen, button_color, button['rect'], border_radius=10)
-            screen.blit(button['text_surface'], button['text_rect'])
-        pygame.display.flip()
-        for event in pygame.event.get():
+            if button['rect'].collidepoint(mouse_pos):
+                selected_button_index = i
+        if selected_button_index != drawn_index:
+            screen.fill((30, 30, 30))
+            screen.blit(title_surface, title_rect)
+            for i, button in enumerate(buttons):
+                button_color = (80, 80, 80) if selected_button_index == i else (50, 50, 50)
+                pygame.draw.rect(screen, button_color, button['rect'], border_radius=10)
+                screen.blit(button['text_surface'], button['text_rect'])
+            pygame.display.flip()
+            drawn_index = selected_button_index
+        clock.tick(MAX_FPS)
+        for event in wait_for_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     for button in buttons:
-                        if button['rect'].collidepoint(mouse_pos):
+                        if button['rect'].collidepoint(event.pos):
                             return button['option_index']
+            elif is_expose(event):
+                drawn_index = -1
 
 # --- Função show_difficulty_menu (sem alterações nesta versão) ---
 def show_difficulty_menu(screen, title_text="Escolha a Dificuldade da IA"):
@@ -145,25 +144,33 @@ def show_difficulty_menu(screen, title_text="Escolha a Dificuldade da IA"):
         return_value = i if i < len(options) - 1 else -1
         buttons.append({'rect': rect, 'text_surface': text_surface, 'text_rect': text_rect, 'return_value': return_value})
     selected_button_index = None
+    drawn_index = -1 # Botão realçado no último desenho (-1 força o primeiro)
+    clock = pygame.time.Clock()
     while True:
-        screen.fill((30, 30, 30))
+        # Só redesenha quando o botão realçado muda; fora disso espera por eventos
         mouse_pos = pygame.mouse.get_pos()
         selected_button_index = None
-        screen.blit(title_surface, title_rect)
         for i, button in enumerate(buttons):
             if button['rect'].collidepoint(mouse_pos):
                 selected_button_index = i
-        for i, button in enumerate(buttons):
-            button_color = (80, 80, 80) if selected_button_index == i else (50, 50, 50)
-            pygame.draw.rect(screen, button_color, button['rect'], border_radius=10)
-            screen.blit(button['text_surface'], button['text_rect'])
-        pygame.display.flip()
-        for event in pygame.event.get():
+        if selected_button_index != drawn_index:
+            screen.fill((30, 30, 30))
+            screen.blit(title_surface, title_rect)
+            for i, button in enumerate(buttons):
+                button_color = (80, 80, 80) if selected_button_index == i else (50, 50, 50)
+                pygame.draw.rect(screen, button_color, button['rect'], border_radius=10)
+                screen.blit(button['text_surface'], button['text_rect'])
+            pygame.display.flip()
+            drawn_index = selected_button_index
+        clock.tick(MAX_FPS)
+        for event in wait_for_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     for button in buttons:
-                        if button['rect'].collidepoint(mouse_pos):
-                            return button['return_value']
\ No newline at end of file
+                        if button['rect'].collidepoint(event.pos):
+                            return button['return_value']
+            elif is_expose(event):
+                drawn_index = -1
\ No newline at end of file
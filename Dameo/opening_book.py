@@ -0,0 +1,259 @@
+# opening_book.py
+# Livro de aberturas: jogadas preparadas para as primeiras posições do jogo, guardadas
+# num ficheiro binário ordenado pelo hash de Zobrist da posição (Dameo.transposition).
+# A consulta usa mmap e pesquisa binária, por isso não carrega o ficheiro para memória.
+#
+# Formato (little-endian):
+#   cabeçalho: b'DMOB', versão (u16), nº de registos (u32)
+#   registos ordenados por hash, um por jogada:
+#     hash (u64), peso (u16), nº de casas do caminho (u8), casas (MAX_PATH_SQUARES x u8, r*8+c)
+#
+# Construção (offline):
+#   python -m Dameo.opening_book build --plies 6 --width 3 --depth 5 --output Dameo/opening_book.bin
+#   python -m Dameo.opening_book build --from-games match.jsonl --plies 10 --output livro.bin
+#   python -m Dameo.opening_book show Dameo/opening_book.bin
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+
+from Dameo import utils
+from Dameo import transposition
+from Dameo.utils import BOARD_SIZE, WHITE_MAN, BLACK_MAN
+from Dameo.game_logic import create_board
+from Dameo.position import Position
+
+BOOK_MAGIC = b'DMOB'
+BOOK_VERSION = 1
+MAX_PATH_SQUARES = 9 # Caminhos mais longos não entram no livro
+MAX_WEIGHT = 0xFFFF
+HEADER = struct.Struct('<4sHI')
+RECORD = struct.Struct(f'<QHB{MAX_PATH_SQUARES}B')
+KEY = struct.Struct('<Q')
+DEFAULT_BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+def default_book_path():
+    """Caminho do livro incluído no projeto, ou None se não existir."""
+    return DEFAULT_BOOK_FILE if os.path.exists(DEFAULT_BOOK_FILE) else None
+
+def encode_path(path):
+    squares = [r * BOARD_SIZE + c for r, c in path]
+    return len(squares), squares + [0] * (MAX_PATH_SQUARES - len(squares))
+
+def decode_path(length, squares):
+    return [divmod(sq, BOARD_SIZE) for sq in squares[:length]]
+
+def write_book(path, entries):
+    """
+    Grava o livro. entries: {hash: {caminho (tuplo de casas): peso}}.
+    Os pesos são reescalados para caber em 16 bits.
+    """
+    records = []
+    for key, moves in entries.items():
+        top = max(moves.values(), default=0)
+        for move_path, weight in moves.items():
+            if len(move_path) > MAX_PATH_SQUARES or weight <= 0: continue
+            scaled = weight * MAX_WEIGHT / top if top > MAX_WEIGHT else weight
+            records.append((key, max(1, round(scaled)), move_path))
+    records.sort(key=lambda record: (record[0], -record[1]))
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(records)))
+        for key, weight, move_path in records:
+            length, squares = encode_path(move_path)
+            f.write(RECORD.pack(key, weight, length, *squares))
+    return len(records)
+
+
+class OpeningBook:
+    """Livro de aberturas aberto com mmap. Usar close() (ou 'with') no fim."""
+
+    def __init__(self, path=DEFAULT_BOOK_FILE):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Ficheiro vazio
+            self._file.close()
+            raise ValueError(f"Livro de aberturas vazio: {path}")
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            self.close()
+            raise ValueError(f"Ficheiro não é um livro de aberturas Dameo (v{BOOK_VERSION}): {path}")
+        if HEADER.size + count * RECORD.size > len(self._mm):
+            self.close()
+            raise ValueError(f"Livro de aberturas truncado: {path}")
+        self.count = count
+        self.hits = 0
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, index):
+        return KEY.unpack_from(self._mm, HEADER.size + index * RECORD.size)[0]
+
+    def probe(self, key):
+        """Lista de (caminho, peso) guardada para o hash 'key' (vazia se não estiver no livro)."""
+        low, high = 0, self.count
+        while low < high: # Primeiro registo com hash >= key
+            mid = (low + high) // 2
+            if self._key_at(mid) < key: low = mid + 1
+            else: high = mid
+        moves = []
+        index = low
+        while index < self.count:
+            record = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+            if record[0] != key: break
+            moves.append((decode_path(record[2], record[3:]), record[1]))
+            index += 1
+        return moves
+
+    def choose(self, board, player=None, legal_paths=None):
+        """
+        Jogada do livro para a posição (escolha aleatória pesada) ou None se a posição
+        não estiver no livro. Só são consideradas jogadas presentes em legal_paths.
+        'board' pode ser uma Position (usa o hash que ela mantém).
+        """
+        if isinstance(board, Position):
+            moves = self.probe(board.hash)
+        else:
+            moves = self.probe(transposition.compute_hash(board, player))
+        if legal_paths is not None:
+            moves = [(path, weight) for path, weight in moves if path in legal_paths]
+        if not moves: return None
+        self.hits += 1
+        paths, weights = zip(*moves)
+        return random.choices(paths, weights=weights)[0]
+
+# --- Construção ---
+
+def _score_root_moves(ai, board, player, depth):
+    """Avaliação de cada jogada legal com uma procura de profundidade 'depth'."""
+    opponent = BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+    scored = []
+    for path in utils.generate_legal_moves(board, player):
+        undo = utils.make_move(board, path)
+        try:
+            if depth > 1:
+                score, _, _ = ai.search(board, opponent, max_depth=depth - 1)
+            else:
+                score = None
+            if score is None: score = ai.evaluate_board(board)
+        finally:
+            utils.unmake_move(board, undo)
+        scored.append((score, path))
+    return scored
+
+def build_from_search(plies, width=3, depth=5, margin=0.25, ai_spec='dificil', report=None):
+    """
+    Explora as primeiras 'plies' meias-jogadas a partir de create_board(). Em cada posição
+    avalia todas as jogadas a 'depth' e guarda as até 'width' melhores que fiquem a menos de
+    'margin' da melhor; o peso decresce com a diferença. As jogadas guardadas são expandidas.
+    """
+    from Dameo.ia_dameo import get_ai_player_from_spec # Import local: só a construção precisa da IA
+    ai = get_ai_player_from_spec(ai_spec)
+    entries = {}
+    frontier = [(create_board(), WHITE_MAN)]
+    for ply in range(plies):
+        next_frontier = []
+        for board, player in frontier:
+            key = transposition.compute_hash(board, player)
+            if key in entries: continue
+            scored = _score_root_moves(ai, board, player, depth)
+            if not scored: continue
+            maximizing = player == WHITE_MAN
+            scored.sort(key=lambda item: item[0], reverse=maximizing)
+            best = scored[0][0]
+            chosen = [(score, path) for score, path in scored[:width] if abs(score - best) <= margin]
+            # Peso 1000 para a melhor jogada, a descer até 100 no limite da margem
+            entries[key] = {tuple(path): 1000 - round(900 * abs(score - best) / margin) if margin > 0 else 1000
+                            for score, path in chosen}
+            for _, path in chosen:
+                child = [row[:] for row in board]
+                utils.make_move(child, path)
+                next_frontier.append((child, BLACK_MAN if maximizing else WHITE_MAN))
+        frontier = next_frontier
+        if report is not None: report(f"meia-jogada {ply + 1}: {len(entries)} posições no livro")
+    ai.close()
+    return entries
+
+def build_from_games(paths, plies, min_games=2):
+    """
+    Livro a partir de resultados de torneios (JSONL de Dameo.tournament com o campo 'opening').
+    O peso de cada jogada é a pontuação de quem a jogou (vitória 2, empate 1) somada pelos jogos.
+    """
+    counts = {}
+    for results_path in paths:
+        with open(results_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip(): continue
+                result = json.loads(line)
+                board, player = create_board(), WHITE_MAN
+                for path in result.get('opening', [])[:plies]:
+                    path = [tuple(step) for step in path]
+                    if result['winner'] == 'draw': points = 1
+                    else: points = 2 if result['winner'] == player else 0
+                    key = transposition.compute_hash(board, player)
+                    stats = counts.setdefault(key, {}).setdefault(tuple(path), [0, 0])
+                    stats[0] += 1
+                    stats[1] += points
+                    utils.make_move(board, path)
+                    player = BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+    entries = {}
+    for key, moves in counts.items():
+        kept = {path: points for path, (games, points) in moves.items() if games >= min_games and points > 0}
+        if kept: entries[key] = kept
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Livro de aberturas de Dameo.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Constrói um livro")
+    build.add_argument("--output", default=DEFAULT_BOOK_FILE, help="Ficheiro do livro")
+    build.add_argument("--plies", type=int, default=6, help="Meias-jogadas cobertas pelo livro")
+    build.add_argument("--width", type=int, default=3, help="Máximo de jogadas guardadas por posição")
+    build.add_argument("--depth", type=int, default=5, help="Profundidade da procura de cada jogada")
+    build.add_argument("--margin", type=float, default=0.25, help="Diferença máxima para a melhor jogada")
+    build.add_argument("--ai", default="dificil", help="Configuração da IA usada na procura")
+    build.add_argument("--from-games", action="append", default=None,
+                       help="Resultados JSONL de Dameo.tournament em vez de procuras (pode repetir-se)")
+    build.add_argument("--min-games", type=int, default=2, help="Jogos mínimos por jogada (com --from-games)")
+    show = commands.add_parser('show', help="Mostra as jogadas do livro para a posição inicial")
+    show.add_argument("book", nargs='?', default=DEFAULT_BOOK_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        if args.from_games:
+            entries = build_from_games(args.from_games, args.plies, args.min_games)
+        else:
+            entries = build_from_search(args.plies, args.width, args.depth, args.margin, args.ai,
+                                        report=lambda text: print(text, flush=True))
+        count = write_book(args.output, entries)
+        print(f"{len(entries)} posições, {count} jogadas gravadas em {args.output} "
+              f"({os.path.getsize(args.output)} bytes)")
+    else:
+        with OpeningBook(args.book) as book:
+            print(f"{args.book}: {len(book)} jogadas")
+            for path, weight in book.probe(transposition.compute_hash(create_board(), WHITE_MAN)):
+                print(f"  {path}: peso {weight}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# parallel_search.py
+# Procura paralela na raiz para a IA: os movimentos da raiz são distribuídos por um
+# ProcessPoolExecutor. O primeiro movimento (o melhor da iteração anterior) é procurado
+# sozinho para estabelecer um limite ("young brothers wait"); os restantes são procurados
+# em paralelo com o melhor valor já conhecido, partilhado entre processos.
+# As tarefas em curso leem o estado partilhado a cada ABORT_CHECK_INTERVAL nós (gancho
+# AIPlayer._search_hook): se outro processo melhorou o limite, a sub-árvore é recomeçada
+# com a janela mais apertada (a tabela de transposição guarda o trabalho já feito); se a
+# procura foi cancelada (orçamento, stop() ou uma procura nova), a tarefa termina logo.
+# O pool é criado uma vez e reutilizado em todas as jogadas.
+
+import math
+import os
+import random
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from Dameo import utils
+from Dameo import transposition
+from Dameo import bitboard
+from Dameo.utils import WHITE_MAN, BLACK_MAN
+from Dameo.evaluation import WIN_SCORE, IncrementalEvaluator
+from Dameo.search_stats import SearchStats
+
+STOP_POLL_INTERVAL = 0.05 # Segundos entre verificações de should_stop enquanto as tarefas correm
+NO_SEARCH = 0 # Valor do id da procura ativa quando nenhuma deve continuar
+
+# --- Estado de cada processo do pool ---
+_worker_ai = None
+_shared_bound = None
+_active_search = None # Id da procura que as tarefas podem continuar (NO_SEARCH: parar)
+_worker_search_id = None
+
+class _BoundImproved(Exception):
+    """Outro processo melhorou o limite partilhado: a sub-árvore recomeça com a janela nova."""
+
+def _init_worker(shared_bound, active_search, difficulty, ai_options):
+    global _worker_ai, _shared_bound, _active_search
+    from Dameo.ia_dameo import AIPlayer # Import local: ia_dameo importa este módulo
+    _shared_bound = shared_bound
+    _active_search = active_search
+    _worker_ai = AIPlayer(difficulty, **ai_options)
+
+def _read_bound():
+    with _shared_bound.get_lock():
+        return _shared_bound.value
+
+def _offer_bound(score, maximizing):
+    """Atualiza o melhor valor partilhado da raiz se 'score' for melhor."""
+    with _shared_bound.get_lock():
+        if (maximizing and score > _shared_bound.value) or (not maximizing and score < _shared_bound.value):
+            _shared_bound.value = score
+
+def _search_root_move(search_id, board, player, path, depth, wall_deadline, node_limit):
+    """
+    Procura um movimento da raiz no processo do pool.
+    wall_deadline é um instante de time.time() (o mesmo relógio em todos os processos).
+    Retorna (score, SearchStats da sub-árvore) ou None se o orçamento acabou antes do fim
+    ou se a procura foi cancelada.
+    """
+    global _worker_search_id
+    from Dameo.ia_dameo import SearchAborted
+    ai = _worker_ai
+    if search_id != _worker_search_id:
+        _worker_search_id = search_id
+        if ai.tt is not None: ai.tt.new_search()
+        ai._new_search_ordering()
+
+    maximizing = player == WHITE_MAN
+    opponent = BLACK_MAN if maximizing else WHITE_MAN
+    utils.make_move(board, path)
+    child_hash = transposition.compute_hash(board, opponent)
+    bound = _read_bound()
+
+    def check_shared_state():
+        """Gancho do minimax: termina se a procura foi cancelada, recomeça se o limite melhorou."""
+        with _active_search.get_lock():
+            if _active_search.value != search_id: raise SearchAborted()
+        shared = _read_bound()
+        if (shared > bound) if maximizing else (shared < bound):
+            raise _BoundImproved()
+
+    ai.nodes_searched = 0
+    ai.stats = SearchStats()
+    ai._deadline = None
+    if wall_deadline is not None:
+        ai._deadline = time.perf_counter() + (wall_deadline - time.time())
+    ai._abort_enabled = True
+    ai._search_hook = check_shared_state
+    saved_node_limit, ai.node_limit = ai.node_limit, node_limit
+    ai._evaluator = IncrementalEvaluator(board) if ai.incremental_eval else None
+    ai._bitboards = bitboard.from_board(board) if ai.use_bitboards else None
+    try:
+        while True: # Um recomeço por cada melhoria do limite vista durante a procura
+            alpha, beta = (bound, math.inf) if maximizing else (-math.inf, bound)
+            try:
+                score, _ = ai.minimax(board, opponent, depth - 1, alpha, beta, position_hash=child_hash, ply=1)
+                break
+            except _BoundImproved:
+                ai.stats.bound_restarts += 1
+                bound = _read_bound()
+    except SearchAborted:
+        return None
+    finally:
+        ai._abort_enabled = False
+        ai._search_hook = None
+        ai._deadline = None
+        ai._evaluator = None
+        ai._bitboards = None
+        ai.node_limit = saved_node_limit
+    _offer_bound(score, maximizing)
+    ai.stats.nodes = ai.nodes_searched
+    return score, ai.stats
+
+
+class ParallelSearcher:
+    """
+    Procura paralela na raiz com aprofundamento iterativo.
+    workers: número de processos (por omissão os.cpu_count()).
+    ai_options: opções passadas ao AIPlayer de cada processo (tt_size, use_bitboards, ...).
+    """
+
+    def __init__(self, difficulty, workers=None, ai_options=None):
+        self.difficulty = difficulty
+        self.workers = workers or os.cpu_count() or 1
+        self.ai_options = dict(ai_options or {})
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self._pool = None
+        self._shared_bound = None
+        self._active_search = None
+        self._search_id = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._shared_bound = multiprocessing.Value('d', 0.0)
+            self._active_search = multiprocessing.Value('i', NO_SEARCH)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self._shared_bound, self._active_search,
+                                                       self.difficulty, self.ai_options))
+        return self._pool
+
+    def shutdown(self):
+        """Termina os processos do pool (é recriado na próxima procura)."""
+        if self._pool is not None:
+            self._set_active_search(NO_SEARCH)
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._shared_bound = None
+            self._active_search = None
+
+    def _reset_bound(self, maximizing):
+        with self._shared_bound.get_lock():
+            self._shared_bound.value = -math.inf if maximizing else math.inf
+
+    def _set_active_search(self, search_id):
+        """Muda a procura que as tarefas podem continuar; as outras terminam no próximo gancho."""
+        with self._active_search.get_lock():
+            self._active_search.value = search_id
+
+    def _collect(self, futures, should_stop):
+        """
+        Espera pelos resultados das tarefas. Se should_stop() ficar verdadeiro ou uma tarefa
+        esgotar o orçamento (None), cancela as que ainda correm em vez de esperar que acabem.
+        """
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=STOP_POLL_INTERVAL)
+            if (should_stop is not None and should_stop()) or any(future.result() is None for future in done):
+                self._set_active_search(NO_SEARCH)
+        return [future.result() for future in futures]
+
+    def search(self, board, current_player, root_paths, max_depth, time_limit=None, node_limit=None,
+               stats=None, should_stop=None):
+        """
+        Aprofundamento iterativo com os movimentos da raiz distribuídos pelo pool.
+        node_limit aplica-se à sub-árvore de cada movimento da raiz.
+        stats: SearchStats que acumula os contadores dos processos e regista cada iteração.
+        should_stop(): verificado enquanto as tarefas correm; se retornar True as tarefas em
+        curso são canceladas e a procura retorna o resultado da última iteração concluída.
+        Retorna (score, caminho, profundidade concluída), como AIPlayer.search.
+        """
+        pool = self._get_pool()
+        self._search_id += 1
+        self._set_active_search(self._search_id)
+        maximizing = current_player == WHITE_MAN
+        start_time = time.perf_counter()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        ordered_paths = list(root_paths)
+        best_score, best_path, completed_depth = None, None, 0
+        self.nodes_searched = 0
+
+        for depth in range(1, max_depth + 1):
+            # A primeira iteração é sempre concluída (sem orçamento)
+            task_deadline = deadline if completed_depth > 0 else None
+            task_node_limit = node_limit if completed_depth > 0 else None
+            self._reset_bound(maximizing)
+
+            def submit(path):
+                return pool.submit(_search_root_move, self._search_id, board, current_player, path,
+                                   depth, task_deadline, task_node_limit)
+
+            # Young brothers wait: o primeiro movimento define o limite para os restantes
+            if should_stop is not None and should_stop(): break
+            results = self._collect([submit(ordered_paths[0])], should_stop)
+            if should_stop is not None and should_stop(): break
+            if results[0] is not None:
+                results.extend(self._collect([submit(path) for path in ordered_paths[1:]], should_stop))
+            if any(result is None for result in results): break # Orçamento esgotado ou procura cancelada
+
+            scores = [score for score, _ in results]
+            self.nodes_searched += sum(task_stats.nodes for _, task_stats in results)
+            iteration_best = max(scores) if maximizing else min(scores)
+            best_paths_list = [path for path, score in zip(ordered_paths, scores) if score == iteration_best]
+            best_score, best_path, completed_depth = iteration_best, random.choice(best_paths_list), depth
+            if stats is not None:
+                stats.interior_nodes += 1 # A raiz
+                stats.moves_generated += len(ordered_paths)
+                stats.moves_searched += len(ordered_paths)
+                for _, task_stats in results:
+                    stats.merge(task_stats)
+                stats.record_iteration(depth, time.perf_counter() - start_time, best_score, best_path)
+
+            # A iteração seguinte começa pelos movimentos com melhor resultado
+            ranked = sorted(zip(scores, range(len(ordered_paths))), reverse=maximizing)
+            ordered_paths = [ordered_paths[i] for _, i in ranked]
+            ordered_paths.remove(best_path)
+            ordered_paths.insert(0, best_path)
+
+            if abs(best_score) >= WIN_SCORE: break
+            if deadline is not None and time.time() >= deadline: break
+
+        self._set_active_search(NO_SEARCH)
+        self.completed_depth = completed_depth
+        return best_score, best_path, completed_depth
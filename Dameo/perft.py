@@ -0,0 +1,227 @@
+# perft.py
+# Contagem de folhas da árvore de movimentos ("perft") para medir a velocidade e verificar
+# a correção dos geradores de movimentos. Cada gerador tem de reproduzir as contagens do
+# ficheiro de referência (perft_reference.json) antes de se confiar no seu ganho de velocidade.
+#
+# O perft só conta movimentos: não verifica o vencedor (um jogador sem movimentos contribui
+# com 0 folhas) e não há limite de jogadas.
+#
+# Uso:
+#   python -m Dameo.perft                          # todas as posições, todos os geradores
+#   python -m Dameo.perft --generator bitboard --depth 5 --position initial
+#   python -m Dameo.perft --divide --position king_multi_capture --depth 2
+#   python -m Dameo.perft --update-reference       # regenera as contagens com o gerador 'legacy'
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from Dameo import utils
+from Dameo import bitboard
+from Dameo.utils import BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN
+from Dameo.game_logic import create_board
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perft_reference.json')
+PIECE_CHARS = {EMPTY, WHITE_MAN, BLACK_MAN, utils.WHITE_KING, utils.BLACK_KING}
+
+def board_from_rows(rows):
+    """Tabuleiro a partir de 8 strings (uma por linha, de cima para baixo), ex.: 'bbbbbbbb'."""
+    if len(rows) != BOARD_SIZE or any(len(row) != BOARD_SIZE for row in rows):
+        raise ValueError(f"O tabuleiro tem de ter {BOARD_SIZE} linhas de {BOARD_SIZE} casas")
+    if any(cell not in PIECE_CHARS for row in rows for cell in row):
+        raise ValueError(f"Casa inválida no tabuleiro: {rows}")
+    return [list(row) for row in rows]
+
+def board_to_rows(board):
+    return [''.join(row) for row in board]
+
+def _opponent(player):
+    return BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+
+# --- Geradores ---
+
+def _legacy_moves(board, player):
+    """
+    Movimentos legais compostos como no código original: capturas de cada peça com a procura
+    recursiva (utils._get_capture_paths_recursive), as mais longas globalmente, ou movimentos normais.
+    """
+    captures = []
+    pieces = [(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE)
+              if board[r][c] != EMPTY and board[r][c].lower() == player]
+    for r, c in pieces:
+        sequences = utils._get_capture_paths_recursive(board, (r, c), board[r][c], [(r, c)], frozenset())
+        captures.extend(seq for seq in sequences if len(seq) > 1)
+    if captures:
+        max_len = max(len(seq) for seq in captures)
+        return [seq for seq in captures if len(seq) == max_len]
+    paths = []
+    for r, c in pieces:
+        paths.extend(utils.get_normal_moves(board, r, c))
+    return paths
+
+def _perft_list(board, player, depth, generate):
+    if depth == 0: return 1
+    paths = generate(board, player)
+    if depth == 1: return len(paths)
+    opponent = _opponent(player)
+    nodes = 0
+    for path in paths:
+        undo = utils.make_move(board, path)
+        nodes += _perft_list(board, opponent, depth - 1, generate)
+        utils.unmake_move(board, undo)
+    return nodes
+
+def _perft_bitboard(state, player, depth):
+    if depth == 0: return 1
+    paths = bitboard.generate_moves(state, player)
+    if depth == 1: return len(paths)
+    opponent = _opponent(player)
+    nodes = 0
+    for path in paths:
+        nodes += _perft_bitboard(bitboard.apply_move(state, path), opponent, depth - 1)
+    return nodes
+
+def _list_generator(generate):
+    def run(board, player, depth):
+        return _perft_list([row[:] for row in board], player, depth, generate)
+    def moves(board, player):
+        return generate(board, player)
+    def child(board, path):
+        board = [row[:] for row in board]
+        utils.make_move(board, path)
+        return board
+    return run, moves, child
+
+def _bitboard_generator():
+    def run(board, player, depth):
+        return _perft_bitboard(bitboard.from_board(board), player, depth)
+    def moves(board, player):
+        return bitboard.generate_moves(bitboard.from_board(board), player)
+    def child(board, path):
+        return bitboard.to_board(bitboard.apply_move(bitboard.from_board(board), path))
+    return run, moves, child
+
+# nome -> (perft(board, player, depth), moves(board, player), child(board, path))
+GENERATORS = {
+    'legacy': _list_generator(_legacy_moves),
+    'utils': _list_generator(utils.generate_legal_moves),
+    'bitboard': _bitboard_generator(),
+}
+
+def perft(board, player, depth, generator='utils'):
+    """Número de folhas a 'depth' meias-jogadas da posição (o tabuleiro não é alterado)."""
+    return GENERATORS[generator][0](board, player, depth)
+
+def divide(board, player, depth, generator='utils'):
+    """Contagem por movimento da raiz: lista de (caminho, folhas). Útil para localizar diferenças."""
+    run, moves, child = GENERATORS[generator]
+    if depth < 1: return []
+    return [(path, run(child(board, path), _opponent(player), depth - 1))
+            for path in moves(board, player)]
+
+# --- Referência ---
+
+def load_reference(path=REFERENCE_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_reference(reference, path=REFERENCE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, indent=2)
+        f.write('\n')
+
+def reference_positions(reference):
+    """Lista de (nome, tabuleiro, jogador, {profundidade: folhas}) do ficheiro de referência."""
+    positions = []
+    for entry in reference['positions']:
+        board = create_board() if entry['board'] == 'initial' else board_from_rows(entry['board'])
+        counts = {int(depth): nodes for depth, nodes in entry.get('counts', {}).items()}
+        positions.append((entry['name'], board, entry['player'], counts))
+    return positions
+
+def run_suite(reference, generators, max_depth=None, names=None, report=print):
+    """
+    Corre o perft de cada posição/gerador até à profundidade da referência (ou max_depth).
+    Retorna o número de contagens diferentes da referência.
+    """
+    mismatches = 0
+    totals = {generator: [0, 0.0] for generator in generators}
+    for name, board, player, counts in reference_positions(reference):
+        if names and name not in names: continue
+        depths = sorted(counts) if max_depth is None else range(1, max_depth + 1)
+        for generator in generators:
+            for depth in depths:
+                start_time = time.perf_counter()
+                nodes = perft(board, player, depth, generator)
+                elapsed = time.perf_counter() - start_time
+                totals[generator][0] += nodes
+                totals[generator][1] += elapsed
+                expected = counts.get(depth)
+                if expected is None: status = "(sem referência)"
+                elif expected == nodes: status = "OK"
+                else:
+                    status = f"DIFERENTE (esperado {expected})"
+                    mismatches += 1
+                nps = nodes / elapsed if elapsed > 0 else 0.0
+                report(f"{name:<22} {generator:<9} prof {depth}: {nodes:>10} nós "
+                       f"{elapsed:8.3f}s {nps:>12,.0f} nós/s  {status}")
+    for generator, (nodes, elapsed) in totals.items():
+        nps = nodes / elapsed if elapsed > 0 else 0.0
+        report(f"Total {generator:<9} {nodes:>10} nós {elapsed:8.3f}s {nps:>12,.0f} nós/s")
+    return mismatches
+
+def update_reference(reference, generator='legacy', max_depth=None, names=None, report=print):
+    """Recalcula as contagens da referência (até 'max_depth' ou às profundidades já guardadas)."""
+    for entry, (name, board, player, counts) in zip(reference['positions'], reference_positions(reference)):
+        if names and name not in names: continue
+        depths = sorted(counts) if max_depth is None else range(1, max_depth + 1)
+        entry['counts'] = {str(depth): perft(board, player, depth, generator) for depth in depths}
+        report(f"{name}: {entry['counts']}")
+    return reference
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft: contagem de folhas para testar os geradores de movimentos.")
+    parser.add_argument("--generator", choices=sorted(GENERATORS) + ['all'], default='all',
+                        help="Gerador a testar (omissão: todos)")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="Profundidade máxima (omissão: as profundidades da referência)")
+    parser.add_argument("--position", action="append", default=None,
+                        help="Nome de uma posição da referência (pode repetir-se)")
+    parser.add_argument("--reference", default=REFERENCE_FILE, help="Ficheiro de referência (JSON)")
+    parser.add_argument("--divide", action="store_true", help="Mostra as folhas por movimento da raiz")
+    parser.add_argument("--update-reference", action="store_true",
+                        help="Regrava as contagens da referência com o gerador indicado (omissão: legacy)")
+    args = parser.parse_args(argv)
+
+    reference = load_reference(args.reference)
+    generators = sorted(GENERATORS) if args.generator == 'all' else [args.generator]
+
+    if args.update_reference:
+        generator = 'legacy' if args.generator == 'all' else args.generator
+        save_reference(update_reference(reference, generator, args.depth, args.position), args.reference)
+        return 0
+
+    if args.divide:
+        depth = args.depth or 1
+        for name, board, player, _ in reference_positions(reference):
+            if args.position and name not in args.position: continue
+            for generator in generators:
+                print(f"{name} ({generator}, prof {depth}):")
+                results = divide(board, player, depth, generator)
+                for path, nodes in sorted(results):
+                    print(f"  {path}: {nodes}")
+                print(f"  total: {sum(nodes for _, nodes in results)}")
+        return 0
+
+    mismatches = run_suite(reference, generators, args.depth, args.position)
+    if mismatches:
+        print(f"{mismatches} contagem(ns) diferente(s) da referência.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# position.py
+# Posição compacta do jogo: o tabuleiro num bytearray de 64 bytes (um carácter ASCII por
+# casa, linha a linha), o jogador a mover, o hash de Zobrist (o mesmo de
+# transposition.compute_hash, atualizado a cada jogada), o número de peças de cada jogador
+# e o número de meias-jogadas. Ocupa uma fração de um tabuleiro em listas, copia-se com uma
+# só cópia de 64 bytes e key() serve de chave exata em dicionários e caches.
+#
+# Notação de texto (tipo FEN): as 8 linhas de cima (linha 0) para baixo separadas por '/',
+# com os algarismos 1-8 para casas vazias seguidas, o jogador a mover e as meias-jogadas:
+#   bbbbbbbb/1bbbbbb1/2bbbb2/8/8/2wwww2/1wwwwww1/wwwwwwww w 0   (INITIAL_FEN)
+#
+# As entradas do motor (AIPlayer.choose_move/search/ponder/evaluate_board,
+# utils.generate_legal_moves/get_winner/count_pieces/run_headless_game, o livro de aberturas
+# e as tabelas de finais) aceitam uma Position em vez do tabuleiro em listas e do jogador.
+#
+# Uso:
+#   position = Position.initial()
+#   undo = position.make_move(path); position.unmake_move(undo)
+#   child = position.play(path)          # cópia com o movimento feito
+#   Position.from_fen(position.to_fen()) == position
+
+from Dameo import utils
+from Dameo import transposition
+from Dameo.utils import BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING, MoveUndo
+from Dameo.game_logic import create_board
+
+SQUARE_COUNT = BOARD_SIZE * BOARD_SIZE
+PIECES = (WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING)
+_EMPTY_BYTE = ord(EMPTY)
+INITIAL_FEN = "bbbbbbbb/1bbbbbb1/2bbbb2/8/8/2wwww2/1wwwwww1/wwwwwwww w 0"
+
+# _ZOBRIST[byte da peça][casa]: as chaves de transposition.ZOBRIST_KEYS por índice r*8+c
+_ZOBRIST = {ord(piece): [transposition.ZOBRIST_KEYS[piece][sq // BOARD_SIZE][sq % BOARD_SIZE]
+                         for sq in range(SQUARE_COUNT)]
+            for piece in PIECES}
+
+def _opponent(player):
+    return BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+
+
+class Position:
+    """
+    Tabuleiro (bytearray de 64 casas), jogador a mover, hash de Zobrist, peças de cada
+    jogador e meias-jogadas. make_move/unmake_move alteram a posição no lugar.
+    """
+    __slots__ = ('cells', 'player', 'hash', 'white_count', 'black_count', 'ply')
+
+    def __init__(self, cells, player=WHITE_MAN, ply=0):
+        cells = bytearray(cells)
+        if len(cells) != SQUARE_COUNT:
+            raise ValueError(f"Uma posição tem {SQUARE_COUNT} casas, não {len(cells)}")
+        if player not in (WHITE_MAN, BLACK_MAN):
+            raise ValueError(f"Jogador inválido: {player!r}")
+        h = transposition.SIDE_KEY if player == BLACK_MAN else 0
+        white_count = black_count = 0
+        for sq, byte in enumerate(cells):
+            if byte == _EMPTY_BYTE: continue
+            keys = _ZOBRIST.get(byte)
+            if keys is None:
+                raise ValueError(f"Peça inválida na casa {divmod(sq, BOARD_SIZE)}: {chr(byte)!r}")
+            h ^= keys[sq]
+            if chr(byte).lower() == WHITE_MAN: white_count += 1
+            else: black_count += 1
+        self.cells = cells
+        self.player = player
+        self.hash = h
+        self.white_count = white_count
+        self.black_count = black_count
+        self.ply = ply
+
+    # --- Construção e conversão ---
+
+    @classmethod
+    def from_board(cls, board, player=WHITE_MAN, ply=0):
+        """Posição a partir de um tabuleiro em listas de caracteres."""
+        return cls(''.join(''.join(row) for row in board).encode('ascii'), player, ply)
+
+    @classmethod
+    def initial(cls):
+        """Posição inicial (game_logic.create_board), brancas a jogar."""
+        return cls.from_board(create_board(), WHITE_MAN)
+
+    def to_board(self):
+        """Tabuleiro em listas (uma cópia nova, pode ser alterada à vontade)."""
+        text = self.cells.decode('ascii')
+        return [list(text[r:r + BOARD_SIZE]) for r in range(0, SQUARE_COUNT, BOARD_SIZE)]
+
+    def copy(self):
+        """Cópia independente (só o bytearray é copiado, o hash e as contagens não são recalculados)."""
+        other = Position.__new__(Position)
+        other.cells = bytearray(self.cells)
+        other.player = self.player
+        other.hash = self.hash
+        other.white_count = self.white_count
+        other.black_count = self.black_count
+        other.ply = self.ply
+        return other
+
+    def key(self):
+        """Chave exata e imutável da posição (jogador + casas), para dicionários e conjuntos."""
+        return self.player.encode('ascii') + bytes(self.cells)
+
+    def __eq__(self, other):
+        if not isinstance(other, Position): return NotImplemented
+        return self.player == other.player and self.cells == other.cells
+
+    __hash__ = None # Mutável: usar key() (ou hash) como chave
+
+    def to_fen(self):
+        """Notação de texto da posição (ver o cabeçalho do módulo)."""
+        text = self.cells.decode('ascii')
+        rows = []
+        for r in range(0, SQUARE_COUNT, BOARD_SIZE):
+            row, empty = [], 0
+            for piece in text[r:r + BOARD_SIZE]:
+                if piece == EMPTY:
+                    empty += 1
+                    continue
+                if empty: row.append(str(empty))
+                row.append(piece)
+                empty = 0
+            if empty: row.append(str(empty))
+            rows.append(''.join(row))
+        return f"{'/'.join(rows)} {self.player} {self.ply}"
+
+    @classmethod
+    def from_fen(cls, text):
+        """Lê a notação de to_fen. O nº de meias-jogadas é opcional. ValueError se for inválida."""
+        fields = text.split()
+        if not 2 <= len(fields) <= 3:
+            raise ValueError(f"Posição inválida (tabuleiro, jogador [meias-jogadas]): {text!r}")
+        rows = fields[0].split('/')
+        if len(rows) != BOARD_SIZE:
+            raise ValueError(f"A posição tem de ter {BOARD_SIZE} linhas: {text!r}")
+        cells = []
+        for row in rows:
+            squares = []
+            for char in row:
+                if char.isdigit(): squares.append(EMPTY * int(char))
+                else: squares.append(char)
+            squares = ''.join(squares)
+            if len(squares) != BOARD_SIZE:
+                raise ValueError(f"Linha com {len(squares)} casas em vez de {BOARD_SIZE}: {row!r}")
+            cells.append(squares)
+        try:
+            ply = int(fields[2]) if len(fields) == 3 else 0
+        except ValueError:
+            raise ValueError(f"Meias-jogadas inválidas: {fields[2]!r}")
+        return cls(''.join(cells).encode('ascii'), fields[1], ply)
+
+    def __str__(self):
+        return self.to_fen()
+
+    def __repr__(self):
+        return f"Position.from_fen({self.to_fen()!r})"
+
+    # --- Jogadas ---
+
+    def piece_at(self, r, c):
+        return chr(self.cells[r * BOARD_SIZE + c])
+
+    def make_move(self, path):
+        """
+        Aplica um movimento no lugar, com as regras de utils.make_move (a origem continua
+        ocupada durante a cadeia, promoção só no fim), troca o jogador e atualiza hash,
+        contagens e meias-jogadas. Retorna um utils.MoveUndo ou None se o caminho não se aplicar.
+        """
+        if not path or len(path) < 2: return None
+        cells = self.cells
+        start_r, start_c = path[0]
+        end_r, end_c = path[-1]
+        if not utils.is_within_bounds(start_r, start_c) or not utils.is_within_bounds(end_r, end_c): return None
+        start_sq, end_sq = start_r * BOARD_SIZE + start_c, end_r * BOARD_SIZE + end_c
+        piece = chr(cells[start_sq])
+        if piece == EMPTY: return None
+
+        captured = []
+        for i in range(len(path) - 1):
+            captured_sq = _captured_square(cells, path[i], path[i + 1], piece)
+            if captured_sq is not None and captured_sq != end_sq:
+                captured.append((divmod(captured_sq, BOARD_SIZE), chr(cells[captured_sq])))
+                cells[captured_sq] = _EMPTY_BYTE
+
+        cells[start_sq] = _EMPTY_BYTE
+        final_piece = utils.promote_pawn(piece, end_r)
+        cells[end_sq] = ord(final_piece)
+        undo = MoveUndo(path[0], path[-1], piece, final_piece, captured)
+        self.hash = transposition.update_hash(self.hash, piece, path, final_piece, captured)
+        if self.player == WHITE_MAN: self.black_count -= len(captured)
+        else: self.white_count -= len(captured)
+        self.player = _opponent(self.player)
+        self.ply += 1
+        return undo
+
+    def unmake_move(self, undo):
+        """Repõe exatamente a posição anterior ao make_move que gerou 'undo'."""
+        cells = self.cells
+        end_r, end_c = undo.end
+        start_r, start_c = undo.start
+        cells[end_r * BOARD_SIZE + end_c] = _EMPTY_BYTE
+        cells[start_r * BOARD_SIZE + start_c] = ord(undo.piece)
+        for (r, c), piece in undo.captured:
+            cells[r * BOARD_SIZE + c] = ord(piece)
+        self.player = _opponent(self.player)
+        self.ply -= 1
+        if self.player == WHITE_MAN: self.black_count += len(undo.captured)
+        else: self.white_count += len(undo.captured)
+        self.hash = transposition.update_hash(self.hash, undo.piece, (undo.start, undo.end),
+                                              undo.final_piece, undo.captured)
+
+    def play(self, path):
+        """Cópia da posição com o movimento feito."""
+        child = self.copy()
+        if child.make_move(path) is None:
+            raise ValueError(f"Movimento inválido: {path}")
+        return child
+
+    def legal_moves(self):
+        """Movimentos legais do jogador a mover (utils.MoveList)."""
+        return utils.generate_legal_moves(self.to_board(), self.player)
+
+    def winner(self):
+        """utils.get_winner da posição ('w', 'b', 'draw' ou None)."""
+        return utils.get_winner(self.to_board())
+
+
+def _captured_square(cells, start, end, piece):
+    """Casa (r*8+c) da peça capturada no passo start -> end, como utils.find_captured_piece_pos."""
+    (start_r, start_c), (end_r, end_c) = start, end
+    dr, dc = end_r - start_r, end_c - start_c
+    if dr and dc and abs(dr) != abs(dc): return None # Fora de uma linha
+    distance = max(abs(dr), abs(dc))
+    step_r = (dr > 0) - (dr < 0)
+    step_c = (dc > 0) - (dc < 0)
+    opponent = BLACK_MAN if piece.lower() == WHITE_MAN else WHITE_MAN
+    if distance == 2: # Salto curto
+        sq = (start_r + step_r) * BOARD_SIZE + start_c + step_c
+        return sq if chr(cells[sq]).lower() == opponent else None
+    if distance <= 2 or not utils.is_king(piece): return None
+    captured_sq = None # Salto longo de uma dama: exatamente uma peça adversária no caminho
+    r, c = start_r + step_r, start_c + step_c
+    while (r, c) != (end_r, end_c):
+        byte = cells[r * BOARD_SIZE + c]
+        if byte != _EMPTY_BYTE:
+            if chr(byte).lower() != opponent or captured_sq is not None: return None
+            captured_sq = r * BOARD_SIZE + c
+        r += step_r; c += step_c
+    return captured_sq
+
+
+def board_and_player(position, player=None, copy=False):
+    """
+    (tabuleiro em listas, jogador) para as entradas do motor: aceita uma Position (o
+    jogador por omissão é o que está a mover) ou um tabuleiro em listas, copiado se copy.
+    """
+    if isinstance(position, Position):
+        return position.to_board(), player or position.player
+    return ([row[:] for row in position] if copy else position), player
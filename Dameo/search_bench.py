@@ -0,0 +1,176 @@
+# search_bench.py
+# Benchmark da procura completa do AIPlayer: para cada posição de bench_positions.json
+# (abertura, meio-jogo e final) corre a procura até profundidades fixas e regista nós,
+# nós/s, tempo até à profundidade, melhor movimento e avaliação. Os resultados são
+# guardados em JSON e podem ser comparados com uma execução anterior.
+#
+# Uso:
+#   python -m Dameo.search_bench --depth 4 --output base.json
+#   python -m Dameo.search_bench --depth 4 --output new.json --baseline base.json
+#   python -m Dameo.search_bench --ai "dificil:tt_size=0" --phase endgame
+#   python -m Dameo.search_bench --results new.json --baseline base.json   # só compara
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from Dameo.ia_dameo import get_ai_player_from_spec
+from Dameo.perft import board_from_rows
+from Dameo.game_logic import create_board
+
+POSITIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_positions.json')
+PHASES = ('opening', 'middlegame', 'endgame')
+
+def load_positions(path=POSITIONS_FILE, phases=None, names=None):
+    """Lista de (nome, fase, tabuleiro, jogador) do ficheiro de posições."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    positions = []
+    for entry in data['positions']:
+        if phases and entry['phase'] not in phases: continue
+        if names and entry['name'] not in names: continue
+        board = create_board() if entry['board'] == 'initial' else board_from_rows(entry['board'])
+        positions.append((entry['name'], entry['phase'], board, entry['player']))
+    return positions
+
+def bench_position(spec, board, player, depth, seed=0):
+    """
+    Procura a posição até 'depth' com uma IA nova (tabela de transposição vazia).
+    A semente fixa a escolha entre movimentos equivalentes, para o melhor movimento ser comparável.
+    """
+    random.seed(seed)
+    ai = get_ai_player_from_spec(spec)
+    try:
+        start_time = time.perf_counter()
+        score, path, completed_depth = ai.search([row[:] for row in board], player, max_depth=depth)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        ai.close()
+    return {
+        'depth': depth,
+        'completed_depth': completed_depth,
+        'nodes': ai.nodes_searched,
+        'time': elapsed,
+        'nps': ai.nodes_searched / elapsed if elapsed > 0 else 0.0,
+        'best_move': [list(step) for step in path] if path else None,
+        'score': score,
+        'stats': ai.stats.to_dict(), # Inclui o tempo e os nós de cada iteração
+    }
+
+def _aggregate(results):
+    """Totais por profundidade e globais (nós/s = nós totais / tempo total)."""
+    groups = {}
+    for result in results:
+        for key in ('all', f"depth {result['depth']}", result['phase']):
+            group = groups.setdefault(key, {'positions': 0, 'nodes': 0, 'time': 0.0})
+            group['positions'] += 1
+            group['nodes'] += result['nodes']
+            group['time'] += result['time']
+    for group in groups.values():
+        group['nps'] = group['nodes'] / group['time'] if group['time'] > 0 else 0.0
+    return groups
+
+def run_benchmark(spec, depths, positions, seed=0, report=None):
+    """Corre o benchmark e retorna o dicionário (serializável em JSON) com todos os resultados."""
+    results = []
+    for name, phase, board, player in positions:
+        for depth in depths:
+            result = {'position': name, 'phase': phase}
+            result.update(bench_position(spec, board, player, depth, seed))
+            results.append(result)
+            if report is not None: report(result)
+    return {
+        'ai': spec,
+        'depths': list(depths),
+        'seed': seed,
+        'python': platform.python_version(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+        'aggregate': _aggregate(results),
+    }
+
+def _ratio(new, old):
+    return new / old if old else float('nan')
+
+def compare_runs(baseline, current):
+    """
+    Linhas de texto a comparar duas execuções: razão de nós e de tempo por posição/profundidade
+    (< 1 é melhor) e aviso quando o melhor movimento ou a avaliação mudam.
+    """
+    old_results = {(r['position'], r['depth']): r for r in baseline['results']}
+    matched = [(old_results[(r['position'], r['depth'])], r) for r in current['results']
+               if (r['position'], r['depth']) in old_results]
+    lines = [f"Base: {baseline['ai']} ({baseline['created']})  Atual: {current['ai']} ({current['created']})",
+             f"{'posição':<22} {'prof':>4} {'nós':>10} {'x nós':>7} {'tempo':>9} {'x tempo':>8} {'nós/s':>12}"]
+    for old, result in matched:
+        line = (f"{result['position']:<22} {result['depth']:>4} {result['nodes']:>10} "
+                f"{_ratio(result['nodes'], old['nodes']):>7.2f} {result['time']:>8.3f}s "
+                f"{_ratio(result['time'], old['time']):>8.2f} {result['nps']:>12,.0f}")
+        if result['best_move'] != old['best_move']: line += "  movimento diferente"
+        if result['score'] != old['score']: line += f"  score {old['score']} -> {result['score']}"
+        lines.append(line)
+    # Os totais só incluem as posições presentes nas duas execuções
+    old_aggregate = _aggregate([old for old, _ in matched])
+    for key, group in _aggregate([result for _, result in matched]).items():
+        old = old_aggregate[key]
+        lines.append(f"Total {key:<16} nós x{_ratio(group['nodes'], old['nodes']):.2f}  "
+                     f"tempo x{_ratio(group['time'], old['time']):.2f}  "
+                     f"nós/s {old['nps']:,.0f} -> {group['nps']:,.0f}")
+    return lines
+
+def format_result(result):
+    best_move = ' '.join(f"({r},{c})" for r, c in result['best_move']) if result['best_move'] else '-'
+    score = f"{result['score']:.3f}" if result['score'] is not None else '-'
+    stats = result['stats']
+    first_cutoffs = stats['beta_cutoffs'][0] if stats['beta_cutoffs'] else 0
+    return (f"{result['position']:<22} prof {result['depth']}: {result['nodes']:>9} nós "
+            f"{result['time']:8.3f}s {result['nps']:>10,.0f} nós/s  score {score}  {best_move}\n"
+            f"{'':<22} TT {stats['tt_hits']}/{stats['tt_probes']}, cortes no 1.º movimento "
+            f"{first_cutoffs}/{sum(stats['beta_cutoffs'])} (killers {stats.get('killer_cutoffs', 0)}), "
+            f"repetições PVS {stats.get('pvs_researches', 0)}/aspiração {stats.get('aspiration_researches', 0)}, "
+            f"ramificação {stats['branching_factor']:.2f}, prof máx. {stats['max_ply']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da procura da IA de Dameo.")
+    parser.add_argument("--ai", default="dificil", help='Configuração da IA, ex.: "dificil:tt_size=0"')
+    parser.add_argument("--depth", type=int, default=4, help="Profundidade máxima")
+    parser.add_argument("--all-depths", action="store_true",
+                        help="Mede também o tempo até cada profundidade de 1 até --depth")
+    parser.add_argument("--phase", action="append", choices=PHASES, default=None, help="Só posições desta fase")
+    parser.add_argument("--position", action="append", default=None, help="Só a posição com este nome")
+    parser.add_argument("--positions", default=POSITIONS_FILE, help="Ficheiro de posições (JSON)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente para a escolha entre movimentos iguais")
+    parser.add_argument("--output", default=None, help="Grava os resultados neste ficheiro JSON")
+    parser.add_argument("--results", default=None, help="Usa resultados gravados em vez de correr o benchmark")
+    parser.add_argument("--baseline", default=None, help="Compara com os resultados deste ficheiro JSON")
+    args = parser.parse_args(argv)
+
+    if args.results:
+        with open(args.results, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        depths = range(1, args.depth + 1) if args.all_depths else [args.depth]
+        positions = load_positions(args.positions, args.phase, args.position)
+        current = run_benchmark(args.ai, depths, positions, args.seed,
+                                report=lambda result: print(format_result(result), flush=True))
+        for key, group in current['aggregate'].items():
+            print(f"Total {key:<16} {group['nodes']:>10} nós {group['time']:8.3f}s {group['nps']:>10,.0f} nós/s")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+                f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare_runs(baseline, current)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# search_stats.py
+# Estatísticas de uma procura do AIPlayer: nós, avaliações de folhas, cortes beta por
+# índice do movimento, acertos na tabela de transposição, cortes dos killers, repetições
+# do PVS e da janela de aspiração, recomeços da procura paralela, profundidade máxima
+# atingida, fator de ramificação e tempo de cada iteração do aprofundamento iterativo.
+# O AIPlayer preenche um SearchStats novo em cada procura (ai.stats) e, se tiver um
+# stats_callback, chama-o com esse objeto no fim da procura.
+
+class SearchStats:
+    """Contadores de uma procura. Os contadores são somados com merge() (procura paralela)."""
+
+    def __init__(self):
+        self.nodes = 0 # Nós visitados pelo minimax
+        self.leaf_evals = 0 # Avaliações estáticas (profundidade 0 ou sem movimentos)
+        self.interior_nodes = 0 # Nós cujos filhos foram procurados
+        self.moves_searched = 0 # Filhos procurados nesses nós (até ao corte)
+        self.moves_generated = 0 # Movimentos legais gerados nesses nós
+        self.beta_cutoffs = [] # beta_cutoffs[i]: cortes provocados pelo i-ésimo movimento tentado
+        self.tt_probes = 0
+        self.tt_hits = 0 # Entradas encontradas na tabela
+        self.tt_cutoffs = 0 # Nós resolvidos só com a tabela
+        self.killer_cutoffs = 0 # Cortes beta provocados por um movimento killer
+        self.pvs_researches = 0 # Procuras com janela nula que falharam e foram repetidas
+        self.aspiration_researches = 0 # Iterações repetidas por o score sair da janela de aspiração
+        self.bound_restarts = 0 # Sub-árvores da raiz recomeçadas com um limite partilhado melhor (procura paralela)
+        self.max_ply = 0 # Distância máxima à raiz atingida
+        self.completed_depth = 0
+        self.iterations = [] # Uma entrada por iteração concluída
+        self.elapsed = 0.0 # Segundos de toda a procura
+        self.best_move = None
+        self.score = None
+
+    def record_cutoff(self, move_index):
+        cutoffs = self.beta_cutoffs
+        while len(cutoffs) <= move_index:
+            cutoffs.append(0)
+        cutoffs[move_index] += 1
+
+    def record_iteration(self, depth, elapsed, score, best_move):
+        """Regista uma iteração concluída (tempo e nós acumulados desde o início da procura)."""
+        self.iterations.append({'depth': depth, 'time': elapsed, 'nodes': self.nodes,
+                                'score': score, 'best_move': best_move})
+        self.completed_depth = depth
+        self.score = score
+        self.best_move = best_move
+
+    def merge(self, other):
+        """Soma os contadores de outra procura (as iterações e o resultado não são copiados)."""
+        self.nodes += other.nodes
+        self.leaf_evals += other.leaf_evals
+        self.interior_nodes += other.interior_nodes
+        self.moves_searched += other.moves_searched
+        self.moves_generated += other.moves_generated
+        cutoffs = self.beta_cutoffs
+        for index, count in enumerate(other.beta_cutoffs):
+            if index == len(cutoffs): cutoffs.append(0)
+            cutoffs[index] += count
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.tt_cutoffs += other.tt_cutoffs
+        self.killer_cutoffs += other.killer_cutoffs
+        self.pvs_researches += other.pvs_researches
+        self.aspiration_researches += other.aspiration_researches
+        self.bound_restarts += other.bound_restarts
+        self.max_ply = max(self.max_ply, other.max_ply)
+
+    @property
+    def branching_factor(self):
+        """Média de filhos procurados por nó interior (depois da poda)."""
+        return self.moves_searched / self.interior_nodes if self.interior_nodes else 0.0
+
+    @property
+    def average_moves(self):
+        """Média de movimentos legais por nó interior (antes da poda)."""
+        return self.moves_generated / self.interior_nodes if self.interior_nodes else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Razão entre os nós das duas últimas iterações (crescimento por ply)."""
+        if len(self.iterations) < 2: return 0.0
+        previous = self.iterations[-2]['nodes']
+        last = self.iterations[-1]['nodes'] - previous
+        return last / previous if previous else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Fração dos cortes beta provocados pelo primeiro movimento (qualidade da ordenação)."""
+        total = sum(self.beta_cutoffs)
+        return self.beta_cutoffs[0] / total if total else 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        """Versão serializável em JSON."""
+        return {
+            'nodes': self.nodes,
+            'leaf_evals': self.leaf_evals,
+            'interior_nodes': self.interior_nodes,
+            'moves_searched': self.moves_searched,
+            'moves_generated': self.moves_generated,
+            'beta_cutoffs': list(self.beta_cutoffs),
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_cutoffs': self.tt_cutoffs,
+            'killer_cutoffs': self.killer_cutoffs,
+            'pvs_researches': self.pvs_researches,
+            'aspiration_researches': self.aspiration_researches,
+            'bound_restarts': self.bound_restarts,
+            'max_ply': self.max_ply,
+            'completed_depth': self.completed_depth,
+            'branching_factor': self.branching_factor,
+            'effective_branching_factor': self.effective_branching_factor,
+            'elapsed': self.elapsed,
+            'nodes_per_second': self.nodes_per_second,
+            'iterations': [dict(iteration, best_move=[list(step) for step in iteration['best_move']]
+                                if iteration['best_move'] else None)
+                           for iteration in self.iterations],
+        }
+
+    def summary(self):
+        """Resumo numa linha."""
+        return (f"prof {self.completed_depth} (máx. {self.max_ply}), {self.nodes} nós, "
+                f"{self.leaf_evals} folhas, {self.nodes_per_second:,.0f} nós/s, "
+                f"TT {self.tt_hits}/{self.tt_probes}, cortes {sum(self.beta_cutoffs)} "
+                f"({self.first_move_cutoff_rate:.0%} no 1.º, {self.killer_cutoffs} killers), "
+                f"repetições PVS {self.pvs_researches}/aspiração {self.aspiration_researches}, "
+                f"ramificação {self.branching_factor:.2f}")
+
+
+def print_search_stats(stats):
+    """stats_callback pronto a usar: imprime o resumo e o tempo de cada iteração."""
+    print(f"[procura] {stats.summary()}")
+    for iteration in stats.iterations:
+        print(f"  prof {iteration['depth']}: {iteration['time']:.3f}s, {iteration['nodes']} nós, "
+              f"score {iteration['score']}")
@@ -0,0 +1,451 @@
+# tablebase.py
+# Tabelas de finais (tablebases) por análise retrógrada: para cada combinação de peões e
+# reis com poucas peças guarda, para todas as posições e para cada jogador a mover, se a
+# posição está ganha, perdida ou empatada e em quantas meias-jogadas termina com jogo perfeito.
+#
+# As regras são as do jogo (Dameo.bitboard): captura mais longa obrigatória, promoção no fim
+# do caminho e fim de jogo como em utils.get_winner (o jogo acaba logo que um dos jogadores
+# fique sem peças ou sem movimentos, seja qual for o jogador a mover). As posições que a
+# análise não resolve repetem-se para sempre e são empates.
+#
+# Cada material tem um ficheiro (ex.: w10b02.dtb = 1 peão branco contra 2 reis pretos) com
+# um byte por índice de posição; a consulta usa mmap, por isso só lê as páginas necessárias.
+#
+# Formato (little-endian):
+#   cabeçalho: b'DMTB', versão (u16), peões/reis brancos, peões/reis pretos (4 x u8), nº de posições (u32)
+#   valores: 1 byte por índice -> 0 empate, 1 + n vitória em n meias-jogadas, 128 + n derrota em n
+#
+# Índice de uma posição: cada grupo de peças iguais (peões brancos, reis brancos, peões pretos,
+# reis pretos) ocupa uma combinação das casas permitidas ao grupo, numerada pela ordem
+# colexicográfica; os números dos grupos e o jogador a mover formam um número em base mista.
+# Os peões nunca estão na linha de promoção. Índices com duas peças na mesma casa ficam a 0.
+#
+# Uso:
+#   python -m Dameo.tablebase build --pieces 3             # gera todas as tabelas até 3 peças
+#   python -m Dameo.tablebase probe --player b ........ ... # resultado de uma posição (8 linhas)
+#   python -m Dameo.tablebase info
+
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from math import comb
+
+from Dameo import bitboard
+from Dameo.bitboard import BIT, NUM_SQUARES, SQUARE_COORDS, WM, WK, BM, BK
+from Dameo.utils import BOARD_SIZE, WHITE_MAN, BLACK_MAN
+from Dameo.position import board_and_player
+
+TABLE_MAGIC = b'DMTB'
+TABLE_VERSION = 1
+HEADER = struct.Struct('<4sH4BI')
+DEFAULT_MAX_PIECES = 3
+DEFAULT_TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+TABLE_FILE_PATTERN = re.compile(r'^w(\d)(\d)b(\d)(\d)\.dtb$')
+
+# Valores guardados (do ponto de vista do jogador a mover)
+DRAW = 0
+WIN_BASE = 1 # 1 + n: vitória em n meias-jogadas
+LOSS_BASE = 128 # 128 + n: derrota em n meias-jogadas
+MAX_WIN_DISTANCE = LOSS_BASE - WIN_BASE - 1
+MAX_LOSS_DISTANCE = 255 - LOSS_BASE
+
+# Casas permitidas a cada grupo: os peões não podem estar na sua linha de promoção
+_ALL_SQUARES = list(range(NUM_SQUARES))
+ALLOWED_SQUARES = (
+    [sq for sq in _ALL_SQUARES if SQUARE_COORDS[sq][0] != 0], # Peões brancos (promovem na linha 0)
+    _ALL_SQUARES,
+    [sq for sq in _ALL_SQUARES if SQUARE_COORDS[sq][0] != BOARD_SIZE - 1], # Peões pretos
+    _ALL_SQUARES,
+)
+
+def default_tablebase_dir():
+    """Pasta das tabelas incluída no projeto, ou None se ainda não tiver sido gerada."""
+    return DEFAULT_TABLEBASE_DIR if os.path.isdir(DEFAULT_TABLEBASE_DIR) else None
+
+def decode_value(value):
+    """Converte o byte guardado em (resultado, distância): ('win'|'loss'|'draw', meias-jogadas ou None)."""
+    if value == DRAW: return 'draw', None
+    if value < LOSS_BASE: return 'win', value - WIN_BASE
+    return 'loss', value - LOSS_BASE
+
+def material_of(bitboards):
+    """(peões brancos, reis brancos, peões pretos, reis pretos) da posição."""
+    return tuple(bitboard.popcount(mask) for mask in bitboards)
+
+def table_name(material):
+    wm, wk, bm, bk = material
+    return f"w{wm}{wk}b{bm}{bk}.dtb"
+
+def materials_up_to(max_pieces):
+    """
+    Todos os materiais com 2..max_pieces peças (pelo menos uma de cada cor), pela ordem de
+    construção: menos peças primeiro e, com as mesmas peças, menos peões primeiro. Uma captura
+    ou uma promoção leva sempre a um material anterior na lista.
+    """
+    materials = []
+    for total in range(2, max_pieces + 1):
+        for white in range(1, total):
+            black = total - white
+            for wm in range(white + 1):
+                for bm in range(black + 1):
+                    materials.append((wm, white - wm, bm, black - bm))
+    materials.sort(key=lambda material: (sum(material), material[WM] + material[BM]))
+    return materials
+
+
+class TableIndex:
+    """Numeração das posições de um material (ver o formato no cabeçalho do módulo)."""
+
+    def __init__(self, material):
+        self.material = tuple(material)
+        self.group_sizes = [comb(len(ALLOWED_SQUARES[group]), count) for group, count in enumerate(material)]
+        # Multiplicador de cada grupo; o jogador a mover é o dígito menos significativo
+        self.multipliers = [0, 0, 0, 0]
+        multiplier = 2
+        for group in reversed(range(4)):
+            self.multipliers[group] = multiplier
+            multiplier *= self.group_sizes[group]
+        self.size = multiplier
+        self._ranks = [None] * 4 # máscara do grupo -> número, construído quando é preciso
+
+    def _group_ranks(self, group):
+        ranks = self._ranks[group]
+        if ranks is None:
+            ranks = {}
+            allowed = ALLOWED_SQUARES[group]
+            for positions in combinations(range(len(allowed)), self.material[group]):
+                mask = 0
+                for position in positions:
+                    mask |= BIT[allowed[position]]
+                ranks[mask] = sum(comb(position, i + 1) for i, position in enumerate(positions))
+            self._ranks[group] = ranks
+        return ranks
+
+    def group_entries(self, group):
+        """Lista de (número, máscara) de todas as colocações do grupo."""
+        return [(rank, mask) for mask, rank in self._group_ranks(group).items()]
+
+    def index(self, bitboards, player):
+        """Índice da posição (KeyError se a posição não pertencer a este material)."""
+        index = 0 if player == WHITE_MAN else 1
+        for group in range(4):
+            index += self._group_ranks(group)[bitboards[group]] * self.multipliers[group]
+        return index
+
+
+def _terminal_value(bitboards, player):
+    """Valor da posição se o jogo já tiver acabado, senão None."""
+    winner = bitboard.get_winner(bitboards)
+    if winner is None: return None
+    if winner == 'draw': return DRAW
+    return WIN_BASE if winner == player else LOSS_BASE
+
+def _opponent(player):
+    return BLACK_MAN if player == WHITE_MAN else WHITE_MAN
+
+def _distance(value):
+    return value - WIN_BASE if value < LOSS_BASE else value - LOSS_BASE
+
+# --- Construção ---
+
+def _enumerate_positions(table_index):
+    """Gera (índice sem o jogador, bitboards) de todas as colocações sem casas repetidas."""
+    entries = [table_index.group_entries(group) for group in range(4)]
+    multipliers = table_index.multipliers
+    for rank_wm, wm in entries[WM]:
+        base_wm = rank_wm * multipliers[WM]
+        for rank_wk, wk in entries[WK]:
+            if wk & wm: continue
+            base_wk = base_wm + rank_wk * multipliers[WK]
+            white = wm | wk
+            for rank_bm, bm in entries[BM]:
+                if bm & white: continue
+                base_bm = base_wk + rank_bm * multipliers[BM]
+                occupied = white | bm
+                for rank_bk, bk in entries[BK]:
+                    if bk & occupied: continue
+                    yield base_bm + rank_bk * multipliers[BK], (wm, wk, bm, bk)
+
+def build_table(material, probe_table):
+    """
+    Resolve um material por análise retrógrada e retorna o bytearray de valores.
+    probe_table(bitboards, player) dá o valor das posições de materiais já resolvidos
+    (depois de uma captura ou de uma promoção).
+
+    1. Para cada posição gera os movimentos: filhos do mesmo material ficam como arestas
+       internas; os restantes (ou as posições finais) já têm valor conhecido.
+    2. Propaga os valores por distância crescente: uma posição com um filho perdido a
+       distância d fica ganha a d + 1; quando todos os filhos estão ganhos (para o
+       adversário), fica perdida à distância do último, que é o mais longo.
+    """
+    table_index = TableIndex(material)
+    size = table_index.size
+    values = bytearray(size)
+    resolved = bytearray(size)
+    remaining = array('H', [0]) * size # Filhos ainda por resolver
+    parents, children = array('l'), array('l') # Arestas internas (pai -> filho)
+    events = [[] for _ in range(LOSS_BASE)] # events[d]: (pai, valor de um filho à distância d)
+
+    def resolve(position, value):
+        values[position] = value
+        resolved[position] = 1
+
+    for base, bitboards in _enumerate_positions(table_index):
+        for side, player in enumerate((WHITE_MAN, BLACK_MAN)):
+            position = base + side
+            value = _terminal_value(bitboards, player)
+            if value is not None:
+                resolve(position, value)
+                continue
+            opponent = _opponent(player)
+            paths = bitboard.generate_moves(bitboards, player)
+            remaining[position] = len(paths)
+            for path in paths:
+                child = bitboard.apply_move(bitboards, path)
+                if material_of(child) == table_index.material:
+                    parents.append(position)
+                    children.append(table_index.index(child, opponent))
+                    continue
+                child_value = _terminal_value(child, opponent)
+                if child_value is None: child_value = probe_table(child, opponent)
+                if child_value != DRAW: # Um filho empatado nunca deixa a posição perder
+                    events[_distance(child_value)].append((position, child_value))
+
+    # Lista de pais de cada filho (CSR): offsets[c]..offsets[c + 1] em predecessors
+    offsets = array('l', [0]) * (size + 1)
+    for child in children:
+        offsets[child + 1] += 1
+    for position in range(size):
+        offsets[position + 1] += offsets[position]
+    predecessors = array('l', [0]) * len(children)
+    fill = array('l', offsets)
+    for parent, child in zip(parents, children):
+        predecessors[fill[child]] = parent
+        fill[child] += 1
+    del parents, children, fill
+
+    def notify_parents(position):
+        value = values[position]
+        if value == DRAW: return
+        distance = _distance(value)
+        if distance >= len(events) - 1:
+            raise OverflowError(f"Distância demasiado longa para o formato: {distance}")
+        bucket = events[distance]
+        for i in range(offsets[position], offsets[position + 1]):
+            bucket.append((predecessors[i], value))
+
+    for position in range(size):
+        if resolved[position]: notify_parents(position)
+
+    for distance, bucket in enumerate(events):
+        # Os novos eventos vão sempre para distance + 1, por isso o balde atual não cresce
+        for position, child_value in bucket:
+            if resolved[position]: continue
+            if child_value >= LOSS_BASE: # O adversário perde: ganha na jogada seguinte
+                if distance + 1 > MAX_WIN_DISTANCE:
+                    raise OverflowError(f"Distância demasiado longa para o formato: {distance + 1}")
+                resolve(position, WIN_BASE + distance + 1)
+                notify_parents(position)
+            else:
+                remaining[position] -= 1
+                if remaining[position] == 0:
+                    resolve(position, LOSS_BASE + distance + 1)
+                    notify_parents(position)
+        bucket.clear()
+    return values
+
+def write_table(path, material, values):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, *material, len(values)))
+        f.write(values)
+
+def read_table(path, material):
+    """Valores de uma tabela já gravada (ValueError se o ficheiro não corresponder ao material)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, wm, wk, bm, bk, size = HEADER.unpack_from(data, 0)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION or (wm, wk, bm, bk) != tuple(material) \
+            or size != TableIndex(material).size or HEADER.size + size > len(data):
+        raise ValueError(f"Ficheiro não é uma tabela de finais Dameo (v{TABLE_VERSION}): {path}")
+    return data[HEADER.size:HEADER.size + size]
+
+def build_tablebases(max_pieces=DEFAULT_MAX_PIECES, directory=DEFAULT_TABLEBASE_DIR, report=None):
+    """
+    Gera as tabelas em falta de todos os materiais até max_pieces peças em 'directory'.
+    As tabelas já gravadas são lidas e reutilizadas. Retorna os materiais gerados.
+    """
+    os.makedirs(directory, exist_ok=True)
+    solved = {} # material -> (valores, TableIndex)
+    built = []
+
+    def probe_table(bitboards, player):
+        values, table_index = solved[material_of(bitboards)]
+        return values[table_index.index(bitboards, player)]
+
+    for material in materials_up_to(max_pieces):
+        path = os.path.join(directory, table_name(material))
+        if os.path.exists(path):
+            solved[material] = (read_table(path, material), TableIndex(material))
+            continue
+        start_time = time.perf_counter()
+        values = build_table(material, probe_table)
+        write_table(path, material, values)
+        solved[material] = (values, TableIndex(material))
+        built.append(material)
+        if report is not None:
+            wins = sum(1 for value in values if WIN_BASE <= value < LOSS_BASE)
+            losses = sum(1 for value in values if value >= LOSS_BASE)
+            longest = max((_distance(value) for value in values if value != DRAW), default=0)
+            report(f"{table_name(material)}: {len(values)} índices, {wins} vitórias, {losses} derrotas, "
+                   f"final mais longo {longest} meias-jogadas ({time.perf_counter() - start_time:.1f}s)")
+    return built
+
+# --- Consulta ---
+
+class Tablebases:
+    """
+    Conjunto de tabelas de uma pasta, abertas com mmap à medida que são consultadas.
+    Usar close() (ou 'with') no fim.
+    """
+
+    def __init__(self, directory=DEFAULT_TABLEBASE_DIR):
+        self.directory = directory
+        self._tables = {} # material -> (ficheiro, mmap, TableIndex) ou None se não existir
+        # Número máximo de peças coberto: o maior material com ficheiro na pasta
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                match = TABLE_FILE_PATTERN.match(name)
+                if match:
+                    self.max_pieces = max(self.max_pieces, sum(int(count) for count in match.groups()))
+        self.hits = 0
+
+    def close(self):
+        for table in self._tables.values():
+            if table is not None:
+                table[1].close()
+                table[0].close()
+        self._tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _table(self, material):
+        if material not in self._tables:
+            path = os.path.join(self.directory, table_name(material))
+            table = None
+            if os.path.exists(path):
+                f = open(path, 'rb')
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, wm, wk, bm, bk, size = HEADER.unpack_from(mm, 0)
+                table_index = TableIndex(material)
+                if magic != TABLE_MAGIC or version != TABLE_VERSION or (wm, wk, bm, bk) != material \
+                        or size != table_index.size or HEADER.size + size > len(mm):
+                    mm.close()
+                    f.close()
+                    raise ValueError(f"Ficheiro não é uma tabela de finais Dameo (v{TABLE_VERSION}): {path}")
+                table = (f, mm, table_index)
+            self._tables[material] = table
+        return self._tables[material]
+
+    def covers(self, bitboards):
+        """A posição tem poucas peças para estar nas tabelas?"""
+        return 0 < bitboard.popcount(bitboard.occupied(bitboards)) <= self.max_pieces
+
+    def probe_value(self, bitboards, player):
+        """Byte guardado para a posição (jogador a mover 'player') ou None se não houver tabela."""
+        player = player.lower()
+        value = _terminal_value(bitboards, player)
+        if value is not None: return value
+        material = material_of(bitboards)
+        if sum(material) > self.max_pieces: return None
+        table = self._table(material)
+        if table is None: return None
+        return table[1][HEADER.size + table[2].index(bitboards, player)]
+
+    def probe(self, board, player=None):
+        """
+        Resultado da posição (tabuleiro em listas ou Position) para o jogador a mover:
+        ('win'|'loss'|'draw', meias-jogadas até ao fim ou None), ou None se não houver tabela.
+        """
+        board, player = board_and_player(board, player)
+        value = self.probe_value(bitboard.from_board(board), player)
+        return None if value is None else decode_value(value)
+
+    def best_move(self, board, player=None, legal_paths=None):
+        """
+        Jogada perfeita segundo as tabelas, ou None se a posição não estiver coberta:
+        a vitória mais rápida, um empate, ou a derrota mais demorada.
+        'board' pode ser uma Position. Retorna (caminho, resultado, distância).
+        """
+        board, player = board_and_player(board, player)
+        state = bitboard.from_board(board)
+        if not self.covers(state): return None
+        player = player.lower()
+        opponent = _opponent(player)
+        if legal_paths is None: legal_paths = bitboard.generate_moves(state, player)
+        best = None
+        for path in legal_paths:
+            child_value = self.probe_value(bitboard.apply_move(state, path), opponent)
+            if child_value is None: return None
+            # Valor do ponto de vista de quem joga: vitórias rápidas > empate > derrotas longas
+            if child_value == DRAW: key = (1, 0)
+            elif child_value >= LOSS_BASE: key = (2, -_distance(child_value))
+            else: key = (0, _distance(child_value))
+            if best is None or key > best[0]:
+                best = (key, path, child_value)
+        if best is None: return None
+        self.hits += 1
+        key, path, child_value = best
+        if key[0] == 1: return path, 'draw', None
+        result = 'win' if key[0] == 2 else 'loss'
+        return path, result, _distance(child_value) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tabelas de finais de Dameo (análise retrógrada).")
+    parser.add_argument("--directory", default=DEFAULT_TABLEBASE_DIR, help="Pasta das tabelas")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Gera as tabelas em falta")
+    build.add_argument("--pieces", type=int, default=DEFAULT_MAX_PIECES, help="Número máximo de peças")
+    probe = commands.add_parser('probe', help="Consulta uma posição")
+    probe.add_argument("rows", nargs=BOARD_SIZE, help="Tabuleiro: 8 linhas de cima para baixo, ex.: ....W...")
+    probe.add_argument("--player", choices=(WHITE_MAN, BLACK_MAN), default=WHITE_MAN, help="Jogador a mover")
+    commands.add_parser('info', help="Lista as tabelas da pasta")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        built = build_tablebases(args.pieces, args.directory, report=lambda text: print(text, flush=True))
+        print(f"{len(built)} tabela(s) gerada(s) em {args.directory}")
+    elif args.command == 'probe':
+        from Dameo.perft import board_from_rows
+        board = board_from_rows(args.rows)
+        with Tablebases(args.directory) as tablebases:
+            move = tablebases.best_move(board, args.player)
+            if move is None:
+                print("Posição fora das tabelas.")
+                return 1
+            path, result, distance = move
+            print(f"{result}" + (f" em {distance} meias-jogadas" if distance is not None else "") +
+                  f", jogada {path}")
+    else:
+        with Tablebases(args.directory) as tablebases:
+            print(f"{args.directory}: até {tablebases.max_pieces} peças")
+            for material in materials_up_to(tablebases.max_pieces):
+                path = os.path.join(args.directory, table_name(material))
+                if os.path.exists(path):
+                    print(f"  {table_name(material)}: {os.path.getsize(path) - HEADER.size} posições")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
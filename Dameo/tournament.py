@@ -0,0 +1,188 @@
+# tournament.py
+# Torneios IA vs IA sem interface gráfica, distribuídos por um pool de processos.
+# Cada jogo alterna as cores, usa uma semente própria (resultados reprodutíveis) e é
+# escrito numa linha JSON assim que termina. No fim mostra vitórias/empates/derrotas,
+# a diferença de Elo com intervalo de confiança de 95% e o débito em jogos/s.
+#
+# Uso:
+#   python -m Dameo.tournament "dificil" "medio" --games 1000 --workers 16 --output match.jsonl
+#   python -m Dameo.tournament "dificil:time_limit=0.2" "dificil:time_limit=0.2,tt_size=0"
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Dameo import utils
+from Dameo.utils import WHITE_MAN, BLACK_MAN
+from Dameo.ia_dameo import get_ai_player_from_spec
+
+Z_95 = 1.959964 # Quantil da normal para o intervalo de 95%
+OPENING_PLIES = 16 # Jogadas iniciais guardadas em cada resultado (para o livro de aberturas)
+
+
+def play_game(game_index, spec_a, spec_b, seed, max_moves=300, use_bitboards=False):
+    """
+    Joga um jogo entre as IAs A e B. A joga com as brancas nos jogos pares.
+    Retorna um dicionário com o resultado (serializável em JSON).
+    """
+    random.seed(seed) # A IA escolhe aleatoriamente entre movimentos equivalentes
+    a_is_white = game_index % 2 == 0
+    ai_a = get_ai_player_from_spec(spec_a)
+    ai_b = get_ai_player_from_spec(spec_b)
+    search_stats = {'a': [], 'b': []} # (nós, profundidade concluída) de cada procura
+    ai_a.stats_callback = lambda stats: search_stats['a'].append((stats.nodes, stats.completed_depth))
+    ai_b.stats_callback = lambda stats: search_stats['b'].append((stats.nodes, stats.completed_depth))
+    ai_white, ai_black = (ai_a, ai_b) if a_is_white else (ai_b, ai_a)
+
+    move_log = []
+    start_time = time.perf_counter()
+    try:
+        winner = utils.run_headless_game(ai_white, ai_black, max_moves=max_moves,
+                                         use_bitboards=use_bitboards, move_log=move_log)
+    finally:
+        ai_a.close()
+        ai_b.close()
+    duration = time.perf_counter() - start_time
+
+    if winner == 'draw':
+        score_a = 0.5
+    else:
+        score_a = 1.0 if (winner == WHITE_MAN) == a_is_white else 0.0
+    return {
+        'game': game_index,
+        'seed': seed,
+        'white': spec_a if a_is_white else spec_b,
+        'black': spec_b if a_is_white else spec_a,
+        'winner': winner,
+        'score_a': score_a,
+        'moves': len(move_log),
+        'think_times': [round(seconds, 6) for _, _, seconds in move_log],
+        'opening': [[list(step) for step in path] for _, path, _ in move_log[:OPENING_PLIES]],
+        'duration': round(duration, 6),
+        'search': {side: {'searches': len(entries),
+                          'nodes': sum(nodes for nodes, _ in entries),
+                          'avg_depth': sum(depth for _, depth in entries) / len(entries) if entries else 0.0}
+                   for side, entries in search_stats.items()},
+    }
+
+
+def elo_difference(score):
+    """Diferença de Elo correspondente a uma pontuação média (0..1)."""
+    if score <= 0.0: return -math.inf
+    if score >= 1.0: return math.inf
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def summarize(results, elapsed):
+    """Estatísticas do ponto de vista da IA A."""
+    games = len(results)
+    wins = sum(1 for result in results if result['score_a'] == 1.0)
+    draws = sum(1 for result in results if result['score_a'] == 0.5)
+    losses = games - wins - draws
+    summary = {'games': games, 'wins': wins, 'draws': draws, 'losses': losses,
+               'elapsed': elapsed, 'games_per_sec': games / elapsed if elapsed > 0 else 0.0}
+    if not games:
+        return summary
+
+    score = (wins + 0.5 * draws) / games
+    variance = sum((result['score_a'] - score) ** 2 for result in results) / games
+    margin = Z_95 * math.sqrt(variance / games)
+    elo = elo_difference(score)
+    elo_low = elo_difference(score - margin)
+    elo_high = elo_difference(score + margin)
+    summary.update({
+        'score': score,
+        'elo': elo,
+        'elo_error': (elo_high - elo_low) / 2 if math.isfinite(elo_low) and math.isfinite(elo_high) else math.inf,
+        'avg_moves': sum(result['moves'] for result in results) / games,
+    })
+    for side in ('a', 'b'):
+        searches = sum(result['search'][side]['searches'] for result in results)
+        if searches:
+            summary[f'avg_depth_{side}'] = sum(result['search'][side]['avg_depth'] * result['search'][side]['searches']
+                                               for result in results) / searches
+            summary[f'avg_nodes_{side}'] = sum(result['search'][side]['nodes'] for result in results) / searches
+    think_times = [seconds for result in results for seconds in result['think_times']]
+    if think_times:
+        summary['avg_think_time'] = sum(think_times) / len(think_times)
+        summary['max_think_time'] = max(think_times)
+    return summary
+
+
+def run_tournament(spec_a, spec_b, games, workers=None, seed=0, max_moves=300,
+                   use_bitboards=False, output=None, on_result=None):
+    """
+    Joga 'games' jogos entre A e B num pool de 'workers' processos.
+    Cada resultado é escrito em 'output' (JSONL) e passado a on_result assim que chega.
+    Retorna (resultados ordenados por jogo, resumo).
+    """
+    results = []
+    out_file = open(output, 'w', encoding='utf-8') if output else None
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            futures = [pool.submit(play_game, index, spec_a, spec_b, seed + index, max_moves, use_bitboards)
+                       for index in range(games)]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if out_file is not None:
+                    out_file.write(json.dumps(result) + '\n')
+                    out_file.flush()
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        if out_file is not None: out_file.close()
+    elapsed = time.perf_counter() - start_time
+    results.sort(key=lambda result: result['game'])
+    return results, summarize(results, elapsed)
+
+
+def format_summary(spec_a, spec_b, summary):
+    lines = [f"A = {spec_a}  vs  B = {spec_b}",
+             f"Jogos: {summary['games']}  V/E/D (A): {summary['wins']}/{summary['draws']}/{summary['losses']}"]
+    if summary['games']:
+        lines.append(f"Pontuação A: {summary['score']:.3f}  Elo A-B: {summary['elo']:+.1f} +/- {summary['elo_error']:.1f} (95%)")
+        lines.append(f"Média de jogadas por jogo: {summary['avg_moves']:.1f}")
+        if 'avg_think_time' in summary:
+            lines.append(f"Tempo por jogada: média {summary['avg_think_time']:.3f}s, máximo {summary['max_think_time']:.3f}s")
+        for side in ('a', 'b'):
+            if f'avg_depth_{side}' in summary:
+                lines.append(f"Procura {side.upper()}: profundidade média {summary[f'avg_depth_{side}']:.2f}, "
+                             f"{summary[f'avg_nodes_{side}']:,.0f} nós por jogada")
+    lines.append(f"Débito: {summary['games_per_sec']:.2f} jogos/s ({summary['elapsed']:.1f}s)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneio IA vs IA de Dameo sem interface gráfica.")
+    parser.add_argument("engine_a", help='Configuração da IA A, ex.: "dificil" ou "dificil:time_limit=0.5"')
+    parser.add_argument("engine_b", help="Configuração da IA B")
+    parser.add_argument("--games", type=int, default=100, help="Número de jogos (as cores alternam)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos em paralelo (omissão: nº de CPUs)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente base; o jogo i usa seed + i")
+    parser.add_argument("--max-moves", type=int, default=300, help="Jogadas até declarar empate")
+    parser.add_argument("--bitboards", action="store_true", help="Mantém o estado dos jogos em bitboards")
+    parser.add_argument("--output", default=None, help="Ficheiro JSONL com um resultado por jogo")
+    parser.add_argument("--quiet", action="store_true", help="Não mostra cada jogo à medida que termina")
+    args = parser.parse_args(argv)
+
+    def report(result):
+        if not args.quiet:
+            print(f"jogo {result['game']}: vencedor={result['winner']} pontos A={result['score_a']} "
+                  f"jogadas={result['moves']} ({result['duration']:.1f}s)", flush=True)
+
+    _, summary = run_tournament(args.engine_a, args.engine_b, args.games, workers=args.workers,
+                                seed=args.seed, max_moves=args.max_moves, use_bitboards=args.bitboards,
+                                output=args.output, on_result=report)
+    print(format_summary(args.engine_a, args.engine_b, summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# transposition.py
+# Hashing de Zobrist e tabela de transposição para o minimax da IA.
+# As chaves são geradas com uma semente fixa, por isso o hash de uma posição é
+# o mesmo em todos os processos (necessário para ficheiros e procura paralela).
+
+import random
+
+from Dameo.utils import BOARD_SIZE, EMPTY, WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING
+
+ZOBRIST_SEED = 0x0DA3E0
+
+_rng = random.Random(ZOBRIST_SEED)
+# ZOBRIST_KEYS[peça][r][c] -> inteiro aleatório de 64 bits
+ZOBRIST_KEYS = {
+    piece: [[_rng.getrandbits(64) for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for piece in (WHITE_MAN, BLACK_MAN, WHITE_KING, BLACK_KING)
+}
+# Aplicado quando é a vez das pretas
+SIDE_KEY = _rng.getrandbits(64)
+del _rng
+
+# Tipos de limite guardados em cada entrada
+EXACT = 0
+LOWER_BOUND = 1 # score é um mínimo (houve corte beta)
+UPPER_BOUND = 2 # score é um máximo (nenhum movimento melhorou alpha)
+
+REPLACEMENT_POLICIES = ('depth', 'always')
+DEFAULT_TT_SIZE = 1 << 18
+
+def compute_hash(board, player):
+    """Calcula o hash de Zobrist completo de uma posição (tabuleiro + jogador a mover)."""
+    h = 0
+    for r in range(BOARD_SIZE):
+        row = board[r]
+        for c in range(BOARD_SIZE):
+            piece = row[c]
+            if piece != EMPTY:
+                h ^= ZOBRIST_KEYS[piece][r][c]
+    if player.lower() == BLACK_MAN:
+        h ^= SIDE_KEY
+    return h
+
+def update_hash(h, piece, path, final_piece, captured):
+    """
+    Atualiza o hash incrementalmente depois de um movimento.
+    piece: peça que se moveu; final_piece: a mesma peça no destino (pode ter sido promovida);
+    captured: lista de ((r, c), peça) removidas pelo movimento.
+    """
+    (sr, sc), (er, ec) = path[0], path[-1]
+    h ^= ZOBRIST_KEYS[piece][sr][sc] ^ ZOBRIST_KEYS[final_piece][er][ec] ^ SIDE_KEY
+    for (r, c), captured_piece in captured:
+        h ^= ZOBRIST_KEYS[captured_piece][r][c]
+    return h
+
+
+class TTEntry:
+    __slots__ = ('key', 'depth', 'flag', 'score', 'best_move', 'age')
+
+    def __init__(self, key, depth, flag, score, best_move, age):
+        self.key = key
+        self.depth = depth
+        self.flag = flag
+        self.score = score
+        self.best_move = best_move
+        self.age = age
+
+
+class TranspositionTable:
+    """
+    Tabela de tamanho fixo indexada por hash de Zobrist.
+    replacement='depth': só substitui uma entrada da procura atual por outra de profundidade
+    igual ou maior (entradas de procuras anteriores são sempre substituíveis).
+    replacement='always': a entrada mais recente substitui sempre a anterior.
+    """
+
+    def __init__(self, size=DEFAULT_TT_SIZE, replacement='depth'):
+        if size <= 0:
+            raise ValueError("size tem de ser positivo")
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Política de substituição desconhecida: {replacement}")
+        self.size = size
+        self.replacement = replacement
+        self.entries = [None] * size
+        self.age = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Marca o início de uma nova procura (as entradas antigas passam a ser substituíveis)."""
+        self.age += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.age = 0
+
+    def probe(self, key):
+        """Retorna a entrada da posição ou None."""
+        entry = self.entries[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        index = key % self.size
+        old = self.entries[index]
+        if old is not None and self.replacement == 'depth' and \
+           old.key != key and old.age == self.age and old.depth > depth:
+            return # Mantém a entrada mais profunda da procura atual
+        self.entries[index] = TTEntry(key, depth, flag, score, best_move, self.age)
+        self.stores += 1
+
+    def __len__(self):
+        return sum(1 for entry in self.entries if entry is not None)
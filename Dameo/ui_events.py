@@ -0,0 +1,48 @@
+# ui_events.py
+# Espera por eventos da interface sem ocupar o processador. Os ciclos da interface
+# (game_loop, menus, ecrã de fim e regras) bloqueiam em pygame.event.wait até haver input,
+# com um timeout quando há alguma coisa a atualizar sozinha (IA a pensar, mensagem a
+# expirar), e só redesenham depois de acordarem. MAX_FPS limita o redesenho quando os
+# eventos chegam seguidos (ex.: movimento do rato).
+#
+# Uso:
+#   events = wait_for_events(timeout=0.1)   # lista (vazia se o timeout acabou)
+#   wait_for_click(keys=True)               # ecrãs "clique para continuar"
+
+import sys
+
+import pygame
+
+MAX_FPS = 60 # Limite de frames de todos os ciclos da interface
+_EXPOSE_EVENTS = {pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)}
+
+def wait_for_events(timeout=None):
+    """
+    Bloqueia até haver pelo menos um evento ou passarem 'timeout' segundos (None: sem
+    limite; 0: não espera) e retorna todos os eventos pendentes.
+    """
+    if timeout is not None and timeout <= 0:
+        return pygame.event.get()
+    if timeout is None:
+        first = pygame.event.wait()
+    else:
+        first = pygame.event.wait(max(1, round(timeout * 1000)))
+    events = [] if first.type == pygame.NOEVENT else [first]
+    events.extend(pygame.event.get())
+    return events
+
+def is_expose(event):
+    """A janela foi descoberta e tem de ser redesenhada toda?"""
+    return event.type in _EXPOSE_EVENTS
+
+def wait_for_click(keys=False):
+    """Espera (sem ocupar o processador) por um clique, ou uma tecla com keys=True. Fecha o jogo com QUIT."""
+    while True:
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            return
+        elif keys and event.type == pygame.KEYDOWN:
+            return
@@ -2,6 +2,10 @@
 
 import time # Para limite de tempo opcional no run_headless_game
 
+from Dameo.board_tables import ( # Raios, passos e saltos pré-calculados por casa
+    SQUARES, RAYS, WHITE_MAN_STEPS, BLACK_MAN_STEPS, WHITE_MAN_JUMPS, BLACK_MAN_JUMPS
+)
+
 BOARD_SIZE = 8
 EMPTY = '.'
 WHITE_MAN = 'w'
@@ -140,19 +144,89 @@ def get_all_capture_sequences(board, r, c):
     Finds all maximal capture sequences starting from (r, c).
     Returns a list of paths (lists of coordinates).
     """
-    piece = board[r][c]
-    if piece == EMPTY: return []
-    start_pos = (r, c)
-    initial_path = [start_pos]
-    initial_captured = frozenset()
-    all_sequences = _get_capture_paths_recursive(board, start_pos, piece, initial_path, initial_captured)
+    return get_capture_sequences(board, r, c)
+
+
+# --- Procura iterativa de sequências de captura ---
+# Mesmas regras que _get_capture_paths_recursive (o tabuleiro é estático durante a sequência:
+# as peças capturadas continuam a bloquear e a casa de origem continua ocupada), mas sem
+# recursão nem cópias: o caminho é uma única lista com push/pop e cada peça capturada é
+# marcada no próprio tabuleiro com CAPTURED_MARK, que bloqueia como uma peça amiga e deixa
+# de ser capturável. O tabuleiro é reposto antes de retornar.
+
+CAPTURED_MARK = 'x' # Marca temporária de uma peça já capturada na sequência em curso
+MAN_STEPS = {WHITE_MAN: WHITE_MAN_STEPS, BLACK_MAN: BLACK_MAN_STEPS}
+MAN_JUMPS = {WHITE_MAN: WHITE_MAN_JUMPS, BLACK_MAN: BLACK_MAN_JUMPS}
+
+def _capture_options(board, r, c, piece, opponent_pieces):
+    """Saltos disponíveis a partir de (r, c): lista de (casa capturada, casa de chegada)."""
+    options = []
+    if piece == WHITE_KING or piece == BLACK_KING:
+        for ray in RAYS[r][c]:
+            target = None
+            for square in ray:
+                cell = board[square[0]][square[1]]
+                if target is None:
+                    if cell == EMPTY: continue
+                    if cell not in opponent_pieces: break # Peça amiga ou já capturada
+                    target = square
+                elif cell == EMPTY: options.append((target, square))
+                else: break
+    else:
+        for over, land in MAN_JUMPS[piece][r][c]:
+            if board[land[0]][land[1]] == EMPTY and board[over[0]][over[1]] in opponent_pieces:
+                options.append((over, land))
+    return options
 
-    if not all_sequences: return []
-    valid_capture_sequences = [seq for seq in all_sequences if len(seq) > 1] # Must have >1 step
-    if not valid_capture_sequences: return []
+def _man_jumps_left(piece, row):
+    """Limite superior de saltos de um peão na linha 'row' (cada salto avança duas linhas)."""
+    return row // 2 if piece == WHITE_MAN else (BOARD_SIZE - 1 - row) // 2
 
-    max_len = max(len(seq) for seq in valid_capture_sequences)
-    return [seq for seq in valid_capture_sequences if len(seq) == max_len]
+def get_capture_sequences(board, r, c, min_length=2):
+    """
+    Sequências de captura mais longas da peça em (r, c), pela mesma ordem que a versão
+    recursiva. Só retorna sequências com pelo menos min_length casas (lista vazia se a peça
+    não chegar lá): com o máximo global já conhecido, os ramos de peões que não o podem
+    atingir são cortados e as sequências mais curtas nunca são copiadas.
+    """
+    piece = board[r][c]
+    if piece == EMPTY: return []
+    opponent_pieces = get_opponent(piece)
+    man = not is_king(piece)
+    best = max(min_length, 2) # Comprimento mínimo (em casas) de uma sequência a guardar
+    sequences = []
+    path = [(r, c)]
+    lifted = [] # (casa, peça) marcadas com CAPTURED_MARK, pela ordem da sequência
+    stack = [[_capture_options(board, r, c, piece, opponent_pieces), 0]]
+    try:
+        while stack:
+            frame = stack[-1]
+            options, index = frame
+            if index < len(options):
+                frame[1] = index + 1
+                target, land = options[index]
+                if man and len(path) + 1 + _man_jumps_left(piece, land[0]) < best:
+                    continue # Este ramo nunca chega ao comprimento máximo
+                tx, ty = target
+                lifted.append((target, board[tx][ty]))
+                board[tx][ty] = CAPTURED_MARK
+                path.append(land)
+                stack.append([_capture_options(board, land[0], land[1], piece, opponent_pieces), 0])
+                continue
+            stack.pop()
+            if not options and len(path) >= best: # Fim de uma sequência maximal
+                if len(path) > best:
+                    best = len(path)
+                    sequences = []
+                sequences.append(path[:])
+            if stack: # Desfaz o salto que levou a este nó
+                path.pop()
+                (tx, ty), captured_piece = lifted.pop()
+                board[tx][ty] = captured_piece
+    finally:
+        for (tx, ty), captured_piece in lifted: # Só se a procura for interrompida
+            board[tx][ty] = captured_piece
+    return sequences
 
 
 def get_possible_moves(board, r, c):
@@ -170,22 +244,25 @@ def get_possible_moves(board, r, c):
         return capture_paths # Mandatory captures take priority
 
     # 2. If no captures for this piece, find its normal moves
+    return get_normal_moves(board, r, c)
+
+
+def get_normal_moves(board, r, c):
+    """Movimentos sem captura da peça em (r, c) (passo dos peões, deslize dos reis)."""
+    piece = board[r][c]
+    if piece == EMPTY: return []
+    start_pos = SQUARES[r][c]
     normal_move_paths = []
-    # Use directions for non-capture moves (includes diagonal forward for pawns now)
-    move_directions = get_piece_directions(piece, capture_only=False)
 
-    if is_king(piece): # King slides
-        for dx, dy in move_directions: # All 8 directions
-            for i in range(1, BOARD_SIZE):
-                nr, nc = r + i * dx, c + i * dy
-                if not is_within_bounds(nr, nc): break
-                if board[nr][nc] == EMPTY: normal_move_paths.append([start_pos, (nr, nc)])
-                else: break # Blocked
-    else: # Pawn moves one step (includes orth & diag forward now)
-        for dx, dy in move_directions:
-             nr, nc = r + dx, c + dy
-             if is_within_bounds(nr, nc) and board[nr][nc] == EMPTY:
-                 normal_move_paths.append([start_pos, (nr, nc)])
+    if is_king(piece): # King slides (all 8 directions)
+        for ray in RAYS[r][c]:
+            for square in ray:
+                if board[square[0]][square[1]] != EMPTY: break # Blocked
+                normal_move_paths.append([start_pos, square])
+    else: # Pawn moves one step (orth & diag forward)
+        for square in MAN_STEPS[piece][r][c]:
+            if board[square[0]][square[1]] == EMPTY:
+                normal_move_paths.append([start_pos, square])
 
     return normal_move_paths
 
@@ -230,70 +307,139 @@ def find_captured_piece_pos(start_pos, end_pos, board, piece_moved):
     return None # Not a capture jump
 
 
+class MoveUndo:
+    """Registo mínimo para desfazer um movimento feito com make_move."""
+    __slots__ = ('start', 'end', 'piece', 'final_piece', 'captured', 'promoted')
+
+    def __init__(self, start, end, piece, final_piece, captured):
+        self.start = start
+        self.end = end
+        self.piece = piece # Peça na casa de origem antes do movimento
+        self.final_piece = final_piece # Peça no destino (promovida ou não)
+        self.captured = captured # Lista de ((r, c), peça) removidas
+        self.promoted = final_piece != piece
+
+
+def make_move(board, path, piece_type=EMPTY):
+    """
+    Aplica um movimento no próprio tabuleiro (sem cópias) e retorna um MoveUndo,
+    ou None se o caminho não for aplicável. Desfaz-se com unmake_move.
+    piece_type: usado apenas se a casa de origem estiver vazia (como em apply_move).
+    """
+    if not path or len(path) < 2: return None
+    start_r, start_c = path[0]
+    end_pos = path[-1]
+    if not is_within_bounds(start_r, start_c) or not is_within_bounds(end_pos[0], end_pos[1]): return None
+
+    original_piece = board[start_r][start_c]
+    if original_piece == EMPTY:
+        if piece_type == EMPTY: return None
+        original_piece = piece_type
+        board[start_r][start_c] = original_piece
+
+    # A peça fica na origem enquanto se procuram as capturas (a origem bloqueia o caminho),
+    # e cada peça capturada sai logo do tabuleiro para os passos seguintes da cadeia.
+    captured = []
+    for i in range(len(path) - 1):
+        captured_pos = find_captured_piece_pos(path[i], path[i + 1], board, original_piece)
+        if captured_pos and captured_pos != end_pos:
+            cap_r, cap_c = captured_pos
+            captured.append((captured_pos, board[cap_r][cap_c]))
+            board[cap_r][cap_c] = EMPTY
+
+    board[start_r][start_c] = EMPTY
+    final_piece = promote_pawn(original_piece, end_pos[0]) # Promote based on original type
+    board[end_pos[0]][end_pos[1]] = final_piece
+    return MoveUndo(path[0], end_pos, original_piece, final_piece, captured)
+
+
+def unmake_move(board, undo):
+    """Repõe exatamente o estado anterior ao make_move que gerou 'undo'."""
+    end_r, end_c = undo.end
+    board[end_r][end_c] = EMPTY
+    start_r, start_c = undo.start
+    board[start_r][start_c] = undo.piece
+    for (r, c), piece in undo.captured:
+        board[r][c] = piece
+
+
 def apply_move(board, path, piece_type):
     """
     Applies a move (path) to the board. Modifies 'board' directly.
     piece_type: Type of the piece at the START of the move.
+    Retorna a lista de ((r, c), peça) capturadas (usada no hash incremental).
     """
-    if not path or len(path) < 2: return
-    start_pos = path[0]
-    end_pos = path[-1]
+    undo = make_move(board, path, piece_type)
+    return undo.captured if undo else []
 
-    # 1. Get original piece type from board (safer) and clear start
-    original_piece = EMPTY
-    if is_within_bounds(start_pos[0], start_pos[1]):
-        original_piece = board[start_pos[0]][start_pos[1]]
-        board[start_pos[0]][start_pos[1]] = EMPTY
-    else: return
+# --- Game State Functions ---
 
-    # Use passed type as fallback if start was somehow empty (shouldn't happen)
-    if original_piece == EMPTY: original_piece = piece_type
-    if original_piece == EMPTY: return # Still no piece type, cannot proceed
+class MoveList(list):
+    """
+    Lista de caminhos legais retornada por generate_legal_moves.
+    is_capture: True se são capturas obrigatórias; mobility: nº de movimentos normais do jogador.
+    """
+    __slots__ = ('is_capture', 'mobility')
 
-    # 2. Find and remove captured pieces along the path
-    captured_pieces_positions = set()
-    # Use a temp board reflecting state *before* captures for checks
-    temp_board_for_check = [row[:] for row in board]
-    if is_within_bounds(start_pos[0], start_pos[1]): # Put piece back for check context
-         temp_board_for_check[start_pos[0]][start_pos[1]] = original_piece
+    def __init__(self, paths=(), is_capture=False, mobility=0):
+        super().__init__(paths)
+        self.is_capture = is_capture
+        self.mobility = mobility
 
-    for i in range(len(path) - 1):
-        step_start = path[i]; step_end = path[i+1]
-        captured_pos = find_captured_piece_pos(step_start, step_end, temp_board_for_check, original_piece)
-        if captured_pos:
-             captured_pieces_positions.add(captured_pos)
-             # Update temp board to reflect capture for subsequent checks in chain
-             if is_within_bounds(captured_pos[0], captured_pos[1]):
-                 temp_board_for_check[captured_pos[0]][captured_pos[1]] = EMPTY
-
-    # Remove identified pieces from the actual board
-    for r_cap, c_cap in captured_pieces_positions:
-         if is_within_bounds(r_cap, c_cap) and (r_cap, c_cap) != end_pos:
-              board[r_cap][c_cap] = EMPTY
-
-    # 3. Place piece at end position and promote if applicable
-    final_r, final_c = end_pos
-    if is_within_bounds(final_r, final_c):
-         final_piece = promote_pawn(original_piece, final_r) # Promote based on original type
-         board[final_r][final_c] = final_piece
 
-# --- Game State Functions ---
+def generate_legal_moves(position, player=None):
+    """
+    Gera, numa só passagem pelo tabuleiro, todos os movimentos legais do jogador:
+    as capturas mais longas (obrigatórias) se existirem, senão os movimentos normais.
+    Lista vazia = o jogador não pode jogar. Aceita o tabuleiro em listas, um tuplo
+    de bitboards (Dameo.bitboard) ou uma Dameo.position.Position (por omissão
+    para o jogador que está a mover).
+    """
+    if isinstance(position, tuple):
+        from Dameo import bitboard # Import local: bitboard importa este módulo
+        return bitboard.generate_moves(position, player)
+    if not isinstance(position, list): # Position
+        return generate_legal_moves(position.to_board(), player or position.player)
+
+    board = position
+    player_char = player.lower()
+    captures = []
+    normal_paths = []
+    max_len = 2
+    for r in range(BOARD_SIZE):
+        row = board[r]
+        for c in range(BOARD_SIZE):
+            piece = row[c]
+            if piece == EMPTY or piece.lower() != player_char: continue
+            for seq in get_capture_sequences(board, r, c, max_len):
+                if len(seq) > max_len:
+                    max_len = len(seq)
+                    captures = [seq]
+                elif len(seq) == max_len:
+                    captures.append(seq)
+            normal_paths.extend(get_normal_moves(board, r, c))
+
+    if captures:
+        return MoveList(captures, is_capture=True, mobility=len(normal_paths))
+    return MoveList(normal_paths, is_capture=False, mobility=len(normal_paths))
+
 
 def get_all_captures_for_player(board, player):
     """Finds all mandatory (longest) capture sequences for a player."""
     all_capture_paths = []
+    max_len = 2
     player_char = player.lower()
     for r in range(BOARD_SIZE):
         for c in range(BOARD_SIZE):
             piece = board[r][c]
             if piece != EMPTY and piece.lower() == player_char:
-                sequences = get_all_capture_sequences(board, r, c) # Gets max captures for this piece
-                all_capture_paths.extend(sequences)
-
-    if not all_capture_paths: return []
-    # Filter globally for the overall longest sequences
-    max_len = max(len(path) for path in all_capture_paths)
-    return [path for path in all_capture_paths if len(path) == max_len]
+                # Só as sequências desta peça tão longas como a melhor já encontrada
+                for path in get_capture_sequences(board, r, c, max_len):
+                    if len(path) > max_len:
+                        max_len = len(path)
+                        all_capture_paths = []
+                    all_capture_paths.append(path)
+    return all_capture_paths
 
 
 def has_moves(board, player):
@@ -319,6 +465,7 @@ def is_game_over(board, current_player):
 
 def get_winner(board):
     """Determines the winner ('w', 'b') or 'draw' or None if ongoing."""
+    if not isinstance(board, list): board = board.to_board() # Dameo.position.Position
     white_has_pieces = any(cell.lower() == WHITE_MAN for row in board for cell in row)
     black_has_pieces = any(cell.lower() == BLACK_MAN for row in board for cell in row)
     if not white_has_pieces: return BLACK_MAN # Black wins if White has no pieces
@@ -337,6 +484,8 @@ def get_winner(board):
 
 def count_pieces(board):
     """Counts total pieces per player."""
+    if not isinstance(board, list): # Dameo.position.Position: as contagens já são mantidas
+        return {WHITE_MAN: board.white_count, BLACK_MAN: board.black_count}
     counts = {WHITE_MAN: 0, BLACK_MAN: 0}
     for row in board:
         for piece in row:
@@ -345,55 +494,91 @@ def count_pieces(board):
     return counts
 
 # --- Headless Game Runner (for AI vs AI tests) ---
-# Note: Needs create_board from game_logic or defined here if standalone
-from Dameo.game_logic import create_board # Assuming game_logic still has create_board
+def run_headless_game(ai_white, ai_black, max_moves=300, use_bitboards=False, move_log=None):
+    """
+    Runs a game between two AIs without graphics.
+    O estado do jogo é uma Dameo.position.Position, passada diretamente às IAs.
+    Com use_bitboards=True o estado do jogo é mantido em bitboards (Dameo.bitboard)
+    e só é convertido para listas quando é passado à IA.
+    move_log: lista opcional onde se acrescenta (jogador, caminho, segundos a pensar) por jogada.
+    """
+    if use_bitboards:
+        from Dameo import bitboard # Import local: bitboard importa este módulo
+        return _run_headless_game_bitboards(ai_white, ai_black, max_moves, bitboard, move_log)
 
-def run_headless_game(ai_white, ai_black, max_moves=300):
-    """Runs a game between two AIs without graphics."""
-    board = create_board()
-    current_player = WHITE_MAN
-    move_count = 0
+    from Dameo.position import Position # Import local: position importa este módulo
+    position = Position.initial()
     # Optional: Add history tracking for repetition draw
-    # board_history = {} # Store board state tuples as keys, count as values
+    # position_history = {} # Store position.key() as keys, count as values
 
-    while move_count < max_moves:
+    while position.ply < max_moves:
+        current_player = position.player
         # Check for win/loss/stalemate based on pieces and mobility
-        game_winner = get_winner(board)
+        game_winner = get_winner(position)
         if game_winner: return game_winner # 'w', 'b', or 'draw'
 
         # # Optional: Repetition Draw Check
-        # current_board_tuple = tuple(map(tuple, board))
-        # history_count = board_history.get(current_board_tuple, 0) + 1
-        # board_history[current_board_tuple] = history_count
+        # history_count = position_history.get(position.key(), 0) + 1
+        # position_history[position.key()] = history_count
         # if history_count >= 3:
         #     # print("Draw by 3-fold repetition.")
         #     return 'draw'
 
         # Select AI and get move
         current_ai = ai_white if current_player == WHITE_MAN else ai_black
-        chosen_path = current_ai.choose_move(board, current_player)
+        think_start = time.perf_counter()
+        chosen_path = current_ai.choose_move(position)
+        if move_log is not None:
+            move_log.append((current_player, chosen_path, time.perf_counter() - think_start))
 
         # Validate and apply move
         if chosen_path:
-            start_row, start_col = chosen_path[0]
-            piece_type = board[start_row][start_col] # Get piece from board
+            piece_type = position.piece_at(*chosen_path[0]) # Get piece from board
             # Basic validation
             if piece_type == EMPTY or piece_type.lower() != current_player:
                 print(f"FATAL ERROR in run_headless_game: IA {current_player} chose invalid path {chosen_path} from board state.")
-                # print_board(board) # Print board state for debugging
+                # print(position) # Print board state for debugging
                 # Consider this a loss for the AI that made the error
                 return BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
-            apply_move(board, chosen_path, piece_type)
+            position.make_move(chosen_path) # Switch player, increment ply
         else:
              # If has_moves was true but choose_move returned None, it's an AI error
              print(f"FATAL ERROR in run_headless_game: IA {current_player} failed to return a move when moves were available.")
              # Consider this a loss for the AI that made the error
              return BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
 
-        # Switch player, increment count
+    # Max moves reached
+    # print(f"Draw by reaching max_moves limit ({max_moves}).")
+    return 'draw'
+
+def _run_headless_game_bitboards(ai_white, ai_black, max_moves, bitboard, move_log=None):
+    """Versão de run_headless_game sobre bitboards (mesmas regras e resultados)."""
+    from Dameo.game_logic import create_board # Import local: game_logic importa este módulo
+    state = bitboard.from_board(create_board())
+    current_player = WHITE_MAN
+    move_count = 0
+
+    while move_count < max_moves:
+        game_winner = bitboard.get_winner(state)
+        if game_winner: return game_winner
+
+        current_ai = ai_white if current_player == WHITE_MAN else ai_black
+        think_start = time.perf_counter()
+        chosen_path = current_ai.choose_move(bitboard.to_board(state), current_player)
+        if move_log is not None:
+            move_log.append((current_player, chosen_path, time.perf_counter() - think_start))
+
+        if chosen_path:
+            piece_type = bitboard.piece_at(state, *chosen_path[0])
+            if piece_type == EMPTY or piece_type.lower() != current_player:
+                print(f"FATAL ERROR in run_headless_game: IA {current_player} chose invalid path {chosen_path} from board state.")
+                return BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
+            state = bitboard.apply_move(state, chosen_path)
+        else:
+             print(f"FATAL ERROR in run_headless_game: IA {current_player} failed to return a move when moves were available.")
+             return BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
+
         current_player = BLACK_MAN if current_player == WHITE_MAN else WHITE_MAN
         move_count += 1
 
-    # Max moves reached
-    # print(f"Draw by reaching max_moves limit ({max_moves}).")
     return 'draw'
\ No newline at end of file
@@ -1,13 +1,18 @@
 # main.py
+# Menu do jogo. A interface (pygame, Dameo.main_pygame, Dameo.menu) só é importada em
+# main_menu(): o motor (Dameo.utils, Dameo.position, Dameo.ia_dameo, ...) não depende do pygame.
 
-import pygame
 import sys
 
 from Dameo.ia_dameo import get_ai_player
-from Dameo.main_pygame import game_loop
-from Dameo import menu 
+from Dameo.opening_book import default_book_path
+from Dameo.tablebase import default_tablebase_dir
 
 def main_menu():
+    import pygame # Imports locais: só quem abre a interface paga o arranque do pygame
+    from Dameo.main_pygame import game_loop
+    from Dameo import menu
+
     pygame.init()
     pygame.font.init()
 
@@ -38,7 +43,8 @@ def main_menu():
             difficulty_choice_index = menu.show_difficulty_menu(screen, "Escolha a Dificuldade da IA")
             if difficulty_choice_index != -1:
                 difficulty_str = difficulty_map.get(difficulty_choice_index, "medio")
-                ai_opponent = get_ai_player(difficulty_str)
+                ai_opponent = get_ai_player(difficulty_str, ponder=True, opening_book=default_book_path(),
+                                            tablebases=default_tablebase_dir()) # Pensa também na vez do jogador
             if ai_opponent:
                  screen = pygame.display.set_mode((800, 800))
                  game_loop(mode_white="user", mode_black="ai", ai_black=ai_opponent)
@@ -53,8 +59,10 @@ def main_menu():
 
             difficulty_white_str = difficulty_map.get(difficulty_white_index, "medio")
             difficulty_black_str = difficulty_map.get(difficulty_black_index, "medio")
-            ai_white = get_ai_player(difficulty_white_str)
-            ai_black = get_ai_player(difficulty_black_str)
+            ai_white = get_ai_player(difficulty_white_str, opening_book=default_book_path(),
+                                     tablebases=default_tablebase_dir())
+            ai_black = get_ai_player(difficulty_black_str, opening_book=default_book_path(),
+                                     tablebases=default_tablebase_dir())
 
             print(f"Iniciando IA vs IA: Branco ({difficulty_white_str}) vs Preto ({difficulty_black_str})")
             screen = pygame.display.set_mode((800, 800))